@@ -4,7 +4,9 @@
 loading.
 """
 
+from .batch_prefetcher import BatchPrefetcher
 from .dataset import Dataset
+from .streaming_dataset import StreamingDataset
 from .ttv_sets import TTVSets
 
-__all__ = ["Dataset", "TTVSets"]
+__all__ = ["BatchPrefetcher", "Dataset", "StreamingDataset", "TTVSets"]
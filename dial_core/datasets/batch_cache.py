@@ -0,0 +1,92 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class BatchCache:
+    """The BatchCache class is a Least Recently Used cache of processed batches, bounded
+    by the total size (in bytes) of the arrays stored.
+
+    Cached arrays are made read-only, as they are shared by all the callers that request
+    the same batch.
+
+    Attributes:
+        max_bytes: Maximum size of the cached arrays. If 0, the cache is disabled.
+    """
+
+    def __init__(self, max_bytes: int = 0):
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[Hashable, Tuple[np.ndarray, ...]]" = OrderedDict()
+        self._nbytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Returns if the cache can store any element."""
+        return self.max_bytes > 0
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the size (in bytes) of the cached arrays."""
+        return self._nbytes
+
+    def get(self, key: Hashable) -> Optional[Tuple["np.ndarray", ...]]:
+        """Returns the arrays stored with `key`, or None if they aren't cached."""
+        try:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        except KeyError:
+            return None
+
+    def put(self, key: Hashable, arrays: Tuple["np.ndarray", ...]):
+        """Stores the arrays with `key`, evicting the least recently used entries if
+        needed. Arrays bigger than the whole cache aren't stored."""
+        size = self._size_of(arrays)
+
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+
+        for array in arrays:
+            array.setflags(write=False)
+
+        self._entries[key] = arrays
+        self._nbytes += size
+
+        while self._nbytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]):
+        """Removes all the entries whose key satisfies `predicate`."""
+        for key in [key for key in self._entries if predicate(key)]:
+            self._remove(key)
+
+    def clear(self):
+        """Removes all the entries."""
+        self._entries.clear()
+        self._nbytes = 0
+
+    def _remove(self, key: Hashable):
+        arrays = self._entries.pop(key, None)
+
+        if arrays is not None:
+            self._nbytes -= self._size_of(arrays)
+
+    @staticmethod
+    def _size_of(arrays: Tuple["np.ndarray", ...]) -> int:
+        return sum(array.nbytes for array in arrays)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> dict:
+        # Cached batches aren't pickled
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, new_state: dict):
+        self.__init__(**new_state)
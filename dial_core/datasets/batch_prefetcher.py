@@ -0,0 +1,176 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import multiprocessing
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+
+import numpy as np
+from tensorflow import keras
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # pragma: no cover
+    # Python < 3.8. Batches are returned pickled through the pool pipes instead
+    resource_tracker = shared_memory = None
+
+if TYPE_CHECKING:
+    from multiprocessing.pool import AsyncResult
+    from .dataset import Dataset
+
+# Dataset used by each worker process. Set when the process is started.
+_WORKER_DATASET: Optional["Dataset"] = None
+
+SharedArrayHandle = Union["np.ndarray", Tuple[str, tuple, str]]
+
+
+class BatchPrefetcher(keras.utils.Sequence):
+    """The BatchPrefetcher class wraps a Dataset and computes its batches ahead of time
+    on a pool of worker processes. It can be passed to keras methods like fit,
+    predict... as a drop-in replacement of the Dataset.
+
+    The rows of each batch (and their augmentation random state) are decided on the
+    main process (See `Dataset.batch_indices`), so ordering, shuffling and augmentation
+    are the same ones as iterating the Dataset directly. Processed batches are sent
+    back to the main process through shared memory blocks instead of being pickled.
+
+    Workers are started the first time a batch is requested, and hold a copy of the
+    dataset from that moment. Call `close` after modifying the wrapped dataset.
+
+    Attributes:
+        dataset: Wrapped dataset.
+        workers: Number of worker processes. If 0, batches are computed synchronously.
+        prefetch: Number of batches computed ahead of the requested one.
+    """
+
+    def __init__(self, dataset: "Dataset", workers: int = 2, prefetch: int = 4):
+        self.dataset = dataset
+        self.workers = workers
+        self.prefetch = prefetch
+
+        self._pool: Optional["multiprocessing.pool.Pool"] = None
+        self._pending: Dict[int, "AsyncResult"] = {}
+
+    def __len__(self) -> int:
+        """Returns the length of the wrapped dataset (in batches)."""
+        return len(self.dataset)
+
+    def __getitem__(self, idx: int) -> Tuple["np.array", "np.array"]:
+        """Returns the batch `idx`, and schedules the computation of the next
+        `prefetch` batches."""
+        if self.workers <= 0:
+            return self.dataset[idx]
+
+        for batch_idx in range(idx, min(idx + self.prefetch + 1, len(self))):
+            self._schedule(batch_idx)
+
+        if idx not in self._pending:
+            self._schedule(idx)
+
+        batch = self._pending.pop(idx).get()
+
+        return tuple(_from_shared_memory(handle) for handle in batch)
+
+    def on_epoch_end(self):
+        """Discards the batches computed ahead, and lets the dataset prepare the next
+        epoch (Drawing a new permutation, for example)."""
+        self._discard_pending()
+
+        self.dataset.on_epoch_end()
+
+    def close(self):
+        """Stops the worker processes."""
+        self._discard_pending()
+
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _schedule(self, idx: int):
+        if idx in self._pending:
+            return
+
+        if self._pool is None:
+            if resource_tracker is not None:
+                # Workers must share the tracker of this process, as the shared memory
+                # blocks they create are released here
+                resource_tracker.ensure_running()
+
+            self._pool = multiprocessing.Pool(
+                self.workers, initializer=_init_worker, initargs=(self.dataset,)
+            )
+
+        self._pending[idx] = self._pool.apply_async(
+            _process_batch,
+            (self.dataset.batch_indices(idx), self.dataset.batch_random_state(idx)),
+        )
+
+    def _discard_pending(self):
+        for result in self._pending.values():
+            for handle in result.get():
+                _from_shared_memory(handle)
+
+        self._pending.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    def __getstate__(self) -> dict:
+        return {
+            "dataset": self.dataset,
+            "workers": self.workers,
+            "prefetch": self.prefetch,
+        }
+
+    def __setstate__(self, new_state: dict):
+        self.__init__(**new_state)
+
+    def __str__(self):
+        return f"BatchPrefetcher ({self.dataset}, workers={self.workers})"
+
+
+def _init_worker(dataset: "Dataset"):
+    global _WORKER_DATASET
+    _WORKER_DATASET = dataset
+
+
+def _process_batch(indices, random_state) -> Tuple[SharedArrayHandle, ...]:
+    return tuple(
+        _to_shared_memory(array)
+        for array in _WORKER_DATASET.take(indices, random_state=random_state)
+    )
+
+
+def _to_shared_memory(array: "np.ndarray") -> SharedArrayHandle:
+    """Copies `array` to a new shared memory block and returns a handle to it. Arrays
+    that can't be shared (Python objects, empty arrays...) are returned as they are."""
+    array = np.ascontiguousarray(array)
+
+    if shared_memory is None or array.dtype.hasobject or array.nbytes == 0:
+        return array
+
+    block = shared_memory.SharedMemory(create=True, size=array.nbytes)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    block.close()
+
+    return (block.name, array.shape, array.dtype.str)
+
+
+def _from_shared_memory(handle: SharedArrayHandle) -> "np.ndarray":
+    """Returns the array referenced by `handle`, releasing its shared memory block."""
+    if isinstance(handle, np.ndarray):
+        return handle
+
+    name, shape, dtype = handle
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
@@ -1,12 +1,16 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import TYPE_CHECKING, Any, List, Tuple
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple, Union
 
 import numpy as np
+import tensorflow as tf
 from tensorflow import keras
 
+from .batch_cache import BatchCache
 from .datatype import Numeric
+from .growable_array import GrowableArray
 
 if TYPE_CHECKING:
     from .datatype import DataType
@@ -26,12 +30,40 @@ class Dataset(keras.utils.Sequence):
         x_type: Datatype of x array.
         y_type: Datatype of y array.
         batch_size: Batch size.
+        shuffle: If the rows are shuffled on each epoch.
+        seed: Seed used for shuffling the rows and augmenting the batches.
+        augment: If the batches returned by `__getitem__` are randomly augmented by the
+            datatypes that support it (See `ImageArray.augmentation`). Each batch is
+            augmented with its own random state, derived from the seed, the epoch and
+            the batch index, so augmentation is reproducible even when batches are
+            computed out of order or on other processes.
+        bucket_by_length: If rows of similar lengths are batched together, for x
+            datatypes of variable length (See `DataType.lengths`). Each epoch, the rows
+            (shuffled if `shuffle` is True) are split into pools of `BucketPoolBatches`
+            batches, sorted by length inside each pool, and cut into batches. Batches
+            are served in random order when shuffling. Reduces the padding of datatypes
+            like `PaddedSequence`.
+        cache: Cache of processed batches. Disabled by default (See `BatchCache`).
+
+    A Dataset can also be a view of another dataset (See `Dataset.view`), sharing its
+    data arrays instead of copying them.
+
+    Data arrays are stored with the most compact dtype that the datatypes allow (See
+    `DataType.compact`), while processed batches have the dtype given by the
+    datatypes `dtype` attribute. Memory-mapped arrays aren't compacted, so they stay
+    on disk (Dataset formats compact the arrays they write instead).
     """
 
     class Role(Enum):
         Raw = 0
         Display = 1
 
+    # Number of batches whose rows are sorted by length together when bucketing
+    BucketPoolBatches = 100
+
+    # Memory used for computing the statistics of each chunk of rows
+    StatisticsChunkBytes = 64 * 1024 * 1024
+
     def __init__(
         self,
         x_data: "np.ndarray" = None,
@@ -39,26 +71,249 @@ class Dataset(keras.utils.Sequence):
         x_type: "DataType" = None,
         y_type: "DataType" = None,
         batch_size: int = 32,
+        shuffle: bool = False,
+        seed: Optional[int] = None,
+        cache_bytes: int = 0,
+        augment: bool = False,
+        bucket_by_length: bool = False,
     ):
-        # Data arrays
-        self.x = np.empty(0) if x_data is None else x_data
-        self.y = np.empty(0) if y_data is None else y_data
+        # Processed batches, keyed by (start, end, role, x_type key, y_type key)
+        self.cache = BatchCache(cache_bytes)
+
+        # Rows of the data arrays used by this dataset, if it's a view of another one.
+        # Can be None (All the rows), a contiguous slice or an array of indices.
+        self._rows: Optional[Union[slice, "np.ndarray"]] = None
+
+        # Shape and dtype of the processed items (See `Dataset.metadata`), computed
+        # once and valid while the datatypes keys are the same
+        self._metadata: Optional[dict] = None
+        self._metadata_key: Optional[tuple] = None
+
+        # Statistics of the stored data (See `Dataset.statistics`), valid while the
+        # datatypes keys are the same
+        self._statistics: Optional[dict] = None
+        self._statistics_key: Optional[tuple] = None
 
         # Data types
         self.x_type = Numeric() if x_type is None else x_type
         self.y_type = Numeric() if y_type is None else y_type
 
+        # Data arrays
+        self.x = np.empty(0) if x_data is None else x_data
+        self.y = np.empty(0) if y_data is None else y_data
+
         self.batch_size = batch_size
 
+        # Shuffling. Instead of permuting the data arrays, a permutation of the row
+        # indices is kept and batches are gathered through it.
+        self.shuffle = shuffle
+        self.seed = seed
+
+        self._rng = np.random.default_rng(seed)
+        self._permutation: Optional["np.ndarray"] = None
+
+        # Augmentation. The seed of the random state of each batch is drawn once
+        self.augment = augment
+        self._epoch = 0
+        self._augment_seed = np.random.SeedSequence(seed).entropy
+
+        # Bucketing. The batches of the current epoch are computed once
+        self.bucket_by_length = bucket_by_length
+        self._batches: Optional[List["np.ndarray"]] = None
+
     @property
-    def input_shape(self):
-        """Returns the shape of the `_x` array, or (0,) if not loaded/not defined."""
-        return self.x_type.process(self.x[0]).shape if len(self.x) > 0 else (0,)
+    def x(self) -> "np.ndarray":
+        """Returns the x array. On views created from indices or masks, the rows are
+        gathered (copied) on each access. Prefer `items` or `take` in that case."""
+        return self._x.array if self._rows is None else self._x.array[self._rows]
+
+    @x.setter
+    def x(self, x: "np.ndarray"):
+        self._check_not_view()
+
+        self._x = GrowableArray(_compact_data(self.x_type, x))
+        self._metadata = None
+        self._statistics = None
+        self._batches = None
+        self.cache.clear()
 
     @property
-    def output_shape(self):
-        """Returns the shape of the `y` array, or (0,) if not loaded/not defined."""
-        return self.y_type.process(self.y[0]).shape if len(self.y) else (0,)
+    def y(self) -> "np.ndarray":
+        """Returns the y array. See `x`."""
+        return self._y.array if self._rows is None else self._y.array[self._rows]
+
+    @y.setter
+    def y(self, y: "np.ndarray"):
+        self._check_not_view()
+
+        self._y = GrowableArray(_compact_data(self.y_type, y))
+        self._metadata = None
+        self._statistics = None
+        self._batches = None
+        self.cache.clear()
+
+    @property
+    def x_type(self) -> "DataType":
+        return self._x_type
+
+    @x_type.setter
+    def x_type(self, x_type: "DataType"):
+        self._x_type = x_type
+        self._metadata = None
+        self.cache.clear()
+
+    @property
+    def y_type(self) -> "DataType":
+        return self._y_type
+
+    @y_type.setter
+    def y_type(self, y_type: "DataType"):
+        self._y_type = y_type
+        self._metadata = None
+        self.cache.clear()
+
+    @property
+    def input_shape(self) -> tuple:
+        """Returns the shape of a processed `x` item, or (0,) if not loaded/not
+        defined."""
+        return self.metadata()["input_shape"]
+
+    @property
+    def output_shape(self) -> tuple:
+        """Returns the shape of a processed `y` item, or (0,) if not loaded/not
+        defined."""
+        return self.metadata()["output_shape"]
+
+    @property
+    def input_dtype(self) -> Optional[str]:
+        """Returns the dtype of the processed `x` items, or None if not loaded/not
+        defined."""
+        return self.metadata()["input_dtype"]
+
+    @property
+    def output_dtype(self) -> Optional[str]:
+        """Returns the dtype of the processed `y` items, or None if not loaded/not
+        defined."""
+        return self.metadata()["output_dtype"]
+
+    def metadata(self) -> dict:
+        """Returns the shape and dtype of the processed x and y items.
+
+        They're computed by processing the first row of the dataset only once, and are
+        computed again when the data or the datatypes change.
+        """
+        key = (self.x_type.cache_key(), self.y_type.cache_key())
+
+        if self._metadata is None or self._metadata_key != key:
+            self._metadata = self._compute_metadata()
+            self._metadata_key = key
+
+        return self._metadata
+
+    def restore_metadata(self, metadata: dict):
+        """Sets the metadata of the dataset (Previously returned by
+        `Dataset.metadata`), so it doesn't need to be computed again."""
+        self._metadata = {
+            "input_shape": tuple(metadata["input_shape"]),
+            "output_shape": tuple(metadata["output_shape"]),
+            "input_dtype": metadata["input_dtype"],
+            "output_dtype": metadata["output_dtype"],
+        }
+        self._metadata_key = (self.x_type.cache_key(), self.y_type.cache_key())
+
+    def statistics(self, chunk_size: Optional[int] = None, workers: int = 1) -> dict:
+        """Returns statistics of the stored x and y data, as {"x": ..., "y": ...}.
+
+        Which statistics are computed depends on the datatype (See
+        `DataType.statistics_accumulator`): for example, the per-feature mean, std, min
+        and max of numeric arrays, or the number of rows of each category. Datatypes
+        without statistics return None.
+
+        The data is read in a single pass, `chunk_size` rows at a time, without
+        processing it. By default, the chunk size is derived from the size of the rows,
+        so each chunk takes around `StatisticsChunkBytes` while computing its
+        statistics (As float64 values). Chunks can be read on several `workers`
+        threads, merging their partial results, so up to `workers` chunks are in
+        memory at once. The statistics are cached until the data or the datatypes
+        change.
+        """
+        key = (self.x_type.cache_key(), self.y_type.cache_key())
+
+        if self._statistics is not None and self._statistics_key == key:
+            return self._statistics
+
+        if chunk_size is None:
+            chunk_size = self._statistics_chunk_size()
+
+        def chunk_statistics(start):
+            x, y = self._gather(slice(start, start + chunk_size))
+            accumulators = (
+                self.x_type.statistics_accumulator(),
+                self.y_type.statistics_accumulator(),
+            )
+
+            return tuple(
+                None if accumulator is None else accumulator.update(data)
+                for accumulator, data in zip(accumulators, (x, y))
+            )
+
+        starts = range(0, self.row_count(), chunk_size)
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                chunks_statistics = list(executor.map(chunk_statistics, starts))
+        else:
+            chunks_statistics = [chunk_statistics(start) for start in starts]
+
+        accumulators = [
+            self.x_type.statistics_accumulator(),
+            self.y_type.statistics_accumulator(),
+        ]
+
+        for chunk_accumulators in chunks_statistics:
+            for accumulator, chunk_accumulator in zip(accumulators, chunk_accumulators):
+                if accumulator is not None:
+                    accumulator.merge(chunk_accumulator)
+
+        x_statistics, y_statistics = (
+            None if accumulator is None else accumulator.result()
+            for accumulator in accumulators
+        )
+
+        self._statistics = {"x": x_statistics, "y": y_statistics}
+        self._statistics_key = key
+
+        return self._statistics
+
+    def _statistics_chunk_size(self) -> int:
+        """Returns the number of rows whose statistics take `StatisticsChunkBytes`.
+        Accumulators work on float64 copies of the rows, plus a temporary array of the
+        same size (See `RunningMoments.update`)."""
+        row_values = max(
+            int(np.prod(self._x.array.shape[1:])),
+            int(np.prod(self._y.array.shape[1:])),
+            1,
+        )
+
+        return max(self.StatisticsChunkBytes // (2 * 8 * row_values), 1)
+
+    def _compute_metadata(self) -> dict:
+        if self.row_count() == 0:
+            return {
+                "input_shape": (0,),
+                "output_shape": (0,),
+                "input_dtype": None,
+                "output_dtype": None,
+            }
+
+        x, y = self._preprocess_data(*self._gather(slice(0, 1)))
+
+        return {
+            "input_shape": self.x_type.item_shape(x.shape[1:]),
+            "output_shape": self.y_type.item_shape(y.shape[1:]),
+            "input_dtype": x.dtype.name,
+            "output_dtype": y.dtype.name,
+        }
 
     def insert(self, position: int, x: List[Any], y: List[Any]):
         """Inserts x and y elements at the given position.
@@ -66,16 +321,96 @@ class Dataset(keras.utils.Sequence):
         Raises:
             ValueError: If the two lists don't have the same length.
         """
+        self._check_not_view()
+
         if len(x) != len(y):
             raise ValueError(f"Can't insert {len(x)} values on x and {len(y)} on y!")
 
-        self.x = np.insert(self.x, position, x, axis=0)
-        self.y = np.insert(self.y, position, y, axis=0)
+        if position < 0:
+            position += self.row_count()
+
+        self._x.insert(position, x)
+        self._y.insert(position, y)
+
+        self._invalidate_rows_from(position)
+        self._statistics = None
+        self._batches = None
+
+        if position <= 0 or self.row_count() == len(x):
+            # The first row has changed
+            self._metadata = None
 
     def delete_rows(self, start: int, n: int = 1):
         """Deletes `n` rows at `start` position, including `start`"""
-        self.x = np.delete(self.x, range(start, start + n), axis=0)
-        self.y = np.delete(self.y, range(start, start + n), axis=0)
+        self._check_not_view()
+
+        if start < 0:
+            start += self.row_count()
+
+        self._x.delete(start, n)
+        self._y.delete(start, n)
+
+        self._invalidate_rows_from(start)
+        self._statistics = None
+        self._batches = None
+
+        if start == 0:
+            self._metadata = None
+
+    def compact(self):
+        """Releases the extra capacity reserved for inserting rows (See
+        `GrowableArray`), and stores the data with the most compact dtypes (See
+        `DataType.compact`), including memory-mapped data, which isn't compacted when
+        set (It's read into memory). Dataset formats don't need this, as they compact
+        the arrays they write.
+
+        Views only release the extra capacity, as they share the data arrays."""
+        self._x.compact()
+        self._y.compact()
+
+        if self.is_view():
+            return
+
+        changed = False
+
+        for name, datatype in (("_x", self.x_type), ("_y", self.y_type)):
+            array = getattr(self, name).array
+            compacted = datatype.compact(array)
+
+            if compacted is not array:
+                # Compacted memory-mapped arrays are in memory, although numpy keeps
+                # their memmap type
+                setattr(self, name, GrowableArray(np.asarray(compacted)))
+                changed = True
+
+        if changed:
+            self._metadata = None
+
+    def view(self, rows: Union[slice, "np.ndarray"]) -> "Dataset":
+        """Returns a dataset with the rows specified by `rows` (A slice, an array of
+        indices or a boolean mask) that shares the data arrays of this dataset.
+
+        No data is copied: rows are gathered from the shared arrays when items or
+        batches are requested. The view uses the datatypes and batch size of this
+        dataset. Views can't be modified, and won't reflect insertions or deletions
+        made on this dataset after creating them (The next modification of this
+        dataset copies its arrays, instead of moving the shared rows in place).
+
+        Raises:
+            IndexError: If any of the rows is out of bounds.
+        """
+        view = Dataset(
+            x_type=self.x_type, y_type=self.y_type, batch_size=self.batch_size
+        )
+        view._x = self._x.share()
+        view._y = self._y.share()
+        view._rows = self._storage_rows(rows)
+
+        return view
+
+    def is_view(self) -> bool:
+        """Returns if this dataset is a view of another dataset."""
+        return self._rows is not None
 
     def head(self, n: int = 10, role: "Role" = Role.Raw) -> Tuple[List, List]:
         """Returns the first `n` items on the dataset."""
@@ -87,45 +422,304 @@ class Dataset(keras.utils.Sequence):
         """Returns the `n` elements between start and end as a tuple of (x, y) items
         Range is EXCLUSIVE [start, end).
         """
-        x_set, y_set = self._preprocess_data(self.x[start:end], self.y[start:end], role)
-        return x_set, y_set
+        return self.take(slice(start, end), role)
 
     def row_count(self) -> int:
         """Returns the number of rows on the dataset."""
-        return len(self.x)
+        if isinstance(self._rows, slice):
+            return self._rows.stop - self._rows.start
+
+        return len(self._x if self._rows is None else self._rows)
 
     def __len__(self) -> int:
         """Returns the length of the dataset (in batches)."""
-        return int(np.ceil(len(self.x) / float(self.batch_size)))
+        return int(np.ceil(self.row_count() / float(self.batch_size)))
 
     def __getitem__(self, idx: int) -> Tuple["np.array", "np.array"]:
         """Returns the batch of items starting at `idx`."""
+        return self.take(
+            self.batch_indices(idx), random_state=self.batch_random_state(idx)
+        )
+
+    def on_epoch_end(self):
+        """Draws a new permutation of the rows if the dataset is shuffled, and moves
+        the augmentation to the next epoch."""
+        self._epoch += 1
+        self._batches = None
+
+        if self.shuffle:
+            self._permutation = self._rng.permutation(self.row_count())
+
+    def to_tf_dataset(
+        self,
+        shuffle: Optional[bool] = None,
+        cache: bool = False,
+        prefetch: bool = True,
+        num_parallel_calls: Optional[int] = None,
+    ) -> "tf.data.Dataset":
+        """Returns a `tf.data.Dataset` that yields the batches of this dataset.
+
+        The pipeline works on row indices: they're (optionally) shuffled and grouped in
+        batches, and each batch is gathered from the data arrays (or memmaps) and
+        processed by the datatypes (including their transformations) on a parallel
+        `map` stage.
+
+        Args:
+            shuffle: If the rows are shuffled on each epoch. Defaults to `self.shuffle`.
+            cache: If the processed batches are cached after the first epoch. Then,
+                shuffling reorders whole batches instead of rows.
+            prefetch: If batches are prepared while the current one is being consumed.
+            num_parallel_calls: Number of batches processed in parallel. Autotuned by
+                default.
+
+        Raises:
+            ValueError: If the dataset is empty.
+        """
+        if self.row_count() == 0:
+            raise ValueError("Can't create a tf.data.Dataset from an empty dataset!")
+
+        autotune = tf.data.experimental.AUTOTUNE
+        shuffle = self.shuffle if shuffle is None else shuffle
+        if num_parallel_calls is None:
+            num_parallel_calls = autotune
+
+        metadata = self.metadata()
+        x_dtype = np.dtype(metadata["input_dtype"])
+        y_dtype = np.dtype(metadata["output_dtype"])
+
+        def load_batch(indices):
+            x, y = self.take(np.sort(indices))
+            return x.astype(x_dtype, copy=False), y.astype(y_dtype, copy=False)
+
+        def tf_load_batch(indices):
+            x, y = tf.numpy_function(
+                load_batch, [indices], [tf.as_dtype(x_dtype), tf.as_dtype(y_dtype)]
+            )
+            x.set_shape((None,) + tuple(metadata["input_shape"]))
+            y.set_shape((None,) + tuple(metadata["output_shape"]))
+
+            return x, y
+
+        rows = tf.data.Dataset.range(self.row_count())
+
+        if shuffle and not cache:
+            rows = rows.shuffle(self.row_count(), seed=self.seed)
+
+        batches = rows.batch(self.batch_size).map(
+            tf_load_batch, num_parallel_calls=num_parallel_calls
+        )
+
+        if cache:
+            batches = batches.cache()
+
+            if shuffle:
+                batches = batches.shuffle(len(self), seed=self.seed)
+
+        if prefetch:
+            batches = batches.prefetch(autotune)
+
+        return batches
+
+    def batch_indices(self, idx: int) -> Union[slice, "np.ndarray"]:
+        """Returns the rows of the batch `idx`. If the dataset is shuffled or bucketed
+        the rows are returned as an array of indices (Sorted, so rows are read in
+        storage order). Otherwise, they're returned as a slice."""
+        if self.bucket_by_length:
+            return self._get_bucketed_batches()[idx]
+
         batch_start = idx * self.batch_size
         batch_end = (idx + 1) * self.batch_size
 
-        batch_x = self.x[batch_start:batch_end]
-        batch_y = self.y[batch_start:batch_end]
+        if not self.shuffle:
+            return slice(batch_start, batch_end)
+
+        return np.sort(self._get_permutation()[batch_start:batch_end])
+
+    def _get_permutation(self) -> "np.ndarray":
+        """Returns the permutation of the rows of the current epoch."""
+        if self._permutation is None or len(self._permutation) != self.row_count():
+            self._permutation = self._rng.permutation(self.row_count())
+
+        return self._permutation
+
+    def _get_bucketed_batches(self) -> List["np.ndarray"]:
+        """Returns the rows of each batch of the current epoch, grouped by length (See
+        `bucket_by_length`).
+
+        Raises:
+            ValueError: If the x datatype doesn't have lengths.
+        """
+        row_count = self.row_count()
+
+        if self._batches is not None and sum(map(len, self._batches)) == row_count:
+            return self._batches
+
+        lengths = self.x_type.lengths(self.x)
+        if lengths is None:
+            raise ValueError(f"Can't bucket by length rows of type {self.x_type}")
+
+        rows = self._get_permutation() if self.shuffle else np.arange(row_count)
 
-        batch_x, batch_y = self._preprocess_data(
-            self.x[batch_start:batch_end], self.y[batch_start:batch_end]
+        # Sort the rows by pool, and by length inside each pool. Pools are made of
+        # whole batches, so no batch takes rows from two pools
+        pools = np.arange(row_count) // (self.batch_size * self.BucketPoolBatches)
+        rows = rows[np.lexsort((lengths[rows], pools))]
+
+        boundaries = range(self.batch_size, row_count, self.batch_size)
+        batches = [np.sort(batch) for batch in np.split(rows, boundaries)]
+
+        if self.shuffle:
+            batches = [batches[i] for i in self._rng.permutation(len(batches))]
+
+        self._batches = batches
+
+        return self._batches
+
+    def batch_random_state(self, idx: int) -> Optional["np.random.Generator"]:
+        """Returns the random state used for augmenting the batch `idx` on the current
+        epoch, or None if the dataset isn't augmented."""
+        if not self.augment:
+            return None
+
+        return np.random.default_rng([self._augment_seed, self._epoch, idx])
+
+    def take(
+        self,
+        indices: Union[slice, "np.ndarray"],
+        role: "Role" = Role.Raw,
+        random_state: Optional["np.random.Generator"] = None,
+    ) -> Tuple["np.array", "np.array"]:
+        """Returns the items on the rows specified by `indices` (A slice or an array of
+        row indices) as a tuple of (x, y) items.
+
+        If a `random_state` is passed, the items are randomly augmented with it (See
+        `Dataset.augment`), and aren't cached. Otherwise, if the cache is enabled, the
+        items of contiguous ranges are cached.
+        """
+        if random_state is not None:
+            return self._preprocess_data(*self._gather(indices), role, random_state)
+
+        if not self.cache.enabled or not isinstance(indices, slice):
+            return self._preprocess_data(*self._gather(indices), role)
+
+        start, end, step = indices.indices(self.row_count())
+        if step != 1:
+            return self._preprocess_data(*self._gather(indices), role)
+
+        key = (
+            start,
+            max(start, end),
+            role,
+            self.x_type.cache_key(),
+            self.y_type.cache_key(),
         )
 
-        return batch_x, batch_y
+        items = self.cache.get(key)
+        if items is None:
+            items = self._preprocess_data(*self._gather(slice(start, end)), role)
+            self.cache.put(key, items)
+
+        return items
+
+    def _gather(
+        self, indices: Union[slice, "np.ndarray"]
+    ) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Returns the (unprocessed) x and y rows specified by `indices`."""
+        rows = indices if self._rows is None else self._storage_rows(indices)
+
+        return self._x.array[rows], self._y.array[rows]
+
+    def _storage_rows(
+        self, rows: Union[slice, "np.ndarray"]
+    ) -> Union[slice, "np.ndarray"]:
+        """Translates `rows` of this dataset to rows of the data arrays. Contiguous
+        slices are kept as slices, so they can be read without copying.
+
+        Raises:
+            IndexError: If any of the rows is out of bounds.
+        """
+        row_count = self.row_count()
+        offset = self._rows.start if isinstance(self._rows, slice) else 0
+
+        if isinstance(rows, slice):
+            start, stop, step = rows.indices(row_count)
+
+            if step == 1 and not isinstance(self._rows, np.ndarray):
+                return slice(offset + start, offset + max(start, stop))
+
+            indices = np.arange(start, stop, step)
+
+        else:
+            indices = np.asarray(rows)
+
+            if indices.dtype == bool:
+                if len(indices) != row_count:
+                    raise IndexError(
+                        f"Mask of length {len(indices)} for {row_count} rows"
+                    )
+
+                indices = np.flatnonzero(indices)
+
+            indices = indices.astype(np.intp)
+            indices = np.where(indices < 0, indices + row_count, indices)
+
+            if indices.size and (indices.min() < 0 or indices.max() >= row_count):
+                raise IndexError(f"Rows out of bounds for {row_count} rows")
+
+        if isinstance(self._rows, np.ndarray):
+            return self._rows[indices]
+
+        return indices + offset
+
+    def _check_not_view(self):
+        if self.is_view():
+            raise ValueError("Dataset views can't be modified!")
+
+    def _invalidate_rows_from(self, row: int):
+        """Removes from the cache all the batches that include rows from `row` onwards,
+        as their content has been displaced."""
+        self.cache.invalidate(lambda key: key[1] > row)
 
     def _preprocess_data(
-        self, x_data: "np.array", y_data: "np.array", role: "Role" = Role.Raw
+        self,
+        x_data: "np.array",
+        y_data: "np.array",
+        role: "Role" = Role.Raw,
+        random_state: Optional["np.random.Generator"] = None,
     ) -> Tuple["np.array", "np.array"]:
         """ Preprocess the data. For example, if the image is a path to a file, load it
         and return the corresponding array.
+
+        The data is processed in batches (See `DataType.process_batch`), so datatypes
+        with a vectorized implementation don't iterate over each element.
         """
-        if role == self.Role.Raw:
-            x_data = np.array([self.x_type.process(element) for element in x_data])
-            y_data = np.array([self.y_type.process(element) for element in y_data])
+        if role == self.Role.Raw and random_state is not None:
+            x_data = self.x_type.process_batch(x_data, random_state=random_state)
+            y_data = self.y_type.process_batch(y_data, random_state=random_state)
+        elif role == self.Role.Raw:
+            x_data = self.x_type.process_batch(x_data)
+            y_data = self.y_type.process_batch(y_data)
         elif role == self.Role.Display:
-            x_data = np.array([self.x_type.display(element) for element in x_data])
-            y_data = np.array([self.y_type.display(element) for element in y_data])
+            x_data = self.x_type.display_batch(x_data)
+            y_data = self.y_type.display_batch(y_data)
 
         return (x_data, y_data)
 
     def __str__(self):
         return f"Dataset (x={self.x_type}, y={self.y_type})"
+
+
+def _compact_data(datatype: "DataType", data: "np.ndarray") -> "np.ndarray":
+    """Returns `data` with the most compact dtype for the datatype (See
+    `DataType.compact`).
+
+    Memory-mapped and read-only arrays are returned untouched, as compacting them would
+    read the whole array into memory. Dataset formats compact the arrays they write
+    instead (See `DatasetIO`).
+    """
+    data = np.asanyarray(data)
+
+    if isinstance(data, np.memmap) or not data.flags.writeable:
+        return data
+
+    return datatype.compact(data)
@@ -2,19 +2,41 @@
 
 """DataTypes used by the datasets."""
 
+from .augmentation import ImageAugmentation
 from .categorical import Categorical
+from .compressedimage import CompressedImage
 from .datatype import DataType, DataTypeContainer
 from .imagearray import ImageArray
 from .imagepath import ImagePath
 from .numeric import Numeric
 from .numericarray import NumericArray
+from .paddedsequence import PaddedSequence
+from .sparsearray import SparseArray
+from .transformation import (
+    BatchFunction,
+    Clip,
+    Elementwise,
+    Normalize,
+    Pipeline,
+    Transformation,
+)
 
 __all__ = [
+    "BatchFunction",
     "Categorical",
+    "Clip",
+    "CompressedImage",
     "DataType",
+    "Elementwise",
     "ImageArray",
+    "ImageAugmentation",
     "ImagePath",
     "Numeric",
+    "Normalize",
     "NumericArray",
+    "PaddedSequence",
+    "Pipeline",
+    "SparseArray",
+    "Transformation",
     "DataTypeContainer",
 ]
@@ -0,0 +1,101 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+
+
+class ImageAugmentation:
+    """The ImageAugmentation class applies random flips, shifts (crops of the padded
+    image) and brightness changes to batches of images.
+
+    The whole batch is augmented at once, on its stored dtype (uint8 pixels), before
+    being processed. Random values are drawn from the generator passed on each call, so
+    the same generator state always produces the same batch.
+
+    Attributes:
+        horizontal_flip: If images are flipped horizontally with probability 0.5.
+        vertical_flip: If images are flipped vertically with probability 0.5.
+        max_shift: Maximum number of pixels that images are shifted on each axis. The
+            uncovered pixels are filled with the closest edge pixels.
+        brightness: Maximum brightness change, as a fraction of the pixel range (0-1).
+    """
+
+    def __init__(
+        self,
+        horizontal_flip: bool = False,
+        vertical_flip: bool = False,
+        max_shift: int = 0,
+        brightness: float = 0.0,
+    ):
+        self.horizontal_flip = horizontal_flip
+        self.vertical_flip = vertical_flip
+        self.max_shift = max_shift
+        self.brightness = brightness
+
+    def __call__(
+        self, batch: "np.ndarray", random_state: "np.random.Generator"
+    ) -> "np.ndarray":
+        """Returns an augmented copy of a batch of images with shape (N, H, W) or (N,
+        H, W, C)."""
+        batch = np.asarray(batch)
+
+        if len(batch) == 0:
+            return batch
+
+        batch_size, height, width = batch.shape[:3]
+        batch_indices = np.arange(batch_size)[:, np.newaxis, np.newaxis]
+
+        # Rows and columns of the source image that go to each output pixel. Flips and
+        # shifts are combined into a single gather
+        rows = np.broadcast_to(np.arange(height), (batch_size, height))
+        cols = np.broadcast_to(np.arange(width), (batch_size, width))
+
+        if self.vertical_flip:
+            flipped = random_state.random(batch_size) < 0.5
+            rows = np.where(flipped[:, np.newaxis], rows[:, ::-1], rows)
+
+        if self.horizontal_flip:
+            flipped = random_state.random(batch_size) < 0.5
+            cols = np.where(flipped[:, np.newaxis], cols[:, ::-1], cols)
+
+        if self.max_shift > 0:
+            shifts = random_state.integers(
+                -self.max_shift, self.max_shift + 1, size=(2, batch_size, 1)
+            )
+            rows = np.clip(rows + shifts[0], 0, height - 1)
+            cols = np.clip(cols + shifts[1], 0, width - 1)
+
+        batch = batch[batch_indices, rows[:, :, np.newaxis], cols[:, np.newaxis, :]]
+
+        if self.brightness > 0:
+            batch = self._change_brightness(batch, random_state)
+
+        return batch
+
+    def _change_brightness(
+        self, batch: "np.ndarray", random_state: "np.random.Generator"
+    ) -> "np.ndarray":
+        deltas = random_state.uniform(
+            -self.brightness, self.brightness, size=len(batch)
+        ) * 255
+        deltas = deltas.reshape((-1,) + (1,) * (batch.ndim - 1))
+
+        if batch.dtype == np.uint8:
+            # int16 can hold any uint8 value plus the change
+            changed = batch.astype(np.int16)
+            changed += np.rint(deltas).astype(np.int16)
+        else:
+            changed = batch + deltas
+
+        return np.clip(changed, 0, 255, out=changed).astype(batch.dtype, copy=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "horizontal_flip": self.horizontal_flip,
+            "vertical_flip": self.vertical_flip,
+            "max_shift": self.max_shift,
+            "brightness": self.brightness,
+        }
+
+    @classmethod
+    def from_dict(cls, dc: dict) -> "ImageAugmentation":
+        return cls(**dc)
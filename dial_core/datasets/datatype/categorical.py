@@ -1,11 +1,11 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
-from typing import Callable, List, Union
+from typing import Callable, Dict, List, Optional, Union
 
 import dependency_injector.providers as providers
 import numpy as np
-from tensorflow import keras
 
+from ..statistics import CategoryCounts
 from .datatype import DataType, DataTypeContainer
 
 
@@ -17,13 +17,21 @@ class Categorical(DataType):
     (also named class).
 
     On memory, categories are stored as an interger, each one representing an index on
-    the `categories` array.
+    the `categories` array (Using the smallest unsigned integer dtype that can hold
+    all the indices).
 
     When categories are __processed__, they are transformed to the "one-hot-encoding"
-    format (see `self.process` for more information).
+    format (see `self.process` for more information), with the dtype given by `dtype`
+    (float32 by default). Rows are taken from a cached identity matrix, so a whole
+    batch is encoded with a single indexing operation.
+
+    On sparse mode, categories are processed as int32 indices instead, as expected by
+    losses like `sparse_categorical_crossentropy`. Useful with many categories, where
+    one-hot batches are big.
 
     Attributes:
         categories: List of all the categories used by this datatype.
+        sparse: If categories are processed as indices instead of one-hot vectors.
 
     Examples:
         for categories = ["a", "b", "c"]:
@@ -34,15 +42,34 @@ class Categorical(DataType):
         "c" == [0, 0, 1] == 2 == [2]
     """
 
-    def __init__(self, categories: List[str] = []):
+    DefaultDtype = "float32"
+    SparseDtype = "int32"
+
+    def __init__(self, categories: List[str] = [], sparse: bool = False):
         super().__init__()
 
         self.is_editable = True
 
         self.categories = categories
+        self.sparse = sparse
+
+        # Identity matrix used for one-hot encoding, built when first needed
+        self._one_hot_table: Optional["np.ndarray"] = None
 
         self.transformations: List[Callable] = []
 
+    @property
+    def categories(self) -> List[str]:
+        return self._categories
+
+    @categories.setter
+    def categories(self, categories: List[str]):
+        self._categories = categories
+
+        # Index of each category name, for converting names in constant time. The list
+        # can be modified in place, so it's validated on each lookup
+        self._category_indices: Dict[str, int] = {}
+
     def process(self, data: int) -> List[int]:
         """Returns `data` on the one-hot-encoding format.
 
@@ -56,12 +83,25 @@ class Categorical(DataType):
             data = 2   Output: [0, 0, 1]
             data = 100 Output: Raises IndexError
 
+        On sparse mode, `data` is returned as an int32 index.
+
         Raises:
             IndexError: if `data` is out of bounds of the `categories` array.
         """
-        return self._apply_transformations(
-            keras.utils.to_categorical(data, len(self.categories))
-        )
+        return self._apply_transformations(self._encode(data).copy())
+
+    def process_batch(
+        self, data: "np.ndarray", random_state: Optional["np.random.Generator"] = None
+    ) -> "np.ndarray":
+        """Returns a batch of category indices on the one-hot-encoding format.
+
+        The whole batch is encoded with a single indexing operation over an identity
+        matrix. On sparse mode, the batch is returned as int32 indices.
+
+        Raises:
+            IndexError: if any value is out of bounds of the `categories` array.
+        """
+        return self._apply_batch_transformations(self._encode(data), source=data)
 
     def display(self, data: int) -> str:
         """Returns `data` as the corresponding name of the category.
@@ -78,6 +118,16 @@ class Categorical(DataType):
         """
         return self.categories[data]
 
+    def display_batch(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns a batch of category indices as the corresponding category names.
+
+        Raises:
+            IndexError: if any value is out of bounds of the `categories` array.
+        """
+        indices = np.asarray(data).astype(np.intp)
+
+        return np.array(self.categories)[indices]
+
     def convert_to_expected_format(self, data: Union[str, int, list]) -> int:
         """
         Tries to transform an input value to the value expected to be stored on the
@@ -114,9 +164,12 @@ class Categorical(DataType):
 
             except ValueError:
                 # "foo"
-                data_as_int = self.categories.index(data)
+                try:
+                    data_as_int = self._category_index(data)
+                except KeyError:
+                    raise ValueError(f"{data} is not a valid category")
 
-        elif isinstance(data, int):
+        elif isinstance(data, (int, np.integer)):
             # 1
             data_as_int = data
 
@@ -135,9 +188,155 @@ class Categorical(DataType):
 
         raise ValueError
 
+    def convert_many(self, data: Union[list, "np.ndarray"]) -> "np.ndarray":
+        """Transforms many input values at once to the values expected to be stored on
+        the dataset (See `convert_to_expected_format`), returned as an array.
+
+        Values are converted with vectorized operations depending on their format:
+            * ints, or an array of shape (N, 1) of ints: Checked and returned.
+            * strings (Category names or ints): Each different string is converted only
+              once, and mapped to the values through `np.unique`.
+            * one-hot-encoding arrays, of shape (N, len(categories)): `argmax` of rows.
+
+        Examples:
+            categories => ["foo", "bar"]
+
+            convert_many(["bar", "foo", "1"]) == [1, 0, 1]
+            convert_many([[0, 1], [1, 0]]) == [1, 0]
+            convert_many([[1], [0]]) == [1, 0]
+
+        Raises:
+            ValueError: If any of the values can't be converted.
+        """
+        data = np.asarray(data)
+
+        if data.dtype.kind in "USO":
+            if data.ndim != 1:
+                raise ValueError(f"Can't convert values with shape {data.shape}")
+
+            try:
+                names, inverse = np.unique(data, return_inverse=True)
+
+            except TypeError:
+                # Mixed types, can't be sorted
+                return np.array([self.convert_to_expected_format(v) for v in data])
+
+            indices = np.array(
+                [self.convert_to_expected_format(name) for name in names], dtype=np.intp
+            )
+
+            return indices[inverse.ravel()]
+
+        if data.ndim == 2 and data.shape[1] == 1:
+            data = data[:, 0]
+
+        elif data.ndim == 2:
+            if data.shape[1] != len(self.categories):
+                raise ValueError(
+                    f"Can't convert {data.shape[1]} columns to {len(self.categories)} "
+                    "categories"
+                )
+
+            return np.argmax(data, axis=1)
+
+        if data.ndim != 1:
+            raise ValueError(f"Can't convert values with shape {data.shape}")
+
+        indices = data.astype(np.intp)
+
+        if data.size and (
+            (indices != data).any()
+            or indices.min() < 0
+            or indices.max() >= len(self.categories)
+        ):
+            raise ValueError("Values out of range of the categories")
+
+        return indices
+
+    def compact(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the category indices with the smallest unsigned integer dtype that
+        can hold all the categories. Non integral indices are returned untouched."""
+        data = np.asanyarray(data)
+
+        if data.dtype.kind not in "iuf" or data.size == 0:
+            return data
+
+        dtype = np.min_scalar_type(max(len(self.categories) - 1, 0))
+
+        if data.dtype == dtype or data.min() < 0 or data.max() > np.iinfo(dtype).max:
+            return data
+
+        if data.dtype.kind == "f" and not (np.mod(data, 1) == 0).all():
+            return data
+
+        return data.astype(dtype)
+
+    def statistics_accumulator(self) -> "CategoryCounts":
+        """Returns an accumulator of the number of rows of each category."""
+        return CategoryCounts(len(self.categories))
+
+    def cache_key(self) -> tuple:
+        return super().cache_key() + (self.sparse,) + tuple(self.categories)
+
+    def _encode(self, data: Union[int, "np.ndarray"]) -> "np.ndarray":
+        """Returns the category indices on `data` as one-hot vectors (Or as int32
+        indices on sparse mode).
+
+        Raises:
+            IndexError: if any value is out of bounds of the `categories` array.
+        """
+        indices = np.asarray(data).astype(np.intp)
+
+        categories_count = len(self.categories)
+
+        if indices.size and (indices.min() < 0 or indices.max() >= categories_count):
+            raise IndexError(f"Category index out of bounds: {data}")
+
+        if self.sparse:
+            return indices.astype(self.SparseDtype)
+
+        return self._get_one_hot_table()[indices]
+
+    def _category_index(self, name: str) -> int:
+        """Returns the index of a category name.
+
+        The indices are cached, and rebuilt when a name isn't found or its cached index
+        points to other category (Because the categories were modified in place).
+
+        Raises:
+            KeyError: If the name isn't a category.
+        """
+        index = self._category_indices.get(name)
+
+        if index is None or index >= len(self.categories) or (
+            self.categories[index] != name
+        ):
+            self._category_indices = {
+                category: i
+                for i, category in reversed(list(enumerate(self.categories)))
+            }
+            index = self._category_indices[name]
+
+        return index
+
+    def _get_one_hot_table(self) -> "np.ndarray":
+        """Returns the identity matrix used for one-hot encoding, rebuilding it if the
+        categories or the dtype changed."""
+        table = self._one_hot_table
+        dtype = np.dtype(self.dtype or self.DefaultDtype)
+
+        if table is None or len(table) != len(self.categories) or table.dtype != dtype:
+            table = np.eye(len(self.categories), dtype=dtype)
+            table.setflags(write=False)
+
+            self._one_hot_table = table
+
+        return table
+
     def __getstate__(self) -> dict:
         dc = super().__getstate__()
         dc["categories"] = self.categories
+        dc["sparse"] = self.sparse
 
         return dc
 
@@ -145,6 +344,8 @@ class Categorical(DataType):
         super().__setstate__(new_state)
 
         self.categories = new_state["categories"]
+        self.sparse = new_state.get("sparse", False)
+        self._one_hot_table = None
 
     def __reduce__(self):
         return (Categorical, (self.categories,), self.__getstate__())
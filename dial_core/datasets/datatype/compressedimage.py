@@ -0,0 +1,102 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import io
+from typing import List, Optional, Union
+
+import dependency_injector.providers as providers
+import numpy as np
+from PIL import Image
+
+from .datatype import DataTypeContainer
+from .imagearray import ImageArray
+from .imagepath import _decode_executor
+from .spans import SpanStorage
+
+
+class CompressedImage(SpanStorage, ImageArray):
+    """The CompressedImage class represents an image stored on memory encoded (As the
+    bytes of a PNG, JPEG... file), and decoded when it's processed.
+
+    The encoded bytes of all the images are kept by the datatype on a single contiguous
+    buffer (`blob`), and each row of the dataset is a (offset, length) pair pointing to
+    the bytes of one image. The blob is saved with the dataset by formats like
+    `NpzDatasetIO`, and can be a memory-mapped array.
+
+    Once decoded, images are processed like `ImageArray` ones (Pixels in the range
+    (0-1), augmentation, transformations...). Batches are decoded in parallel.
+    """
+
+    SpanArrays = {"blob": "uint8"}
+
+    def __init__(self, blob: Optional["np.ndarray"] = None):
+        super().__init__()
+
+        self._init_span_arrays(blob=blob)
+
+    @property
+    def blob(self) -> "np.ndarray":
+        """Returns the buffer with the encoded bytes of all the images."""
+        return self._span_array("blob")
+
+    def add_encoded(self, images: List[bytes]) -> "np.ndarray":
+        """Appends the encoded images to the blob. Returns their (offset, length)
+        rows, as an array of shape (N, 2)."""
+        return self._append_spans(
+            [len(image) for image in images],
+            blob=np.frombuffer(b"".join(images), dtype=np.uint8),
+        )
+
+    def process(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the decoded image with pixel values in the range (0-1)."""
+        return super().process(self.display(data))
+
+    def process_batch(
+        self, data: "np.ndarray", random_state: Optional["np.random.Generator"] = None
+    ) -> "np.ndarray":
+        """Returns a batch of decoded images with pixel values in the range (0-1)."""
+        return super().process_batch(self.display_batch(data), random_state)
+
+    def display(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the decoded image, and can be used to paint it."""
+        offset, length = (int(value) for value in data)
+
+        with Image.open(io.BytesIO(self.blob[offset : offset + length])) as image:
+            return np.array(image)
+
+    def display_batch(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns a batch of decoded images, decoded in parallel."""
+        if len(data) <= 1:
+            return np.array([self.display(span) for span in data])
+
+        return np.array(list(_decode_executor().map(self.display, data)))
+
+    def convert_to_expected_format(
+        self, data: Union[bytes, str, "np.ndarray"]
+    ) -> "np.ndarray":
+        """Stores the image on the blob, and returns its (offset, length) row.
+
+        The image can be passed as its encoded bytes, as the path to an image file or as
+        an array of pixels (Which is encoded as PNG).
+        """
+        if isinstance(data, str):
+            with open(data, "rb") as image_file:
+                data = image_file.read()
+
+        elif not isinstance(data, bytes):
+            with io.BytesIO() as encoded:
+                Image.fromarray(np.asarray(data, dtype=np.uint8)).save(
+                    encoded, format="PNG"
+                )
+                data = encoded.getvalue()
+
+        return self.add_encoded([data])[0]
+
+    def compact(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the (offset, length) rows untouched."""
+        return data
+
+    def statistics_accumulator(self):
+        return None
+
+
+DataTypeContainer.CompressedImage = providers.Factory(CompressedImage)
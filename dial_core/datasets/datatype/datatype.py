@@ -1,9 +1,12 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
 from abc import ABCMeta, abstractmethod
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict, List, Optional
 
 import dependency_injector.containers as containers
+import numpy as np
+
+from .transformation import Pipeline, Transformation
 
 
 class DataType(metaclass=ABCMeta):
@@ -14,11 +17,22 @@ class DataType(metaclass=ABCMeta):
 
     This class must provide an implementation for `process` and `display` methods. See
     the methods documentation for more information.
+
+    Attributes:
+        dtype: Dtype of the processed batches (For example, "float32" or "float16"), or
+            None for keeping the dtype of the data.
+        transformations: Transformations applied to the processed data. Plain
+            callables are applied to each element, while `Transformation` objects can
+            work on the whole batch, in place (See the `transformation` module).
     """
 
+    DefaultDtype: Optional[str] = None
+
     def __init__(self):
         self.is_editable = False
 
+        self.dtype = self.DefaultDtype
+
         self.transformations: List[Callable] = []
 
     @abstractmethod
@@ -37,6 +51,28 @@ class DataType(metaclass=ABCMeta):
         of the interger.
         """
 
+    def process_batch(
+        self, data: "np.ndarray", random_state: Optional["np.random.Generator"] = None
+    ) -> "np.ndarray":
+        """Returns a whole batch of data after processing given the data type.
+
+        By default, `process` is called for each element of the batch. Derived classes
+        can override this method to process the whole batch at once.
+
+        `random_state` is passed when the batch is used for training with random
+        augmentation enabled (See `Dataset.augment`). Datatypes without random
+        processing ignore it.
+        """
+        return np.array([self.process(element) for element in data])
+
+    def display_batch(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the display representation of a whole batch of data.
+
+        By default, `display` is called for each element of the batch. Derived classes
+        can override this method to display the whole batch at once.
+        """
+        return np.array([self.display(element) for element in data])
+
     @abstractmethod
     def convert_to_expected_format(self, data):
         """Transforms the passed data to a format expected to be stored by the dataset.
@@ -48,6 +84,61 @@ class DataType(metaclass=ABCMeta):
             ValueError: If the data can't be converted
         """
 
+    def compact(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the stored `data` using the most compact dtype that can represent
+        it without losing information (For example, uint8 for pixel values).
+
+        By default, data is returned untouched. The array is only copied if its dtype
+        changes.
+        """
+        return data
+
+    def lengths(self, data: "np.ndarray") -> Optional["np.ndarray"]:
+        """Returns the length of each of the stored rows on `data`, for datatypes of
+        variable length (Like sequences), or None for fixed size datatypes. Used for
+        batching rows of similar lengths together (See `Dataset.bucket_by_length`)."""
+        return None
+
+    def item_shape(self, shape: tuple) -> tuple:
+        """Returns the shape of the processed items, given the `shape` of one of them,
+        with None on the axes whose size changes between items or batches (Like the
+        steps of padded sequences). Used for the dataset metadata.
+
+        By default, all the items have the same shape.
+        """
+        return shape
+
+    def arrays(self) -> Dict[str, "np.ndarray"]:
+        """Returns the arrays that the datatype needs for processing the stored data,
+        besides its description (`to_dict`). For example, the buffer with the encoded
+        images of `CompressedImage`. Dataset formats save them with the dataset.
+
+        By default, datatypes don't have any array.
+        """
+        return {}
+
+    def set_arrays(self, arrays: Dict[str, "np.ndarray"]):
+        """Restores the arrays previously returned by `arrays`."""
+
+    def statistics_accumulator(self):
+        """Returns an accumulator (See the `statistics` module) that computes the
+        statistics of the stored data, or None if the datatype doesn't define any."""
+        return None
+
+    def cache_key(self) -> tuple:
+        """Returns a key that identifies how this datatype is processing the data. The
+        key changes when the processing changes (For example, when the transformations
+        or their parameters are modified), so it can be used for invalidating cached
+        results. Plain callables are identified by their identity only."""
+        return (
+            id(self),
+            self.dtype,
+            tuple(
+                f.cache_key() if isinstance(f, Transformation) else id(f)
+                for f in self.transformations
+            ),
+        )
+
     def to_dict(self):
         return self.__getstate__()
 
@@ -68,17 +159,37 @@ class DataType(metaclass=ABCMeta):
             return None
 
     def _apply_transformations(self, value: Any):
-        result = value
-        for f in self.transformations:
-            result = f(result)
+        if not self.transformations:
+            return value
+
+        return Pipeline(self.transformations).apply_to_element(value)
+
+    def _cast(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns a copy of `data` with the dtype of the processed batches. Always
+        copied (Once), so the returned batches never share memory with the stored
+        data, which can be modified or moved later."""
+        return np.array(data, dtype=self.dtype)
+
+    def _apply_batch_transformations(
+        self, batch: "np.ndarray", source: Optional["np.ndarray"] = None
+    ) -> "np.ndarray":
+        """Applies the transformations to an already processed batch, at once (See
+        `Pipeline`). Returns the batch untouched if there are no transformations
+        defined.
+
+        `source` is the data the batch was processed from, so the batch is copied
+        before being modified in place if it shares memory with it.
+        """
+        if not self.transformations:
+            return batch
 
-        return result
+        return Pipeline(self.transformations)(batch, source)
 
     def __getstate__(self) -> dict:
-        return {"class": str(self)}
+        return {"class": str(self), "dtype": self.dtype}
 
     def __setstate__(self, new_state: dict):
-        pass
+        self.dtype = new_state.get("dtype", self.DefaultDtype)
 
     def __reduce__(self):
         return (DataType, (), self.__getstate__())
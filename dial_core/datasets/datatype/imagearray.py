@@ -1,10 +1,12 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
-from typing import Callable, List
+from typing import Callable, List, Optional
 
 import dependency_injector.providers as providers
 import numpy as np
 
+from ..statistics import RunningMoments
+from .augmentation import ImageAugmentation
 from .datatype import DataType, DataTypeContainer
 
 
@@ -13,27 +15,54 @@ class ImageArray(DataType):
     The ImageArray class represents an image as amultidimensional array, each one with a
     pixel intensity.
 
-    Pixels are stored on memory with values between (0-255), but they're transformed to
-    the range (0-1) after the `process` method.
+    Pixels are stored on memory with values between (0-255) (As uint8 when possible),
+    but they're transformed to the range (0-1) after the `process` method, with the
+    dtype given by `dtype` (float32 by default).
 
     The array will have shape (W, H) for grayscale images, or (W, H, C), where C
     represents the number of color channels (For RGB images it would be 3, for example)
+
+    Attributes:
+        augmentation: Optional random augmentation applied to the (uint8) batches used
+            for training (See `ImageAugmentation` and `Dataset.augment`).
     """
 
+    DefaultDtype = "float32"
+
     def __init__(self):
         super().__init__()
 
+        self.augmentation: Optional["ImageAugmentation"] = None
+
         self.transformations: List[Callable] = []
 
     def process(self, data: "np.ndarray") -> "np.ndarray":
         """Returns `data` with pixel values in the range (0-1)."""
-        data = data / 255.0
+        data = _to_unit_range(data, self.dtype)
 
         if len(data.shape) == 2:
             data = np.expand_dims(data, axis=2)
 
         return self._apply_transformations(data)
 
+    def process_batch(
+        self, data: "np.ndarray", random_state: Optional["np.random.Generator"] = None
+    ) -> "np.ndarray":
+        """Returns a batch of images with pixel values in the range (0-1).
+
+        A batch of grayscale images (N, W, H) is expanded to (N, W, H, 1). If a
+        `random_state` is passed, the batch is augmented before being scaled.
+        """
+        if self.augmentation is not None and random_state is not None:
+            data = self.augmentation(data, random_state)
+
+        data = _to_unit_range(data, self.dtype)
+
+        if data.ndim == 3:
+            data = np.expand_dims(data, axis=3)
+
+        return self._apply_batch_transformations(data)
+
     def display(self, data: "np.ndarray") -> "np.ndarray":
         """Returns the data _as it is_, and can be used to paint the image."""
         return data
@@ -44,8 +73,60 @@ class ImageArray(DataType):
         """
         return np.array(data)
 
+    def compact(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns images with integer pixel values as uint8."""
+        return _compact_pixels(data)
+
+    def statistics_accumulator(self) -> "RunningMoments":
+        """Returns an accumulator of the per-pixel mean, std, min and max."""
+        return RunningMoments()
+
+    def __getstate__(self) -> dict:
+        dc = super().__getstate__()
+        dc["augmentation"] = _augmentation_to_dict(self.augmentation)
+
+        return dc
+
+    def __setstate__(self, new_state: dict):
+        super().__setstate__(new_state)
+
+        self.augmentation = _augmentation_from_dict(new_state.get("augmentation"))
+
     def __reduce__(self):
-        return (ImageArray, (), super().__getstate__())
+        return (ImageArray, (), self.__getstate__())
+
+
+def _augmentation_to_dict(
+    augmentation: Optional["ImageAugmentation"],
+) -> Optional[dict]:
+    return None if augmentation is None else augmentation.to_dict()
+
+
+def _augmentation_from_dict(dc: Optional[dict]) -> Optional["ImageAugmentation"]:
+    return None if dc is None else ImageAugmentation.from_dict(dc)
+
+
+def _to_unit_range(data: "np.ndarray", dtype: str) -> "np.ndarray":
+    """Returns a copy of the pixels on the range (0-1), with the given dtype (float64
+    if None). The division is done in place on the copy, without intermediates."""
+    data = np.array(data, dtype=dtype or np.float64)
+    data /= 255
+
+    return data
+
+
+def _compact_pixels(data: "np.ndarray") -> "np.ndarray":
+    """Returns integer pixel values in the range (0-255) as uint8. Other arrays (Float
+    pixels, object arrays...) are returned untouched."""
+    data = np.asanyarray(data)
+
+    if data.dtype == np.uint8 or data.dtype.kind not in "iu" or data.size == 0:
+        return data
+
+    if data.min() < 0 or data.max() > 255:
+        return data
+
+    return data.astype(np.uint8)
 
 
 DataTypeContainer.ImageArray = providers.Factory(ImageArray)
@@ -1,38 +1,107 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
+import hashlib
 import os
-from typing import Callable, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
 
 import dependency_injector.providers as providers
 import numpy as np
 from PIL import Image
 
+from .augmentation import ImageAugmentation
 from .datatype import DataType, DataTypeContainer
+from .imagearray import (
+    _augmentation_from_dict,
+    _augmentation_to_dict,
+    _to_unit_range,
+)
+
+# Pool of threads used for decoding batches of images, and the process that created it
+# (Threads don't survive a fork, so child processes must create their own pool)
+_DECODE_EXECUTOR: Optional["ThreadPoolExecutor"] = None
+_DECODE_EXECUTOR_PID: Optional[int] = None
 
 
 class ImagePath(DataType):
     """ The ImagePath class represents an image as an absolute path to a file that will
-    be loading while training."""
-
-    def __init__(self):
+    be loading while training.
+
+    Batches of images are decoded in parallel on a pool of threads. Processed images
+    have the dtype given by `dtype` (float32 by default).
+
+    Images can be resized and converted while they're decoded. JPEG images are decoded
+    directly at a reduced scale (See `Image.draft`), and other formats are reduced by
+    integer factors before the final resampling (See `Image.reduce`), so decoding cost
+    and memory scale with the output size instead of the stored one.
+
+    Attributes:
+        target_size: Optional (height, width) that images are resized to.
+        color_mode: Optional PIL mode that images are converted to ("L" for grayscale,
+            "RGB", "RGBA"...).
+        cache_dir: Optional directory where the decoded images are stored. Once an
+            image is decoded, next loads read its pixels from this directory
+            (memory-mapped) instead of decoding it again. Cached images are identified
+            by their path, modification time and size.
+        augmentation: Optional random augmentation applied to the decoded batches used
+            for training (See `ImageAugmentation` and `Dataset.augment`).
+    """
+
+    DefaultDtype = "float32"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        target_size: Optional[Tuple[int, int]] = None,
+        color_mode: Optional[str] = None,
+        dtype: str = DefaultDtype,
+    ):
         super().__init__()
 
+        self.cache_dir = cache_dir
+        self.target_size = target_size
+        self.color_mode = color_mode
+        self.dtype = dtype
+
+        self.augmentation: Optional["ImageAugmentation"] = None
+
         self.transformations: List[Callable] = []
 
     def process(self, data: str) -> "np.ndarray":
         """Returns `data` as an array with pixel values in the range (0-1)."""
         image_array = self.display(data)
 
-        image_array = image_array / 255.0
+        image_array = _to_unit_range(image_array, self.dtype)
 
         return self._apply_transformations(image_array)
 
+    def process_batch(
+        self, data: "np.ndarray", random_state: Optional["np.random.Generator"] = None
+    ) -> "np.ndarray":
+        """Returns a batch of paths as an array of images with pixel values in the range
+        (0-1). Images are decoded in parallel, and augmented if a `random_state` is
+        passed."""
+        images = self.display_batch(data)
+
+        if self.augmentation is not None and random_state is not None:
+            images = self.augmentation(images, random_state)
+
+        return self._apply_batch_transformations(_to_unit_range(images, self.dtype))
+
     def display(self, data: "np.ndarray") -> "np.ndarray":
         """Returns the loaded data _as it is_. Can be used to paint the image."""
-        image = Image.open(data)
-        image_array = np.array(image)
+        if self.cache_dir is None:
+            return self._decode(data)
 
-        return image_array
+        return self._load_cached(data)
+
+    def display_batch(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns a batch of paths as an array of images, decoded in parallel."""
+        if len(data) <= 1:
+            return np.array([self.display(path) for path in data])
+
+        return np.array(list(_decode_executor().map(self.display, data)))
 
     def convert_to_expected_format(self, image: "str") -> "np.ndarray":
         """This class actually expects data to be passed correctly, as it is hard to
@@ -40,8 +109,106 @@ class ImagePath(DataType):
         """
         return os.path.abspath(image)
 
+    def cache_key(self) -> tuple:
+        return super().cache_key() + (self.target_size, self.color_mode)
+
+    def _decode(self, path: str) -> "np.ndarray":
+        with Image.open(path) as image:
+            if self.target_size is not None:
+                height, width = self.target_size
+
+                # Lets the JPEG decoder scale the image down (by 1/2, 1/4 or 1/8) while
+                # keeping it at least as big as the target size
+                image.draft(_draft_mode(self.color_mode), (width, height))
+
+            if self.color_mode is not None and image.mode in ("1", "P"):
+                # These modes can't be resampled smoothly
+                image = image.convert(self.color_mode)
+
+            if self.target_size is not None and image.size != (width, height):
+                image = image.resize((width, height), Image.BILINEAR, reducing_gap=2.0)
+
+            if self.color_mode is not None and image.mode != self.color_mode:
+                image = image.convert(self.color_mode)
+
+            return np.array(image)
+
+    def _load_cached(self, path: str) -> "np.ndarray":
+        """Returns the decoded image from the cache directory, decoding and storing it
+        if it wasn't cached."""
+        stat = os.stat(path)
+        key = (
+            f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}:"
+            f"{self.target_size}:{self.color_mode}"
+        )
+
+        cached_path = os.path.join(
+            self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".npy"
+        )
+
+        try:
+            return np.load(cached_path, mmap_mode="r")
+
+        except (OSError, ValueError):
+            pass
+
+        image_array = self._decode(path)
+
+        # Write to a temporary file first, so other threads/processes never read a
+        # partially written image
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(temp_path, "wb") as temp_file:
+            np.save(temp_file, image_array)
+
+        os.replace(temp_path, cached_path)
+
+        return image_array
+
+    def __getstate__(self) -> dict:
+        dc = super().__getstate__()
+        dc["cache_dir"] = self.cache_dir
+        dc["target_size"] = (
+            None if self.target_size is None else list(self.target_size)
+        )
+        dc["color_mode"] = self.color_mode
+        dc["augmentation"] = _augmentation_to_dict(self.augmentation)
+
+        return dc
+
+    def __setstate__(self, new_state: dict):
+        super().__setstate__(new_state)
+
+        self.cache_dir = new_state.get("cache_dir")
+        self.target_size = (
+            None
+            if new_state.get("target_size") is None
+            else tuple(new_state["target_size"])
+        )
+        self.color_mode = new_state.get("color_mode")
+        self.augmentation = _augmentation_from_dict(new_state.get("augmentation"))
+
     def __reduce__(self):
-        return (ImagePath, (), super().__getstate__())
+        return (ImagePath, (), self.__getstate__())
+
+
+def _draft_mode(color_mode: Optional[str]) -> Optional[str]:
+    """Returns the mode that the JPEG decoder can convert to while decoding, if
+    any."""
+    return color_mode if color_mode in ("L", "RGB") else None
+
+
+def _decode_executor() -> "ThreadPoolExecutor":
+    global _DECODE_EXECUTOR, _DECODE_EXECUTOR_PID
+
+    if _DECODE_EXECUTOR is None or _DECODE_EXECUTOR_PID != os.getpid():
+        _DECODE_EXECUTOR = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) + 4)
+        )
+        _DECODE_EXECUTOR_PID = os.getpid()
+
+    return _DECODE_EXECUTOR
 
 
 DataTypeContainer.ImagePath = providers.Factory(ImagePath)
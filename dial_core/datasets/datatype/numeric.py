@@ -1,9 +1,11 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
-from typing import Any, Callable, List
+from typing import Any, Callable, List, Optional
 
 import dependency_injector.providers as providers
+import numpy as np
 
+from ..statistics import RunningMoments
 from .datatype import DataType, DataTypeContainer
 
 
@@ -13,6 +15,8 @@ class Numeric(DataType):
     """
 
     def __init__(self):
+        super().__init__()
+
         self.is_editable = True
 
         self.transformations: List[Callable] = []
@@ -21,6 +25,12 @@ class Numeric(DataType):
         """Returns the number. It doesn't need any processing."""
         return self._apply_transformations(data)
 
+    def process_batch(
+        self, data: "np.ndarray", random_state: Optional["np.random.Generator"] = None
+    ) -> "np.ndarray":
+        """Returns the batch of numbers, cast to `dtype` if defined."""
+        return self._apply_batch_transformations(self._cast(data), source=data)
+
     def display(self, data: int) -> str:
         """Returns the interger as a string."""
         return str(data)
@@ -33,6 +43,10 @@ class Numeric(DataType):
         """
         return int(data)
 
+    def statistics_accumulator(self) -> "RunningMoments":
+        """Returns an accumulator of the mean, std, min and max of the numbers."""
+        return RunningMoments()
+
     def __reduce__(self):
         return (Numeric, (), super().__getstate__())
 
@@ -1,10 +1,11 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
-from typing import Callable, List
+from typing import Callable, List, Optional
 
 import dependency_injector.providers as providers
 import numpy as np
 
+from ..statistics import RunningMoments
 from .datatype import DataType, DataTypeContainer
 
 
@@ -20,6 +21,12 @@ class NumericArray(DataType):
         """Returns the data as it is. Doesn't need any processing."""
         return self._apply_transformations(data)
 
+    def process_batch(
+        self, data: "np.ndarray", random_state: Optional["np.random.Generator"] = None
+    ) -> "np.ndarray":
+        """Returns the batch of arrays, cast to `dtype` if defined."""
+        return self._apply_batch_transformations(self._cast(data), source=data)
+
     def display(self, data: "np.ndarray") -> str:
         """Returns `data` as a string representation."""
         return np.array2string(data, precision=4, suppress_small=True, separator=", ")
@@ -28,6 +35,10 @@ class NumericArray(DataType):
         """Doesn't do any transformation. Expects data to be passed correctly."""
         return np.array(data)
 
+    def statistics_accumulator(self) -> "RunningMoments":
+        """Returns an accumulator of the per-feature mean, std, min and max."""
+        return RunningMoments()
+
     def __reduce__(self):
         return (NumericArray, (), super().__getstate__())
 
@@ -0,0 +1,147 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+from typing import Callable, List, Optional
+
+import dependency_injector.providers as providers
+import numpy as np
+
+from .datatype import DataType, DataTypeContainer
+from .spans import SpanStorage
+
+
+class PaddedSequence(SpanStorage, DataType):
+    """The PaddedSequence class represents a sequence of variable length, like the
+    tokens of a text or the time steps of a signal (Each step can be a number or an
+    array of features).
+
+    The steps of all the sequences are kept by the datatype on a single flat array
+    (`values`), and each row of the dataset is a (offset, length) pair pointing to the
+    steps of one sequence. Sequences are only padded when a batch is processed, to the
+    length of the longest sequence of the batch. Batching sequences of similar lengths
+    together (See `Dataset.bucket_by_length`) reduces the padding further.
+
+    Attributes:
+        padding_value: Value used for padding the sequences.
+        max_length: Optional maximum length. Longer sequences are truncated.
+    """
+
+    SpanArrays = {"values": None}
+
+    def __init__(
+        self,
+        values: Optional["np.ndarray"] = None,
+        padding_value: float = 0,
+        max_length: Optional[int] = None,
+    ):
+        super().__init__()
+
+        self._init_span_arrays(values=values)
+
+        self.padding_value = padding_value
+        self.max_length = max_length
+
+        self.transformations: List[Callable] = []
+
+    @property
+    def values(self) -> "np.ndarray":
+        """Returns the array with the steps of all the sequences."""
+        return self._span_array("values")
+
+    def add_sequences(self, sequences: List["np.ndarray"]) -> "np.ndarray":
+        """Appends the sequences to the values array. Returns their (offset, length)
+        rows, as an array of shape (N, 2)."""
+        lengths = [len(sequence) for sequence in sequences]
+
+        if sum(lengths) == 0:
+            return self._append_spans(lengths)
+
+        return self._append_spans(
+            lengths,
+            values=np.concatenate([np.asarray(sequence) for sequence in sequences]),
+        )
+
+    def lengths(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the length that each of the sequences has once processed (Truncated
+        to `max_length`)."""
+        _, lengths = self._spans(data)
+
+        if self.max_length is not None:
+            lengths = np.minimum(lengths, self.max_length)
+
+        return lengths
+
+    def item_shape(self, shape: tuple) -> tuple:
+        """Returns the shape of the processed sequences, where the number of steps
+        (First axis) is None, as batches are padded to their longest sequence."""
+        return (None,) + tuple(shape[1:])
+
+    def process(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the steps of the sequence (Truncated to `max_length`)."""
+        offset, length = int(data[0]), int(self.lengths(data)[0])
+
+        return self._apply_transformations(
+            self._cast(self.values[offset : offset + length])
+        )
+
+    def process_batch(
+        self, data: "np.ndarray", random_state: Optional["np.random.Generator"] = None
+    ) -> "np.ndarray":
+        """Returns the batch of sequences as a single array, padded at the end to the
+        length of the longest sequence of the batch (Or truncated to `max_length`).
+
+        The steps are gathered from the values array with a single indexing operation.
+        """
+        offsets, _ = self._spans(data)
+        lengths = self.lengths(data)
+
+        batch_length = int(lengths.max()) if len(lengths) else 0
+        steps = np.arange(batch_length)
+
+        # Position of each step of the batch on the values array, and if it's a real
+        # step of the sequence or padding
+        is_step = steps < lengths[:, np.newaxis]
+        positions = offsets[:, np.newaxis] + steps
+
+        batch = np.full(
+            (len(offsets), batch_length) + self.values.shape[1:],
+            self.padding_value,
+            dtype=self.dtype or self.values.dtype,
+        )
+        batch[is_step] = self.values[positions[is_step]]
+
+        return self._apply_batch_transformations(batch)
+
+    def display(self, data: "np.ndarray") -> str:
+        """Returns the steps of the sequence as a string representation."""
+        offset, length = (int(value) for value in data)
+
+        return np.array2string(
+            self.values[offset : offset + length],
+            precision=4,
+            suppress_small=True,
+            separator=", ",
+        )
+
+    def convert_to_expected_format(self, data: "np.ndarray") -> "np.ndarray":
+        """Stores the sequence on the values array, and returns its (offset, length)
+        row."""
+        return self.add_sequences([data])[0]
+
+    def cache_key(self) -> tuple:
+        return super().cache_key() + (self.max_length, self.padding_value)
+
+    def __getstate__(self) -> dict:
+        dc = super().__getstate__()
+        dc["padding_value"] = self.padding_value
+        dc["max_length"] = self.max_length
+
+        return dc
+
+    def __setstate__(self, new_state: dict):
+        super().__setstate__(new_state)
+
+        self.padding_value = new_state.get("padding_value", 0)
+        self.max_length = new_state.get("max_length")
+
+
+DataTypeContainer.PaddedSequence = providers.Factory(PaddedSequence)
@@ -0,0 +1,89 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from ..growable_array import GrowableArray
+
+
+class SpanStorage:
+    """The SpanStorage class is a mixin for datatypes whose stored rows are (offset,
+    length) spans pointing to flat arrays kept by the datatype (Like the encoded bytes
+    of `CompressedImage`, or the steps of `PaddedSequence`).
+
+    The rows of the dataset can be sliced, shuffled or deleted without touching those
+    arrays. The arrays are saved with the dataset through `arrays`, and pickled with
+    the datatype, but they aren't part of its description (`to_dict`).
+
+    Subclasses list the names of their arrays on `SpanArrays`, with the dtype of the
+    empty ones (None for float64), and must be placed before `DataType` on the bases.
+    """
+
+    SpanArrays: Dict[str, Optional[str]] = {}
+
+    def _init_span_arrays(self, **arrays: Optional["np.ndarray"]):
+        """Creates the span arrays, with the passed initial contents or empty."""
+        self._span_arrays = {
+            name: GrowableArray(
+                self._empty_span_array(name)
+                if arrays.get(name) is None
+                else arrays[name]
+            )
+            for name in self.SpanArrays
+        }
+
+    def _empty_span_array(self, name: str) -> "np.ndarray":
+        """Returns the initial contents of an span array without data."""
+        return np.empty(0, dtype=self.SpanArrays[name])
+
+    def _span_array(self, name: str) -> "np.ndarray":
+        return self._span_arrays[name].array
+
+    def _append_spans(
+        self, lengths: "np.ndarray", **values: "np.ndarray"
+    ) -> "np.ndarray":
+        """Appends the `values` of each span array (All of them with the elements of
+        the spans, one after another). Returns the (offset, length) rows of the new
+        spans, as an array of shape (N, 2)."""
+        lengths = np.asarray(lengths, dtype=np.int64).reshape(-1)
+
+        first_array = self._span_arrays[next(iter(self.SpanArrays))]
+        offsets = len(first_array) + np.cumsum(lengths) - lengths
+
+        if lengths.sum() > 0:
+            for name, array in values.items():
+                self._span_arrays[name].insert(len(self._span_arrays[name]), array)
+
+        return np.stack([offsets, lengths], axis=1)
+
+    @staticmethod
+    def _spans(data: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """Returns the offsets and lengths of the stored rows on `data`."""
+        data = np.asarray(data, dtype=np.int64).reshape(-1, 2)
+
+        return data[:, 0], data[:, 1]
+
+    def arrays(self) -> Dict[str, "np.ndarray"]:
+        return {name: array.compact() for name, array in self._span_arrays.items()}
+
+    def set_arrays(self, arrays: Dict[str, "np.ndarray"]):
+        self._init_span_arrays(**arrays)
+
+    def __setstate__(self, new_state: dict):
+        super().__setstate__(new_state)
+
+        arrays = {
+            name: new_state[name] for name in self.SpanArrays if name in new_state
+        }
+
+        if arrays:
+            self.set_arrays(arrays)
+
+    def __reduce__(self):
+        state = self.__getstate__()
+
+        for name in self.SpanArrays:
+            state[name] = self._span_array(name)
+
+        return (type(self), (), state)
@@ -0,0 +1,186 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+from typing import Callable, List, Optional, Tuple
+
+import dependency_injector.providers as providers
+import numpy as np
+
+from .datatype import DataType, DataTypeContainer
+from .spans import SpanStorage
+
+
+class SparseArray(SpanStorage, DataType):
+    """The SparseArray class represents an unidimensional array of numeric values where
+    most of them are zero, like bag-of-words or one-hot encoded features.
+
+    Only the non-zero values are stored, on CSR form: the datatype keeps a flat array
+    with the non-zero values of all the rows (`values`) and another one with their
+    positions on the dense row (`indices`). Each row of the dataset is a (offset,
+    length) pair pointing to the values of one row, so rows can be sliced, shuffled or
+    deleted without touching the values. Rows are only densified when a batch is
+    processed.
+
+    Attributes:
+        size: Number of values of the dense rows.
+    """
+
+    SpanArrays = {"values": None, "indices": None}
+
+    def __init__(
+        self,
+        size: int = 0,
+        values: Optional["np.ndarray"] = None,
+        indices: Optional["np.ndarray"] = None,
+    ):
+        super().__init__()
+
+        self.size = size
+
+        self._init_span_arrays(values=values, indices=indices)
+
+        self.transformations: List[Callable] = []
+
+    @property
+    def values(self) -> "np.ndarray":
+        """Returns the array with the non-zero values of all the rows."""
+        return self._span_array("values")
+
+    @property
+    def indices(self) -> "np.ndarray":
+        """Returns the array with the position of each value on its dense row."""
+        return self._span_array("indices")
+
+    def add_csr(
+        self, values: "np.ndarray", indices: "np.ndarray", indptr: "np.ndarray"
+    ) -> "np.ndarray":
+        """Appends rows given on CSR form (Like the `data`, `indices` and `indptr`
+        attributes of a `scipy.sparse.csr_matrix`). Returns their (offset, length)
+        rows, as an array of shape (N, 2).
+
+        Raises:
+            ValueError: If any index is out of the bounds of the dense rows.
+        """
+        indptr = np.asarray(indptr, dtype=np.int64)
+        start, end = int(indptr[0]), int(indptr[-1])
+
+        values = np.asarray(values)[start:end]
+        indices = np.asarray(indices)[start:end]
+
+        if len(indices) > 0 and (indices.min() < 0 or indices.max() >= self.size):
+            raise ValueError("Sparse index out of bounds!")
+
+        # The first inserted indices decide the dtype of the stored ones
+        index_dtype = self._index_dtype()
+
+        if len(self.indices) > 0:
+            index_dtype = self.indices.dtype
+
+        return self._append_spans(
+            np.diff(indptr),
+            values=values,
+            indices=indices.astype(index_dtype, copy=False),
+        )
+
+    def add_rows(self, rows: "np.ndarray") -> "np.ndarray":
+        """Appends dense rows, storing only their non-zero values. Returns their
+        (offset, length) rows, as an array of shape (N, 2).
+
+        Raises:
+            ValueError: If the rows don't have `size` values.
+        """
+        rows = np.asarray(rows)
+
+        if rows.ndim != 2 or rows.shape[1] != self.size:
+            raise ValueError(f"Expected rows of {self.size} values, got {rows.shape}")
+
+        row_ids, columns = np.nonzero(rows)
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_ids, minlength=len(rows)), out=indptr[1:])
+
+        return self.add_csr(rows[row_ids, columns], columns, indptr)
+
+    def to_csr(
+        self, data: "np.ndarray"
+    ) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Returns the (values, indices, indptr) arrays of the rows on `data`, gathered
+        from the stored values with a single indexing operation."""
+        offsets, lengths = self._spans(data)
+
+        indptr = np.zeros(len(offsets) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+
+        # Position on the stored arrays of each value of the rows
+        positions = np.arange(indptr[-1]) + np.repeat(offsets - indptr[:-1], lengths)
+
+        return self.values[positions], self.indices[positions], indptr
+
+    def process(self, data: "np.ndarray") -> "np.ndarray":
+        """Returns the dense row."""
+        return self._apply_transformations(self._densify(data)[0])
+
+    def process_batch(
+        self, data: "np.ndarray", random_state: Optional["np.random.Generator"] = None
+    ) -> "np.ndarray":
+        """Returns the batch of dense rows. Only the rows of the batch are densified."""
+        return self._apply_batch_transformations(self._densify(data))
+
+    def display(self, data: "np.ndarray") -> str:
+        """Returns the non-zero values of the row, as {index: value} pairs."""
+        values, indices, _ = self.to_csr(data)
+
+        return (
+            "{"
+            + ", ".join(
+                f"{index}: {value:.4g}"
+                for index, value in zip(indices.tolist(), values.tolist())
+            )
+            + "}"
+        )
+
+    def convert_to_expected_format(self, data: "np.ndarray") -> "np.ndarray":
+        """Stores the non-zero values of the dense row, and returns its (offset,
+        length) row.
+
+        Raises:
+            ValueError: If the row doesn't have `size` values.
+        """
+        return self.add_rows(np.asarray(data)[np.newaxis])[0]
+
+    def _densify(self, data: "np.ndarray") -> "np.ndarray":
+        values, indices, indptr = self.to_csr(data)
+
+        batch = np.zeros(
+            (len(indptr) - 1, self.size), dtype=self.dtype or self.values.dtype
+        )
+        batch[np.repeat(np.arange(len(indptr) - 1), np.diff(indptr)), indices] = values
+
+        return batch
+
+    def _empty_span_array(self, name: str) -> "np.ndarray":
+        if name == "indices":
+            return np.empty(0, dtype=self._index_dtype())
+
+        return super()._empty_span_array(name)
+
+    def _index_dtype(self) -> "np.dtype":
+        """Returns the smallest dtype that can hold any index of the dense rows."""
+        return np.min_scalar_type(max(self.size - 1, 0))
+
+    def cache_key(self) -> tuple:
+        return super().cache_key() + (self.size,)
+
+    def __getstate__(self) -> dict:
+        dc = super().__getstate__()
+        dc["size"] = self.size
+
+        return dc
+
+    def __setstate__(self, new_state: dict):
+        # The size decides the dtype of the empty indices
+        self.size = new_state.get("size", 0)
+
+        super().__setstate__(new_state)
+
+
+DataTypeContainer.SparseArray = providers.Factory(SparseArray)
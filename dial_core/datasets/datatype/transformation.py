@@ -0,0 +1,265 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+"""Transformations applied to the processed data of a datatype (See
+`DataType.transformations`).
+
+A transformation is any callable on the list. Plain callables are applied to each
+element of the batch (See `Elementwise`), while `Transformation` objects can declare
+that they work on the whole batch at once, optionally modifying it in place.
+"""
+
+from abc import ABCMeta, abstractmethod
+from typing import Any, Callable, List, Optional, Union
+
+import numpy as np
+
+
+class Transformation(metaclass=ABCMeta):
+    """The Transformation class is the base class of the transformations that work on
+    whole batches.
+
+    Attributes:
+        in_place: If the transformation modifies the batch it receives instead of
+            returning a new one. In-place transformations always receive a batch that
+            is safe to modify, with the dtype returned by `buffer_dtype`.
+    """
+
+    in_place = False
+
+    @abstractmethod
+    def __call__(self, batch: "np.ndarray") -> "np.ndarray":
+        """Returns the transformed batch."""
+
+    def buffer_dtype(self, dtype: "np.dtype") -> "np.dtype":
+        """Returns the dtype of the buffer that an in-place transformation needs for
+        transforming batches of `dtype` without losing information (For example, a
+        float dtype for normalizing integers).
+
+        By default, batches are transformed with their own dtype.
+        """
+        return np.dtype(dtype)
+
+    def cache_key(self) -> tuple:
+        """Returns a key that identifies the transformation and the current value of
+        its parameters (Its attributes), so cached batches are invalidated when they're
+        changed (For example, the `mean` of `Normalize`)."""
+        return (id(self),) + tuple(
+            (name, _parameter_key(value)) for name, value in sorted(vars(self).items())
+        )
+
+    def apply_to_element(self, element: "np.ndarray") -> "np.ndarray":
+        """Returns a single transformed element, as a batch of one element."""
+        element = np.asarray(element)
+
+        return self(np.array(element, dtype=self.buffer_dtype(element.dtype))[None])[0]
+
+
+class Elementwise(Transformation):
+    """The Elementwise class adapts a callable that transforms a single element, so it
+    can be applied to whole batches.
+
+    Consecutive Elementwise transformations are fused by the `Pipeline`, so each
+    element goes through all of them on a single loop.
+    """
+
+    def __init__(self, function: Callable):
+        self.function = function
+
+    def __call__(self, batch: "np.ndarray") -> "np.ndarray":
+        return _map_elements([self.function], batch)
+
+    def apply_to_element(self, element):
+        return self.function(element)
+
+
+class BatchFunction(Transformation):
+    """The BatchFunction class is a transformation defined by a function that takes a
+    whole batch.
+
+    If `in_place` is True, the function must modify the batch it receives (Its return
+    value is ignored), avoiding a new allocation for each batch.
+    """
+
+    def __init__(self, function: Callable, in_place: bool = False):
+        self.function = function
+        self.in_place = in_place
+
+    def __call__(self, batch: "np.ndarray") -> "np.ndarray":
+        result = self.function(batch)
+
+        return batch if self.in_place else result
+
+
+class Normalize(Transformation):
+    """The Normalize class subtracts `mean` and divides by `std` (Which can be arrays
+    broadcastable to the element shape), in place. Integer batches are normalized on a
+    float buffer.
+
+    `Dataset.statistics` computes the statistics of the stored values, so they must be
+    scaled like the processed batches before using them here (For example, divided by
+    255 for `ImageArray`, whose batches are on the 0-1 range).
+    """
+
+    in_place = True
+
+    def __init__(
+        self, mean: Union[float, "np.ndarray"], std: Union[float, "np.ndarray"]
+    ):
+        self.mean = np.asarray(mean)
+        self.std = np.asarray(std)
+
+    def buffer_dtype(self, dtype: "np.dtype") -> "np.dtype":
+        if np.issubdtype(dtype, np.inexact):
+            return np.dtype(dtype)
+
+        return np.result_type(dtype, self.mean.dtype, self.std.dtype, np.float32)
+
+    def __call__(self, batch: "np.ndarray") -> "np.ndarray":
+        np.subtract(batch, self.mean, out=batch, casting="unsafe")
+        np.divide(batch, self.std, out=batch, casting="unsafe")
+
+        return batch
+
+
+class Clip(Transformation):
+    """The Clip class limits the values of the batch to the range [minimum, maximum],
+    in place."""
+
+    in_place = True
+
+    def __init__(self, minimum: Optional[float], maximum: Optional[float]):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __call__(self, batch: "np.ndarray") -> "np.ndarray":
+        return np.clip(batch, self.minimum, self.maximum, out=batch)
+
+
+class Pipeline:
+    """The Pipeline class applies a list of transformations to batches.
+
+    Plain callables are wrapped on `Elementwise` adapters. Consecutive elementwise
+    transformations are fused into a single loop over the batch, and consecutive
+    in-place transformations share a single buffer: the batch is only copied (once)
+    if it can't be modified, for example because it's a view of the stored data, or if
+    its dtype can't hold the results (See `Transformation.buffer_dtype`).
+    """
+
+    def __init__(self, transformations: List[Callable]):
+        self.stages: List[List["Transformation"]] = []
+
+        for transformation in transformations:
+            if not isinstance(transformation, Transformation):
+                transformation = Elementwise(transformation)
+
+            if self.stages and _fusable(self.stages[-1][-1], transformation):
+                self.stages[-1].append(transformation)
+            else:
+                self.stages.append([transformation])
+
+    def __call__(
+        self, batch: "np.ndarray", source: Optional["np.ndarray"] = None
+    ) -> "np.ndarray":
+        """Returns the transformed batch.
+
+        Args:
+            batch: Batch to transform.
+            source: Array the batch was computed from. If the batch may share memory
+                with it, the batch is copied before modifying it in place. If None, the
+                batch is copied unless it owns its data.
+        """
+        for stage in self.stages:
+            if isinstance(stage[0], Elementwise):
+                batch = _map_elements([t.function for t in stage], batch)
+
+            elif stage[0].in_place:
+                dtype = np.asarray(batch).dtype
+
+                for transformation in stage:
+                    dtype = transformation.buffer_dtype(dtype)
+
+                if dtype != np.asarray(batch).dtype or not _is_writable(batch, source):
+                    batch = np.array(batch, dtype=dtype)
+
+                for transformation in stage:
+                    transformation(batch)
+
+            else:
+                batch = stage[0](batch)
+
+        return batch
+
+    def apply_to_element(self, element):
+        """Returns a single transformed element."""
+        for stage in self.stages:
+            for transformation in stage:
+                element = transformation.apply_to_element(element)
+
+        return element
+
+
+def _parameter_key(value: Any) -> Any:
+    """Returns a hashable key with the value of a transformation parameter. Arrays are
+    compared by content, and unhashable objects by identity."""
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, value.tobytes())
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_parameter_key(item) for item in value)
+
+    try:
+        hash(value)
+    except TypeError:
+        return id(value)
+
+    return value
+
+
+def _fusable(previous: "Transformation", transformation: "Transformation") -> bool:
+    if isinstance(previous, Elementwise):
+        return isinstance(transformation, Elementwise)
+
+    return previous.in_place and transformation.in_place
+
+
+def _is_writable(batch: "np.ndarray", source: Optional["np.ndarray"]) -> bool:
+    if not isinstance(batch, np.ndarray) or not batch.flags.writeable:
+        return False
+
+    if source is None:
+        return batch.flags.owndata
+
+    return not np.may_share_memory(batch, source)
+
+
+def _map_elements(functions: List[Callable], batch: "np.ndarray") -> "np.ndarray":
+    """Applies all the functions to each element of the batch, writing the results on
+    a buffer allocated once for the whole batch."""
+
+    def transform(element):
+        for function in functions:
+            element = function(element)
+
+        return element
+
+    if len(batch) == 0:
+        return np.array([transform(element) for element in batch])
+
+    first = np.asarray(transform(batch[0]))
+    output = np.empty((len(batch),) + first.shape, dtype=first.dtype)
+    output[0] = first
+
+    for i in range(1, len(batch)):
+        element = np.asarray(transform(batch[i]))
+
+        if element.shape != first.shape or element.dtype != first.dtype:
+            # Elements that can't share a buffer are stacked as before
+            return np.array(
+                list(output[:i])
+                + [element]
+                + [transform(element) for element in batch[i + 1 :]]
+            )
+
+        output[i] = element
+
+    return output
@@ -0,0 +1,162 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+class GrowableArray:
+    """The GrowableArray class stores an array whose first axis can grow and shrink
+    without reallocating it on each modification.
+
+    Rows are kept on a buffer with extra capacity, which doubles when it runs out of
+    space, so appending rows is amortized O(1). Inserting or deleting rows in the
+    middle only moves the rows placed after them, in place.
+
+    The array passed on construction is used as the buffer until the first modification,
+    so read-only arrays (like memory-mapped ones) aren't copied unless modified.
+
+    Attributes:
+        array: Contiguous view of the stored rows.
+    """
+
+    MinCapacity = 16
+
+    def __init__(self, array: Optional["np.ndarray"] = None):
+        self._buffer = np.empty(0) if array is None else np.asanyarray(array)
+        self._size = len(self._buffer)
+        self._owned = False
+
+        self._update_view()
+
+    @property
+    def array(self) -> "np.ndarray":
+        return self._view
+
+    @property
+    def capacity(self) -> int:
+        """Returns the number of rows that can be stored without reallocating."""
+        return len(self._buffer)
+
+    def insert(self, position: int, values: List[Any]):
+        """Inserts `values` (A list of rows) at the given position.
+
+        If the values can't be represented with the dtype of the stored rows (For
+        example, 300 on uint8 rows), the buffer is widened to a dtype that can hold
+        both, instead of truncating them.
+        """
+        values = np.asarray(values)
+
+        if self._size == 0:
+            # Rows shape and type are taken from the first inserted values
+            self._buffer = np.empty((0,) + values.shape[1:], dtype=values.dtype)
+        else:
+            dtype = _fitting_dtype(self._buffer.dtype, values)
+
+            if dtype != self._buffer.dtype:
+                self._buffer = np.array(self._buffer, dtype=dtype)
+                self._owned = True
+
+            values = np.asarray(values, dtype=self._buffer.dtype)
+
+        n = len(values)
+        position = min(max(position, 0), self._size)
+
+        self._reserve(self._size + n)
+
+        self._buffer[position + n : self._size + n] = self._buffer[
+            position : self._size
+        ]
+        self._buffer[position : position + n] = values
+
+        self._size += n
+        self._update_view()
+
+    def delete(self, start: int, n: int = 1):
+        """Deletes `n` rows at `start` position, including `start`."""
+        end = min(start + n, self._size)
+        start = max(start, 0)
+
+        if start >= end:
+            return
+
+        self._reserve(self._size)
+
+        self._buffer[start : self._size - (end - start)] = self._buffer[
+            end : self._size
+        ]
+
+        self._size -= end - start
+        self._update_view()
+
+    def share(self) -> "GrowableArray":
+        """Returns a GrowableArray with the rows stored now, sharing their memory.
+
+        The buffer of this array becomes copy-on-write: it's reallocated on the next
+        modification, so the rows of the returned array never change.
+        """
+        self._owned = False
+
+        return GrowableArray(self.array)
+
+    def compact(self) -> "np.ndarray":
+        """Releases the extra capacity of the buffer, and returns the array."""
+        if self._owned and self.capacity > self._size:
+            self._buffer = self._buffer[: self._size].copy()
+            self._update_view()
+
+        return self.array
+
+    def _reserve(self, size: int):
+        """Makes sure that the buffer can hold `size` rows and can be modified."""
+        if self._owned and size <= self.capacity:
+            return
+
+        capacity = max(self.capacity, self.MinCapacity)
+        while capacity < size:
+            capacity *= 2
+
+        buffer = np.empty(
+            (capacity,) + self._buffer.shape[1:], dtype=self._buffer.dtype
+        )
+        buffer[: self._size] = self._buffer[: self._size]
+
+        self._buffer = buffer
+        self._owned = True
+
+    def _update_view(self):
+        if self._size == len(self._buffer):
+            self._view = self._buffer
+        else:
+            self._view = self._buffer[: self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getstate__(self) -> dict:
+        # Only the stored rows are pickled, not the extra capacity
+        return {"array": self.array}
+
+    def __setstate__(self, new_state: dict):
+        self.__init__(new_state["array"])
+
+
+def _fitting_dtype(dtype: "np.dtype", values: "np.ndarray") -> "np.dtype":
+    """Returns the smallest dtype that can hold `values` and any value of `dtype`."""
+    if values.size == 0 or np.can_cast(values.dtype, dtype):
+        return dtype
+
+    try:
+        if values.dtype.kind in "biu":
+            # Integers are checked by value, as Python integers are converted to int64
+            return np.result_type(
+                dtype,
+                np.min_scalar_type(values.min()),
+                np.min_scalar_type(values.max()),
+            )
+
+        return np.result_type(dtype, values.dtype)
+
+    except TypeError:
+        # Values without a common dtype (Like strings and numbers) are cast as before
+        return dtype
@@ -7,7 +7,9 @@ from .dataset_io import (
     CategoricalImgDatasetIO,
     DatasetIO,
     DatasetIORegistry,
+    NpyDatasetIO,
     NpzDatasetIO,
+    ShardedDatasetIO,
     TxtDatasetIO,
 )
 from .ttv_sets_io import TTVSetsIO
@@ -28,7 +30,9 @@ PredefinedTTVSetsContainer.BostonHousing = providers.Factory(BostonHousingLoader
 __all__ = [
     "DatasetIO",
     "NpzDatasetIO",
+    "NpyDatasetIO",
     "TxtDatasetIO",
+    "ShardedDatasetIO",
     "CategoricalImgDatasetIO",
     "DatasetIORegistry",
     "TTVSetsIO",
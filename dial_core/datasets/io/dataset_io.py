@@ -1,19 +1,23 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
+import copy
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 import dependency_injector.containers as containers
 import dependency_injector.providers as providers
 import numpy as np
 from PIL import Image
 
-from dial_core.datasets import Dataset
+from dial_core.datasets import Dataset, StreamingDataset
 from dial_core.datasets.datatype import Categorical, DataType
-from dial_core.utils import log
+from dial_core.utils import Timer, log
+
+from .text_array import load_text_array, save_text_array
 
 LOGGER = log.get_logger(__name__)
 
@@ -54,16 +58,51 @@ class DatasetIO:
         return self
 
     def save(self, parent_dir: str, dataset: "Dataset") -> dict:
+        """Writes the dataset to `parent_dir`. Subclasses write the data arrays.
+
+        Returns:
+            A copy of the description of the saved dataset. The same DatasetIO can save
+            several datasets (Like the ones of a TTVSets), so each one gets its own.
+
+        Raises:
+            ValueError: If the dataset is invalid, or it's a `StreamingDataset`, whose
+                rows aren't stored (See `StreamingDataset.to_dataset`).
+        """
         if not dataset:
             raise ValueError("Invalid dataset")
 
+        _check_not_stream(dataset)
+
         if not os.path.exists(parent_dir):
             os.makedirs(parent_dir, exist_ok=True)
 
         self.set_x_type(dataset.x_type)
         self.set_y_type(dataset.y_type)
 
-        return self._dataset_description
+        metadata = dataset.metadata()
+        self._dataset_description["metadata"] = {
+            "input_shape": list(metadata["input_shape"]),
+            "output_shape": list(metadata["output_shape"]),
+            "input_dtype": metadata["input_dtype"],
+            "output_dtype": metadata["output_dtype"],
+            # Datatypes the metadata was computed with
+            "x_type": dataset.x_type.to_dict(),
+            "y_type": dataset.y_type.to_dict(),
+        }
+
+        # Dtypes of the stored arrays, for formats that don't keep them
+        self._dataset_description["dtypes"] = {
+            "x": dataset.x.dtype.str,
+            "y": dataset.y.dtype.str,
+        }
+
+        return copy.deepcopy(self._dataset_description)
+
+    def _compact_arrays(self, dataset: "Dataset") -> Tuple["np.ndarray", "np.ndarray"]:
+        """Returns the x and y arrays of the dataset with the most compact dtypes for
+        writing them (See `DataType.compact`). The dataset isn't modified, so its
+        memory-mapped arrays stay on disk."""
+        return dataset.x_type.compact(dataset.x), dataset.y_type.compact(dataset.y)
 
     def save_to_file(self, description_file_path: str, dataset: "Dataset",) -> dict:
         """Writes the passed dataset to the file system.
@@ -94,7 +133,8 @@ class DatasetIO:
         x_type = self.get_x_type()
         y_type = self.get_y_type()
 
-        # Dataset data (x, y) must be filled by subclasses overriding this method
+        # Dataset data (x, y) must be filled by subclasses overriding this method, and
+        # then call `_restore_metadata`
         return Dataset(x_type=x_type, y_type=y_type)
 
     def load_from_file(self, description_file_path: str) -> Optional["Dataset"]:
@@ -116,6 +156,56 @@ class DatasetIO:
 
         return self.load(parent_dir)
 
+    def _get_datatype_arrays(self, dataset: "Dataset") -> Dict[str, "np.ndarray"]:
+        """Returns the arrays of the dataset datatypes (See `DataType.arrays`), with
+        their names prefixed by "x_type_" or "y_type_"."""
+        arrays = {}
+
+        for prefix, datatype in _datatypes(dataset).items():
+            for name, array in datatype.arrays().items():
+                arrays[f"{prefix}_{name}"] = array
+
+        return arrays
+
+    def _restore_datatype_arrays(
+        self, dataset: "Dataset", arrays: Mapping[str, "np.ndarray"]
+    ):
+        """Gives back to the dataset datatypes the arrays previously returned by
+        `_get_datatype_arrays`. Other arrays on `arrays` are ignored."""
+        for prefix, datatype in _datatypes(dataset).items():
+            datatype_arrays = {
+                name[len(prefix) + 1 :]: arrays[name]
+                for name in arrays.keys()
+                if name.startswith(f"{prefix}_")
+            }
+
+            if datatype_arrays:
+                datatype.set_arrays(datatype_arrays)
+
+    def _get_stored_dtype(self, array_name: str) -> Optional[str]:
+        """Returns the dtype that the "x" or "y" array had when it was saved, or None
+        if it's unknown."""
+        return self._dataset_description.get("dtypes", {}).get(array_name)
+
+    def _restore_metadata(self, dataset: "Dataset") -> "Dataset":
+        """Sets the metadata saved on the description (shapes, dtypes...) to the loaded
+        dataset, so it doesn't have to be computed from its data.
+
+        The metadata is only restored if it was computed with the same datatypes that
+        the dataset is loaded with (They can be overridden with `set_x_type` and
+        `set_y_type`). Otherwise, the dataset computes it again when needed.
+        """
+        metadata = self._dataset_description.get("metadata")
+
+        if (
+            metadata
+            and _same_description(metadata.get("x_type"), dataset.x_type.to_dict())
+            and _same_description(metadata.get("y_type"), dataset.y_type.to_dict())
+        ):
+            dataset.restore_metadata(metadata)
+
+        return dataset
+
     def _set_attribute(self, attribute: str, value: Any):
         self._dataset_description[attribute] = value
         self._overrriden[attribute] = value
@@ -126,7 +216,10 @@ class DatasetIO:
 
 class NpzDatasetIO(DatasetIO):
     """The NpzFormat class stores datasets using Numpy's .npz files. See `np.savez` for
-    more details."""
+    more details.
+
+    The arrays of the datatypes (See `DataType.arrays`) are stored on the same file.
+    """
 
     Label = "Npz Format"
 
@@ -134,6 +227,7 @@ class NpzDatasetIO(DatasetIO):
         super().__init__()
 
         self.set_filename("output.npz")
+        self.set_compressed(False)
 
     def get_filename(self) -> str:
         return self._dataset_description["filename"]
@@ -143,6 +237,17 @@ class NpzDatasetIO(DatasetIO):
 
         return self
 
+    def get_compressed(self) -> bool:
+        return self._dataset_description.get("compressed", False)
+
+    def set_compressed(self, compressed: bool) -> "NpzDatasetIO":
+        """Sets if the arrays are compressed when saved (See `np.savez_compressed`).
+        Loading compressed arrays is slower, but they take much less space when they
+        have many repeated values."""
+        self._set_attribute("compressed", compressed)
+
+        return self
+
     def save(
         self, parent_dir: str, dataset: "Dataset",
     ):
@@ -156,11 +261,17 @@ class NpzDatasetIO(DatasetIO):
         """
         super().save(parent_dir, dataset)
 
-        np.savez(
-            os.path.join(parent_dir, self.get_filename()), x=dataset.x, y=dataset.y,
+        x, y = self._compact_arrays(dataset)
+
+        savez = np.savez_compressed if self.get_compressed() else np.savez
+        savez(
+            os.path.join(parent_dir, self.get_filename()),
+            x=x,
+            y=y,
+            **self._get_datatype_arrays(dataset),
         )
 
-        return self._dataset_description
+        return copy.deepcopy(self._dataset_description)
 
     def load(self, parent_dir: str) -> Optional["Dataset"]:
         """Loads the dataset from the file system.
@@ -176,14 +287,133 @@ class NpzDatasetIO(DatasetIO):
             return None
 
         data = np.load(npz_filepath)
+        self._restore_datatype_arrays(dataset, data)
+
         dataset.x = data["x"]
         dataset.y = data["y"]
 
-        return dataset
+        return self._restore_metadata(dataset)
+
+
+class NpyDatasetIO(DatasetIO):
+    """The NpyDatasetIO class stores each array of the dataset on its own uncompressed
+    .npy file. See `np.save` for more details.
+
+    When loaded, the arrays are memory-mapped (see `np.memmap`) instead of being read
+    into memory, so opening a dataset is instantaneous regardless of its size and only
+    the rows accessed (for example, the ones of the current batch) are paged in.
+
+    The arrays of the datatypes (See `DataType.arrays`) are stored on their own .npy
+    files too, named after the x file, and memory-mapped as well.
+    """
+
+    Label = "Npy Format"
+
+    def __init__(self):
+        super().__init__()
+
+        self.set_x_filename("x_output.npy")
+        self.set_y_filename("y_output.npy")
+        self.set_mmap_mode("r")
+
+    def get_x_filename(self) -> str:
+        return self._dataset_description["x_filename"]
+
+    def set_x_filename(self, x_filename: str) -> "NpyDatasetIO":
+        self._set_attribute("x_filename", x_filename)
+
+        return self
+
+    def get_y_filename(self) -> str:
+        return self._dataset_description["y_filename"]
+
+    def set_y_filename(self, y_filename: str) -> "NpyDatasetIO":
+        self._set_attribute("y_filename", y_filename)
+
+        return self
+
+    def get_mmap_mode(self) -> Optional[str]:
+        return self._dataset_description.get("mmap_mode", "r")
+
+    def set_mmap_mode(self, mmap_mode: Optional[str]) -> "NpyDatasetIO":
+        """Sets the mode used for memory-mapping the arrays when loading ("r", "r+",
+        "c"...). If None, the arrays are fully loaded into memory."""
+        self._set_attribute("mmap_mode", mmap_mode)
+
+        return self
+
+    def save(
+        self, parent_dir: str, dataset: "Dataset",
+    ):
+        """Writes the passed dataset to the file system.
+
+        Args:
+            parent_dir: Directory where the dataset should be written to.
+            dataset: Dataset to save.
+        """
+        super().save(parent_dir, dataset)
+
+        x, y = self._compact_arrays(dataset)
+
+        np.save(os.path.join(parent_dir, self.get_x_filename()), x)
+        np.save(os.path.join(parent_dir, self.get_y_filename()), y)
+
+        # Filename of each array of the datatypes
+        x_basename = os.path.splitext(self.get_x_filename())[0]
+        self._dataset_description["arrays"] = {}
+
+        for name, array in self._get_datatype_arrays(dataset).items():
+            array_filename = f"{x_basename}.{name}.npy"
+            np.save(os.path.join(parent_dir, array_filename), array)
+
+            self._dataset_description["arrays"][name] = array_filename
+
+        return copy.deepcopy(self._dataset_description)
+
+    def load(self, parent_dir: str) -> "Dataset":
+        """Loads the dataset from the file system. The arrays are memory-mapped unless
+        the mmap mode is None or they contain Python objects, which can't be mapped.
+
+        Args:
+            parent_dir: Path to the directory where the dataset files are contained.
+        """
+        dataset = super().load(parent_dir)
+
+        self._restore_datatype_arrays(
+            dataset,
+            {
+                name: self._load_array(os.path.join(parent_dir, array_filename))
+                for name, array_filename in self._dataset_description.get(
+                    "arrays", {}
+                ).items()
+            },
+        )
+
+        dataset.x = self._load_array(os.path.join(parent_dir, self.get_x_filename()))
+        dataset.y = self._load_array(os.path.join(parent_dir, self.get_y_filename()))
+
+        return self._restore_metadata(dataset)
+
+    def _load_array(self, array_path: str) -> "np.ndarray":
+        try:
+            return np.load(array_path, mmap_mode=self.get_mmap_mode())
+
+        except ValueError:
+            LOGGER.warning("Can't memory-map %s. Loading it into memory.", array_path)
+
+            return np.load(array_path, allow_pickle=True)
 
 
 class TxtDatasetIO(DatasetIO):
-    """The TxtFormat class stores datasets on plain readable .txt files."""
+    """The TxtFormat class stores datasets on plain readable .txt files.
+
+    Text files don't keep the dtype of the arrays, so it's stored on the description
+    and restored when loading. Files are written in chunks of rows, and parsed in
+    parallel (See the `text_array` module).
+
+    The arrays of the datatypes (See `DataType.arrays`) are stored on their own .txt
+    files, named after the x file, with their dtype and shape on the description.
+    """
 
     Label = "Txt Format"
 
@@ -192,6 +422,8 @@ class TxtDatasetIO(DatasetIO):
 
         self.set_x_filename("x_output.txt")
         self.set_y_filename("y_output.txt")
+        self.set_delimiter(" ")
+        self.set_workers(4)
 
     def get_x_filename(self) -> "TxtDatasetIO":
         return self._dataset_description["x_filename"]
@@ -209,6 +441,25 @@ class TxtDatasetIO(DatasetIO):
 
         return self
 
+    def get_delimiter(self) -> str:
+        return self._dataset_description.get("delimiter", " ")
+
+    def set_delimiter(self, delimiter: str) -> "TxtDatasetIO":
+        """Sets the string that separates the values of a line (For example, "," for
+        CSV files)."""
+        self._set_attribute("delimiter", delimiter)
+
+        return self
+
+    def get_workers(self) -> int:
+        return self._dataset_description.get("workers", 4)
+
+    def set_workers(self, workers: int) -> "TxtDatasetIO":
+        """Sets the number of threads that parse the files when loading."""
+        self._set_attribute("workers", max(workers, 1))
+
+        return self
+
     def save(
         self, parent_dir: str, dataset: "Dataset",
     ):
@@ -222,22 +473,286 @@ class TxtDatasetIO(DatasetIO):
         """
         super().save(parent_dir, dataset)
 
-        np.savetxt(os.path.join(parent_dir, self.get_x_filename()), dataset.x)
-        np.savetxt(os.path.join(parent_dir, self.get_y_filename()), dataset.y)
+        x, y = self._compact_arrays(dataset)
 
-        return self._dataset_description
+        save_text_array(
+            os.path.join(parent_dir, self.get_x_filename()),
+            x,
+            fmt=_txt_format(x),
+            delimiter=self.get_delimiter(),
+        )
+        save_text_array(
+            os.path.join(parent_dir, self.get_y_filename()),
+            y,
+            fmt=_txt_format(y),
+            delimiter=self.get_delimiter(),
+        )
+
+        x_basename = os.path.splitext(self.get_x_filename())[0]
+        self._dataset_description["arrays"] = {}
+
+        for name, array in self._get_datatype_arrays(dataset).items():
+            array_filename = f"{x_basename}.{name}.txt"
+
+            # Arrays with more dimensions are written with a row per element
+            save_text_array(
+                os.path.join(parent_dir, array_filename),
+                array.reshape(len(array), -1) if array.ndim > 1 else array,
+                fmt=_txt_format(array),
+                delimiter=self.get_delimiter(),
+            )
+
+            self._dataset_description["arrays"][name] = {
+                "filename": array_filename,
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+            }
+
+        return copy.deepcopy(self._dataset_description)
 
     def load(self, parent_dir: str) -> "Dataset":
-        """"""
+        """Loads the dataset from the file system. If the description doesn't have the
+        dtypes of the arrays, they're inferred from the files contents."""
         dataset = super().load(parent_dir)
 
-        dataset.x = np.loadtxt(os.path.join(parent_dir, self.get_x_filename()))
-        dataset.y = np.loadtxt(os.path.join(parent_dir, self.get_y_filename()))
+        self._restore_datatype_arrays(
+            dataset,
+            {
+                name: load_text_array(
+                    os.path.join(parent_dir, array["filename"]),
+                    dtype=array["dtype"],
+                    delimiter=self.get_delimiter(),
+                    workers=self.get_workers(),
+                ).reshape(array["shape"])
+                for name, array in self._dataset_description.get("arrays", {}).items()
+            },
+        )
 
-        return dataset
+        dataset.x = load_text_array(
+            os.path.join(parent_dir, self.get_x_filename()),
+            dtype=self._get_stored_dtype("x"),
+            delimiter=self.get_delimiter(),
+            workers=self.get_workers(),
+        )
+        dataset.y = load_text_array(
+            os.path.join(parent_dir, self.get_y_filename()),
+            dtype=self._get_stored_dtype("y"),
+            delimiter=self.get_delimiter(),
+            workers=self.get_workers(),
+        )
+
+        return self._restore_metadata(dataset)
+
+
+class ShardedDatasetIO(DatasetIO):
+    """The ShardedDatasetIO class stores datasets on several .npz files (Shards) of a
+    fixed number of rows each, written and read concurrently by a pool of threads.
+
+    The description keeps an index with the range of rows stored on each shard, so a
+    range of rows can be loaded (See `load_rows`) reading only the shards that contain
+    it. The arrays of the datatypes (See `DataType.arrays`) are stored on their own
+    .npz file.
+    """
+
+    Label = "Sharded Format"
+
+    def __init__(self):
+        super().__init__()
+
+        self.set_filename_prefix("shard")
+        self.set_shard_size(65536)
+        self.set_workers(4)
+
+    def get_filename_prefix(self) -> str:
+        return self._dataset_description["filename_prefix"]
+
+    def set_filename_prefix(self, filename_prefix: str) -> "ShardedDatasetIO":
+        """Sets the prefix of the shard files. Shards are named "{prefix}-00000.npz",
+        "{prefix}-00001.npz"..."""
+        self._set_attribute("filename_prefix", filename_prefix)
+
+        return self
+
+    def get_shard_size(self) -> int:
+        return self._dataset_description["shard_size"]
+
+    def set_shard_size(self, shard_size: int) -> "ShardedDatasetIO":
+        """Sets the number of rows stored on each shard (The last one can have less).
+
+        Raises:
+            ValueError: If the shard size isn't positive.
+        """
+        if shard_size < 1:
+            raise ValueError("The shard size must be positive!")
+
+        self._set_attribute("shard_size", shard_size)
+
+        return self
+
+    def get_workers(self) -> int:
+        return self._dataset_description["workers"]
+
+    def set_workers(self, workers: int) -> "ShardedDatasetIO":
+        """Sets the number of threads that write and read the shards."""
+        self._set_attribute("workers", max(workers, 1))
+
+        return self
+
+    def save(self, parent_dir: str, dataset: "Dataset") -> dict:
+        """Writes the passed dataset to the file system, one shard per `shard_size`
+        rows.
+
+        Args:
+            parent_dir: Directory where the dataset should be written to.
+            dataset: Dataset to save.
+        """
+        super().save(parent_dir, dataset)
+
+        x, y = self._compact_arrays(dataset)
+        prefix = self.get_filename_prefix()
+        shard_size = self.get_shard_size()
+
+        shards = [
+            {
+                "filename": f"{prefix}-{i:05d}.npz",
+                "start": start,
+                "end": min(start + shard_size, len(x)),
+            }
+            for i, start in enumerate(range(0, len(x), shard_size))
+        ]
+
+        def write_shard(shard: dict):
+            np.savez(
+                os.path.join(parent_dir, shard["filename"]),
+                x=x[shard["start"] : shard["end"]],
+                y=y[shard["start"] : shard["end"]],
+            )
+
+        with ThreadPoolExecutor(max_workers=self.get_workers()) as executor:
+            # Consumed so that errors on the workers are raised here
+            list(executor.map(write_shard, shards))
+
+        arrays_filename = f"{prefix}.arrays.npz"
+        np.savez(
+            os.path.join(parent_dir, arrays_filename),
+            **self._get_datatype_arrays(dataset),
+        )
+
+        self._dataset_description["index"] = {
+            "rows": len(x),
+            "x_shape": list(x.shape[1:]),
+            "y_shape": list(y.shape[1:]),
+            "arrays": arrays_filename,
+            "shards": shards,
+        }
+
+        return copy.deepcopy(self._dataset_description)
+
+    def load(self, parent_dir: str) -> "Dataset":
+        """Loads the whole dataset from the file system. The shards are read
+        concurrently, directly into the dataset arrays.
+
+        Args:
+            parent_dir: Path to the directory where the dataset files are contained.
+        """
+        return self.load_rows(parent_dir, 0, self._dataset_description["index"]["rows"])
+
+    def load_rows(self, parent_dir: str, start: int, end: int) -> "Dataset":
+        """Loads only the rows in the range [start, end) of the dataset, reading the
+        shards that contain them.
+
+        Args:
+            parent_dir: Path to the directory where the dataset files are contained.
+            start: First row loaded.
+            end: Row after the last one loaded.
+        """
+        index = self._dataset_description["index"]
+
+        start = min(max(start, 0), index["rows"])
+        end = min(max(end, start), index["rows"])
+
+        dataset = super().load(parent_dir)
+
+        with np.load(os.path.join(parent_dir, index["arrays"])) as arrays:
+            self._restore_datatype_arrays(dataset, arrays)
+
+        x = np.empty(
+            [end - start] + index["x_shape"], dtype=self._get_stored_dtype("x")
+        )
+        y = np.empty(
+            [end - start] + index["y_shape"], dtype=self._get_stored_dtype("y")
+        )
+
+        def read_shard(shard: dict):
+            # Rows of the range stored on the shard
+            first, last = max(start, shard["start"]), min(end, shard["end"])
+            rows = slice(first - shard["start"], last - shard["start"])
+
+            with np.load(os.path.join(parent_dir, shard["filename"])) as data:
+                x[first - start : last - start] = data["x"][rows]
+                y[first - start : last - start] = data["y"][rows]
+
+        with ThreadPoolExecutor(max_workers=self.get_workers()) as executor:
+            list(executor.map(read_shard, self._shards_in_range(start, end)))
+
+        dataset.x = x
+        dataset.y = y
+
+        return self._restore_metadata(dataset)
+
+    def _shards_in_range(self, start: int, end: int) -> List[dict]:
+        """Returns the shards of the index that contain any row in [start, end)."""
+        shards = self._dataset_description["index"]["shards"]
+
+        # Shards are sorted by their rows
+        first = np.searchsorted([shard["end"] for shard in shards], start, side="right")
+        last = np.searchsorted([shard["start"] for shard in shards], end, side="left")
+
+        return shards[first:last]
+
+
+def _datatypes(dataset: "Dataset") -> Dict[str, "DataType"]:
+    return {"x_type": dataset.x_type, "y_type": dataset.y_type}
+
+
+def _same_description(saved: Optional[dict], current: dict) -> bool:
+    """Returns if a datatype description loaded from a JSON file is the same as the
+    current one, once converted to JSON too (Tuples become lists...)."""
+    return saved is not None and json.loads(json.dumps(current)) == json.loads(
+        json.dumps(saved)
+    )
+
+
+def _check_not_stream(dataset: Any):
+    """Raises a ValueError if `dataset` is a `StreamingDataset`, which can't be saved
+    without reading the whole stream into memory first."""
+    if isinstance(dataset, StreamingDataset):
+        raise ValueError(
+            "Streams can't be saved. Read them into a Dataset first with "
+            "`StreamingDataset.to_dataset` if they fit on memory."
+        )
+
+
+def _txt_format(array: "np.ndarray") -> str:
+    """Returns the format used for writing the values of `array` on a text file."""
+    if array.dtype.kind in "biu":
+        return "%d"
+
+    if array.dtype.kind in "fc":
+        return "%.18e"
+
+    return "%s"
 
 
 class CategoricalImgDatasetIO(DatasetIO):
+    """The CategoricalImgDatasetIO class stores datasets of images and categories as
+    image files, with the category of each image on the name of its folder or on its
+    filename.
+
+    Images are encoded and written in parallel by a pool of threads (Encoders release
+    the GIL), a chunk of images at a time. The format of the images and its compression
+    are stored on the description.
+    """
 
     Label = "Categorical Images Format"
 
@@ -245,11 +760,26 @@ class CategoricalImgDatasetIO(DatasetIO):
         CategoryOnFolders = 0
         CategoryOnFilename = 1
 
+    class ImageFormat(Enum):
+        """Formats in which images can be saved. The value is the file extension."""
+
+        PNG = "png"
+        JPEG = "jpg"
+        WebP = "webp"
+        Uncompressed = "bmp"
+
     def __init__(self):
         super().__init__()
 
         self.set_organization(self.Organization.CategoryOnFolders)
         self.set_filename_category_regex(r"")
+        self.set_image_format(self.ImageFormat.PNG)
+        self.set_compression_level(6)
+        self.set_quality(90)
+        self.set_workers(os.cpu_count() or 1)
+        self.set_chunk_size(256)
+
+        self._progress_callback: Optional[Callable[[int, int, float], None]] = None
 
     def get_organization(self) -> "Organization":
         return self.Organization[self._dataset_description["organization"]]
@@ -267,35 +797,148 @@ class CategoricalImgDatasetIO(DatasetIO):
 
         return self
 
+    def get_image_format(self) -> "ImageFormat":
+        return self.ImageFormat[self._dataset_description.get("image_format", "PNG")]
+
+    def set_image_format(self, image_format: "ImageFormat"):
+        self._set_attribute("image_format", image_format.name)
+
+        return self
+
+    def get_compression_level(self) -> int:
+        return self._dataset_description.get("compression_level", 6)
+
+    def set_compression_level(self, compression_level: int):
+        """Sets the compression level of PNG images, from 0 (No compression, fastest)
+        to 9 (Smallest files, slowest)."""
+        self._set_attribute("compression_level", min(max(compression_level, 0), 9))
+
+        return self
+
+    def get_quality(self) -> int:
+        return self._dataset_description.get("quality", 90)
+
+    def set_quality(self, quality: int):
+        """Sets the quality of JPEG and WebP images, from 1 (Smallest files) to 100
+        (Best quality)."""
+        self._set_attribute("quality", min(max(quality, 1), 100))
+
+        return self
+
+    def get_workers(self) -> int:
+        return self._dataset_description.get("workers", 1)
+
+    def set_workers(self, workers: int):
+        """Sets the number of threads that encode and write the images."""
+        self._set_attribute("workers", max(workers, 1))
+
+        return self
+
+    def get_chunk_size(self) -> int:
+        return self._dataset_description.get("chunk_size", 256)
+
+    def set_chunk_size(self, chunk_size: int):
+        """Sets the number of images written on each chunk. The progress is reported
+        after each chunk."""
+        self._set_attribute("chunk_size", max(chunk_size, 1))
+
+        return self
+
+    def set_progress_callback(
+        self, progress_callback: Optional[Callable[[int, int, float], None]]
+    ):
+        """Sets a function called while saving the images, after each chunk, with the
+        number of images written, the total number of images and the images written
+        per second. It isn't part of the description."""
+        self._progress_callback = progress_callback
+
+        return self
+
     def save(self, parent_dir: str, dataset: "Dataset"):
+        """Writes the images of the dataset to the file system.
+
+        Raises:
+            ValueError: If the datatypes have arrays (See `DataType.arrays`), like the
+                ones of `CompressedImage`, as the stored rows aren't pixel arrays then.
+        """
+        if dataset and self._get_datatype_arrays(dataset):
+            raise ValueError(
+                f"{self.Label} can't save datasets whose datatypes have arrays"
+            )
+
         super().save(parent_dir, dataset)
 
         num_zeros = len(str(len(dataset)))
+        extension = self.get_image_format().value
 
         if self.get_organization() == self.Organization.CategoryOnFolders:
             # Create a folder for each category
             for category_idx in range(len(dataset.y_type.categories)):
                 os.makedirs(os.path.join(parent_dir, str(category_idx)), exist_ok=True)
 
-            for i, (x, y) in enumerate(zip(dataset.x, dataset.y)):
-                im = Image.fromarray(x)
-                im.save(
-                    os.path.join(parent_dir, str(y), f"{str(i).zfill(num_zeros)}.png",)
+            def image_path(i: int, y: Any) -> str:
+                return os.path.join(
+                    parent_dir, str(y), f"{str(i).zfill(num_zeros)}.{extension}"
                 )
 
         elif self.get_organization() == self.Organization.CategoryOnFilename:
-            for i, (x, y) in enumerate(zip(dataset.x, dataset.y)):
-                im = Image.fromarray(x)
-                im.save(
-                    os.path.join(
-                        parent_dir, f"{str(y)}__{str(i).zfill(num_zeros)}.png",
-                    )
+
+            def image_path(i: int, y: Any) -> str:
+                return os.path.join(
+                    parent_dir, f"{str(y)}__{str(i).zfill(num_zeros)}.{extension}"
                 )
 
         else:
             raise ValueError(f"Invalid organization value: {self.get_organization()}")
 
-        return self._dataset_description
+        self._write_images(dataset.x, dataset.y, image_path, dataset.x_type.compact)
+
+        return copy.deepcopy(self._dataset_description)
+
+    def _write_images(
+        self,
+        x: "np.ndarray",
+        y: "np.ndarray",
+        image_path: Callable[[int, Any], str],
+        compact: Callable[["np.ndarray"], "np.ndarray"],
+    ):
+        """Writes each image of `x` to the path returned by `image_path(i, y[i])`.
+        Each chunk of images is compacted (See `DataType.compact`) before writing it,
+        so the pixel values have a dtype that PIL can save."""
+        save_options = self._save_options()
+        chunk_size = self.get_chunk_size()
+
+        with ThreadPoolExecutor(max_workers=self.get_workers()) as executor:
+            with Timer() as timer:
+                for start in range(0, len(x), chunk_size):
+                    end = min(start + chunk_size, len(x))
+                    images = compact(x[start:end])
+
+                    def write_image(i: int):
+                        Image.fromarray(images[i - start]).save(
+                            image_path(i, y[i]), **save_options
+                        )
+
+                    # Only a chunk of images is pending at any time
+                    list(executor.map(write_image, range(start, end)))
+
+                    if self._progress_callback is not None:
+                        seconds = timer.interval().total_seconds()
+                        self._progress_callback(
+                            end, len(x), end / seconds if seconds > 0 else 0.0
+                        )
+
+    def _save_options(self) -> dict:
+        """Returns the options passed to PIL for saving the images."""
+        image_format = self.get_image_format()
+
+        if image_format == self.ImageFormat.PNG:
+            return {"compress_level": self.get_compression_level()}
+
+        if image_format in (self.ImageFormat.JPEG, self.ImageFormat.WebP):
+            return {"quality": self.get_quality()}
+
+        return {}
 
     def load(self, dataset_dir: str) -> "Dataset":
         category_extractor_regex = re.compile(self.get_filename_category_regex())
@@ -343,25 +986,37 @@ class CategoricalImgDatasetIO(DatasetIO):
                     y.append(category_data)
 
         elif self.get_organization() == self.Organization.CategoryOnFilename:
+            x_type = self.get_x_type()
+            y_type = self.get_y_type()
+
             for image_filename in os.listdir(os.path.join(dataset_dir)):
-                try:
-                    category_name = category_extractor_regex.match(
-                        image_filename
-                    ).group(1)
+                match = category_extractor_regex.match(image_filename)
 
-                    category_data = self.get_y_type().convert_to_expected_format(
-                        category_name
-                    )
+                if match is None:
+                    LOGGER.warning("Can't extract the category of %s", image_filename)
+                    continue
 
-                    image_full_path = os.path.join(dataset_dir, image_filename)
+                image_full_path = os.path.join(dataset_dir, image_filename)
 
-                    x.append(
-                        self.get_x_type().convert_to_expected_format(image_full_path)
-                    )
-                    y.append(category_data)
+                x.append(x_type.convert_to_expected_format(image_full_path))
+                y.append(match.group(1))
 
-                except Exception as err:
-                    print(err)
+            # Category names are converted all at once. Files with invalid names are
+            # skipped
+            names = np.array(y, dtype=str)
+            invalid_names = []
+
+            for name in np.unique(names):
+                try:
+                    y_type.convert_to_expected_format(name)
+                except ValueError as err:
+                    LOGGER.warning("Skipping the images of category %s: %s", name, err)
+                    invalid_names.append(name)
+
+            valid = ~np.isin(names, invalid_names)
+
+            x = np.array(x)[valid]
+            y = y_type.convert_many(names[valid])
 
         else:
             raise ValueError(f"Invalid organization value: {self.get_organization()}")
@@ -369,12 +1024,16 @@ class CategoricalImgDatasetIO(DatasetIO):
         dataset.x = np.array(x)
         dataset.y = np.array(y)
 
-        return dataset
+        return self._restore_metadata(dataset)
 
 
 DatasetIORegistry = containers.DynamicContainer()
 setattr(DatasetIORegistry, NpzDatasetIO.Label, providers.Factory(NpzDatasetIO))
+setattr(DatasetIORegistry, NpyDatasetIO.Label, providers.Factory(NpyDatasetIO))
 setattr(DatasetIORegistry, TxtDatasetIO.Label, providers.Factory(TxtDatasetIO))
+setattr(
+    DatasetIORegistry, ShardedDatasetIO.Label, providers.Factory(ShardedDatasetIO)
+)
 setattr(
     DatasetIORegistry,
     CategoricalImgDatasetIO.Label,
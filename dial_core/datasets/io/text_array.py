@@ -0,0 +1,186 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+"""Reading and writing of numeric arrays as text files, with one row per line.
+
+Files are parsed in chunks split on line boundaries. Each chunk is parsed by numpy's
+C text parser directly into a typed array, without creating Python objects for each
+value, and chunks are parsed in parallel on a pool of threads.
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
+
+import numpy as np
+
+ChunkBytes = 16 * 1024 * 1024
+
+_WhitespaceChars = np.frombuffer(b" \t\n\r\v\f", dtype=np.uint8)
+
+
+def load_text_array(
+    path: str,
+    dtype: Optional[Union[str, "np.dtype"]] = None,
+    delimiter: str = " ",
+    workers: int = 4,
+    chunk_bytes: int = ChunkBytes,
+) -> "np.ndarray":
+    """Returns the array stored on a text file, with a row of values per line.
+
+    Files with a single column are returned as unidimensional arrays. Empty lines and
+    comments (From "#" to the end of the line) are skipped.
+
+    Args:
+        path: Path of the text file.
+        dtype: Dtype of the returned array. If None, it's inferred from the file
+            contents (int64 if all the values are integers, float64 otherwise).
+        delimiter: String that separates the values of a line. Whitespace is always
+            accepted as a separator too.
+        workers: Number of threads parsing the chunks of the file.
+        chunk_bytes: Approximate size of the chunks of the file parsed at once.
+
+    Raises:
+        ValueError: If the file can't be parsed, or its lines have a different number of
+            values.
+    """
+    with open(path, "rb") as text_file:
+        data = text_file.read()
+
+    if b"#" in data:
+        data = re.sub(rb"#[^\n]*", b"", data)
+
+    separator = delimiter.encode()
+
+    if separator.strip():
+        data = data.replace(separator, b" ")
+
+    data = data.strip()
+
+    if dtype is None:
+        dtype = _infer_dtype(data)
+
+    dtype = np.dtype(dtype)
+
+    if dtype.kind not in "biuf":
+        # Strings and other values can't be parsed by the numeric parser
+        return np.loadtxt(path, dtype=dtype, delimiter=delimiter.strip() or None)
+
+    first_line_end = data.find(b"\n")
+    columns = len(data[: first_line_end if first_line_end >= 0 else None].split())
+
+    chunks = _split_lines(data, chunk_bytes)
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        parts = list(
+            executor.map(lambda chunk: _parse_chunk(chunk, dtype, columns), chunks)
+        )
+
+    # Parsed chunks are copied to a single array allocated with the final size
+    output = np.empty(sum(len(part) for part in parts), dtype=dtype)
+
+    if parts:
+        np.concatenate(parts, out=output)
+
+    if columns <= 1:
+        return output
+
+    return output.reshape(-1, columns)
+
+
+def save_text_array(
+    path: str,
+    array: "np.ndarray",
+    fmt: str,
+    delimiter: str = " ",
+    chunk_values: int = 65536,
+):
+    """Writes an unidimensional or bidimensional array to a text file, with a row of
+    values per line.
+
+    Rows aren't formatted one by one: each chunk of rows (With around `chunk_values`
+    values) is formatted with a single string operation, and written at once.
+
+    Args:
+        path: Path of the text file.
+        array: Array to write.
+        fmt: Format of each value (For example, "%d" or "%.18e").
+        delimiter: String that separates the values of a line.
+        chunk_values: Approximate number of values formatted at once.
+    """
+    array = np.asarray(array)
+
+    if array.ndim == 1:
+        array = array[:, np.newaxis]
+
+    if array.ndim != 2:
+        raise ValueError(f"Expected an array with 1 or 2 dimensions, got {array.ndim}")
+
+    line_format = delimiter.join([fmt] * array.shape[1]) + "\n"
+    chunk_rows = max(chunk_values // max(array.shape[1], 1), 1)
+
+    with open(path, "w") as text_file:
+        for start in range(0, len(array), chunk_rows):
+            chunk = array[start : start + chunk_rows]
+
+            text_file.write((line_format * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+
+def _infer_dtype(data: bytes) -> "np.dtype":
+    """Returns float64 if any value on `data` isn't an integer, int64 otherwise."""
+    if re.search(rb"[.eEnNiI]", data):
+        return np.dtype(np.float64)
+
+    return np.dtype(np.int64)
+
+
+def _split_lines(data: bytes, chunk_bytes: int) -> List[bytes]:
+    """Returns `data` split on chunks of around `chunk_bytes` bytes, ending on line
+    boundaries."""
+    chunks = []
+    start = 0
+
+    while start < len(data):
+        end = data.find(b"\n", start + max(chunk_bytes, 1))
+        end = len(data) if end < 0 else end + 1
+
+        chunks.append(data[start:end])
+        start = end
+
+    return chunks
+
+
+def _parse_chunk(chunk: bytes, dtype: "np.dtype", columns: int) -> "np.ndarray":
+    # Booleans are stored as integers
+    parse_dtype = np.int8 if dtype.kind == "b" else dtype
+
+    values = np.fromstring(chunk, dtype=parse_dtype, sep=" ")
+
+    line_values = _values_per_line(chunk)
+    line_values = line_values[line_values > 0]
+
+    if np.any(line_values != columns) or len(values) != line_values.sum():
+        raise ValueError(
+            f"Can't parse the text file: expected {columns} values on each line"
+        )
+
+    return values.astype(dtype, copy=False)
+
+
+def _values_per_line(chunk: bytes) -> "np.ndarray":
+    """Returns the number of values on each line of `chunk` (Zero for empty lines),
+    counting the starts of the whitespace separated values of all the lines at once."""
+    chars = np.frombuffer(chunk, dtype=np.uint8)
+
+    if len(chars) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    separators = np.isin(chars, _WhitespaceChars)
+
+    value_starts = ~separators
+    value_starts[1:] &= separators[:-1]
+
+    newlines = np.flatnonzero(chars == ord("\n"))
+
+    line_ids = np.searchsorted(newlines, np.flatnonzero(value_starts), side="right")
+
+    return np.bincount(line_ids, minlength=len(newlines) + 1)
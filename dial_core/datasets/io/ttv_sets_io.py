@@ -7,6 +7,8 @@ from typing import TYPE_CHECKING, Optional
 from dial_core.datasets import TTVSets
 from dial_core.datasets.io import DatasetIORegistry
 
+from .dataset_io import _check_not_stream
+
 if TYPE_CHECKING:
     from .ttv_sets_io_format import DatasetIO
 
@@ -42,6 +44,16 @@ class TTVSetsIO:
     def save_to_description(
         self, ttv_dir: str, dataset_io: "DatasetIO", ttv_sets: "TTVSets"
     ):
+        """Saves each dataset of `ttv_sets` on its own directory inside `ttv_dir`, and
+        returns the description of the TTVSets.
+
+        Raises:
+            ValueError: If any of the datasets is a `StreamingDataset`. Nothing is
+                written then.
+        """
+        for dataset in (ttv_sets.train, ttv_sets.test, ttv_sets.validation):
+            _check_not_stream(dataset)
+
         def save_dataset(dataset_dir, dataset):
             return (
                 dataset_io.save(os.path.join(ttv_dir, dataset_dir), dataset)
@@ -74,7 +86,7 @@ class TTVSetsIO:
         dataset_io_providers=DatasetIORegistry,
     ) -> "TTVSets":
 
-        dataset_io = getattr(dataset_io_providers, ttv_description["format"])
+        dataset_io = getattr(dataset_io_providers, ttv_description["format"])()
 
         def load_dataset(dataset_dir, dataset_description):
             return (
@@ -3,7 +3,6 @@
 from abc import ABCMeta, abstractmethod
 from typing import Tuple
 
-import numpy as np
 from tensorflow.keras.datasets import boston_housing, cifar10, fashion_mnist, mnist
 
 from dial_core.datasets import Dataset, TTVSets, datatype
@@ -137,10 +136,8 @@ class Cifar10Loader(TTVSetsLoader):
         train = Dataset(x_train, y_train, self.x_type, self.y_type)
         test = Dataset(x_test, y_test, self.x_type, self.y_type)
 
-        train.y = np.array(
-            [train.y_type.convert_to_expected_format(i) for i in train.y]
-        )
-        test.y = np.array([test.y_type.convert_to_expected_format(i) for i in test.y])
+        train.y = train.y_type.convert_many(train.y)
+        test.y = test.y_type.convert_many(test.y)
 
         return train, test, None
 
@@ -0,0 +1,112 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+"""Accumulators used for computing statistics over a dataset in chunks.
+
+Each accumulator is updated with chunks of rows, and accumulators computed over
+different chunks can be merged, so statistics can be computed in parallel.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class RunningMoments:
+    """The RunningMoments class computes the per-feature count, mean, standard
+    deviation, minimum and maximum of numeric rows.
+
+    Means and variances are merged with the pairwise algorithm from Chan et al., which
+    is numerically stable regardless of the number of chunks.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean: Optional["np.ndarray"] = None
+        self.m2: Optional["np.ndarray"] = None
+        self.min: Optional["np.ndarray"] = None
+        self.max: Optional["np.ndarray"] = None
+
+    def update(self, chunk: "np.ndarray") -> "RunningMoments":
+        """Adds a chunk of rows to the statistics."""
+        chunk = np.asarray(chunk, dtype=np.float64)
+
+        if len(chunk) == 0:
+            return self
+
+        chunk_moments = RunningMoments()
+        chunk_moments.count = len(chunk)
+        chunk_moments.mean = chunk.mean(axis=0)
+        chunk_moments.m2 = ((chunk - chunk_moments.mean) ** 2).sum(axis=0)
+        chunk_moments.min = chunk.min(axis=0)
+        chunk_moments.max = chunk.max(axis=0)
+
+        return self.merge(chunk_moments)
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Adds the statistics computed by other accumulator."""
+        if other.count == 0:
+            return self
+
+        if self.count == 0:
+            self.count = other.count
+            self.mean, self.m2 = other.mean, other.m2
+            self.min, self.max = other.min, other.max
+
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+
+        self.mean = self.mean + delta * (other.count / count)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / count)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.count = count
+
+        return self
+
+    def result(self) -> dict:
+        """Returns the computed statistics."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": None if self.m2 is None else np.sqrt(self.m2 / self.count),
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class CategoryCounts:
+    """The CategoryCounts class counts the number of rows of each category, for rows
+    stored as category indices."""
+
+    def __init__(self, categories_count: int):
+        self.counts = np.zeros(categories_count, dtype=np.int64)
+
+    def update(self, chunk: "np.ndarray") -> "CategoryCounts":
+        """Adds a chunk of category indices to the counts.
+
+        Raises:
+            ValueError: If any index is out of bounds.
+        """
+        chunk = np.asarray(chunk).astype(np.intp).ravel()
+
+        if len(chunk) == 0:
+            return self
+
+        if chunk.min() < 0 or chunk.max() >= len(self.counts):
+            raise ValueError("Category index out of bounds!")
+
+        self.counts += np.bincount(chunk, minlength=len(self.counts))
+
+        return self
+
+    def merge(self, other: "CategoryCounts") -> "CategoryCounts":
+        """Adds the counts computed by other accumulator."""
+        self.counts += other.counts
+
+        return self
+
+    def result(self) -> dict:
+        """Returns the computed counts."""
+        return {"count": int(self.counts.sum()), "counts": self.counts}
@@ -0,0 +1,268 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .dataset import Dataset
+from .datatype import Numeric
+
+if TYPE_CHECKING:
+    from .datatype import DataType
+
+Chunk = Tuple["np.ndarray", "np.ndarray"]
+
+
+class StreamingDataset:
+    """The StreamingDataset class is a data container whose rows aren't stored on
+    memory, but read from a stream of (x, y) chunks (Chunked files, generators, several
+    datasets one after another...). Useful for data larger than the available memory.
+
+    Chunks are split/merged into batches, which are processed by the datatypes like the
+    ones of a Dataset. If `shuffle_buffer_size` is greater than 0, the rows of each
+    batch are drawn randomly from a buffer of that many rows, filled as the stream is
+    read.
+
+    To feed keras methods like fit, use `generator` (See its documentation).
+
+    Attributes:
+        chunks: Function that returns a new iterable of (x, y) chunks each time it's
+            called (One for each epoch).
+        x_type: Datatype of x rows.
+        y_type: Datatype of y rows.
+        batch_size: Batch size.
+        length: Number of rows of the stream, or None if unknown.
+        shuffle_buffer_size: Number of rows used for shuffling. 0 for no shuffling.
+        seed: Seed used for shuffling the rows.
+    """
+
+    def __init__(
+        self,
+        chunks: Callable[[], Iterable[Chunk]],
+        x_type: "DataType" = None,
+        y_type: "DataType" = None,
+        batch_size: int = 32,
+        length: Optional[int] = None,
+        shuffle_buffer_size: int = 0,
+        seed: Optional[int] = None,
+    ):
+        self.chunks = chunks
+
+        self.x_type = Numeric() if x_type is None else x_type
+        self.y_type = Numeric() if y_type is None else y_type
+
+        self.batch_size = batch_size
+        self.length = length
+
+        self.shuffle_buffer_size = shuffle_buffer_size
+        self.seed = seed
+
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_datasets(
+        cls, datasets: List["Dataset"], chunk_size: int = 1024, **kwargs
+    ) -> "StreamingDataset":
+        """Returns a stream that reads the rows of all the passed datasets, one after
+        another, `chunk_size` rows at a time. Datatypes are the ones of the first
+        dataset, unless other ones are specified."""
+
+        def chunks():
+            for dataset in datasets:
+                for start in range(0, dataset.row_count(), chunk_size):
+                    yield dataset._gather(slice(start, start + chunk_size))
+
+        kwargs.setdefault("x_type", datasets[0].x_type if datasets else None)
+        kwargs.setdefault("y_type", datasets[0].y_type if datasets else None)
+        kwargs.setdefault("length", sum(dataset.row_count() for dataset in datasets))
+
+        return cls(chunks, **kwargs)
+
+    @property
+    def steps_per_epoch(self) -> Optional[int]:
+        """Returns the number of batches on each epoch, or None if the length of the
+        stream is unknown."""
+        if self.length is None:
+            return None
+
+        return int(np.ceil(self.length / float(self.batch_size)))
+
+    def row_count(self) -> Optional[int]:
+        """Returns the number of rows on the stream, or None if unknown."""
+        return self.length
+
+    def metadata(self) -> dict:
+        """Returns the shape and dtype of the processed x and y items (See
+        `Dataset.metadata`). Reads the first batch of the stream."""
+        x, y = next(iter(self), (np.empty((0, 0)), np.empty((0, 0))))
+
+        return {
+            "input_shape": self.x_type.item_shape(x.shape[1:]) if len(x) else (0,),
+            "output_shape": self.y_type.item_shape(y.shape[1:]) if len(y) else (0,),
+            "input_dtype": x.dtype.name if len(x) else None,
+            "output_dtype": y.dtype.name if len(y) else None,
+        }
+
+    def generator(self) -> Iterator[Tuple["np.ndarray", "np.ndarray"]]:
+        """Returns a generator that yields processed batches indefinitely, reading the
+        stream again after each epoch. Can be passed to keras methods like:
+
+            model.fit(stream.generator(), steps_per_epoch=stream.steps_per_epoch)
+
+        If the length is unknown, `steps_per_epoch` must be chosen by the caller.
+        """
+        while True:
+            yielded = False
+            for batch in self:
+                yielded = True
+                yield batch
+
+            if not yielded:
+                return
+
+    def to_dataset(self) -> "Dataset":
+        """Reads the whole stream and returns it as a Dataset. Can be used for saving
+        the stream through a DatasetIO."""
+        x_chunks, y_chunks = [], []
+
+        for x, y in self.chunks():
+            x_chunks.append(np.asarray(x))
+            y_chunks.append(np.asarray(y))
+
+        return Dataset(
+            np.concatenate(x_chunks) if x_chunks else None,
+            np.concatenate(y_chunks) if y_chunks else None,
+            self.x_type,
+            self.y_type,
+            self.batch_size,
+        )
+
+    def __len__(self) -> int:
+        """Returns the length of the stream (in batches).
+
+        Raises:
+            TypeError: If the length of the stream is unknown.
+        """
+        if self.length is None:
+            raise TypeError("The length of the stream is unknown")
+
+        return self.steps_per_epoch
+
+    def __bool__(self) -> bool:
+        # The length may be unknown, so it can't be used for truth testing
+        return True
+
+    def __iter__(self) -> Iterator[Tuple["np.ndarray", "np.ndarray"]]:
+        """Yields the processed batches of one epoch."""
+        for batch_x, batch_y in self._raw_batches():
+            yield self.x_type.process_batch(batch_x), self.y_type.process_batch(batch_y)
+
+    def _raw_batches(self) -> Iterator[Chunk]:
+        """Yields batches of unprocessed rows, read from the stream of chunks.
+
+        Rows go through a buffer allocated once (See `_RowBuffer`), so each batch only
+        copies its own rows, regardless of the size of the shuffle buffer.
+
+        Raises:
+            ValueError: If a chunk doesn't have the same number of x and y rows.
+        """
+        shuffle = self.shuffle_buffer_size > 0
+        buffer = _RowBuffer(max(self.shuffle_buffer_size, 0) + self.batch_size)
+
+        for chunk_x, chunk_y in self.chunks():
+            chunk_x, chunk_y = np.asarray(chunk_x), np.asarray(chunk_y)
+
+            if len(chunk_x) != len(chunk_y):
+                raise ValueError(
+                    f"Chunk with {len(chunk_x)} values on x and {len(chunk_y)} on y!"
+                )
+
+            start = 0
+
+            while start < len(chunk_x):
+                start += buffer.fill(chunk_x[start:], chunk_y[start:])
+
+                if buffer.is_full():
+                    yield self._pop_batch(buffer, shuffle)
+
+        while len(buffer) > 0:
+            yield self._pop_batch(buffer, shuffle)
+
+    def _pop_batch(self, buffer: "_RowBuffer", shuffle: bool) -> Chunk:
+        """Takes a batch of rows from the buffer, at random positions if shuffling."""
+        n = min(self.batch_size, len(buffer))
+
+        if shuffle:
+            slots = self._rng.choice(len(buffer), n, replace=False)
+        else:
+            slots = np.arange(n)
+
+        return buffer.pop(slots)
+
+    def __str__(self):
+        return f"StreamingDataset (x={self.x_type}, y={self.y_type})"
+
+
+class _RowBuffer:
+    """Buffer of x and y rows with a fixed capacity, allocated when the first rows
+    are added.
+
+    Rows are taken from any position (`pop`), and the gaps are filled with the last
+    rows of the buffer, so taking n rows only moves n rows. New rows are always added
+    at the end (`fill`).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+
+        self._x: Optional["np.ndarray"] = None
+        self._y: Optional["np.ndarray"] = None
+        self._size = 0
+
+    def fill(self, x: "np.ndarray", y: "np.ndarray") -> int:
+        """Copies as many of the rows as fit on the buffer. Returns how many."""
+        if self._x is None:
+            self._x = np.empty((self.capacity,) + x.shape[1:], dtype=x.dtype)
+            self._y = np.empty((self.capacity,) + y.shape[1:], dtype=y.dtype)
+
+        # Chunks with other dtypes widen the buffer instead of being truncated
+        self._x = _widen(self._x, x.dtype)
+        self._y = _widen(self._y, y.dtype)
+
+        n = min(self.capacity - self._size, len(x))
+
+        self._x[self._size : self._size + n] = x[:n]
+        self._y[self._size : self._size + n] = y[:n]
+        self._size += n
+
+        return n
+
+    def pop(self, slots: "np.ndarray") -> Chunk:
+        """Returns the rows at `slots` (Distinct positions), removing them."""
+        batch_x, batch_y = self._x[slots], self._y[slots]
+
+        remaining = self._size - len(slots)
+
+        # Gaps that remain inside the buffer are filled with the rows after it that
+        # weren't taken
+        gaps = slots[slots < remaining]
+        moved = np.setdiff1d(np.arange(remaining, self._size), slots)
+
+        self._x[gaps] = self._x[moved]
+        self._y[gaps] = self._y[moved]
+        self._size = remaining
+
+        return batch_x, batch_y
+
+    def is_full(self) -> bool:
+        return self._size == self.capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def _widen(buffer: "np.ndarray", dtype: "np.dtype") -> "np.ndarray":
+    if np.can_cast(dtype, buffer.dtype):
+        return buffer
+
+    return buffer.astype(np.result_type(buffer.dtype, dtype))
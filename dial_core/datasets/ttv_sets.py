@@ -1,6 +1,8 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
+
+import numpy as np
 
 from dial_core.datasets import Dataset  # noqa: F401
 
@@ -21,6 +23,76 @@ class TTVSets:
         self.test = test
         self.validation = validation
 
+    @classmethod
+    def from_dataset(
+        cls,
+        dataset: "Dataset",
+        ratios: Tuple[float, float, float] = (0.8, 0.1, 0.1),
+        stratify: bool = True,
+        seed: Optional[int] = None,
+        name: str = "TTVSets",
+    ) -> "TTVSets":
+        """Splits the rows of `dataset` randomly into train, test and validation sets.
+
+        The returned sets are views of `dataset` (See `Dataset.view`), so no data is
+        copied. Sets with a ratio of 0 are None.
+
+        Args:
+            dataset: Dataset to split.
+            ratios: Proportion of rows of the train, test and validation sets. They
+                don't need to add up to 1.
+            stratify: If True, each set keeps the proportion of rows of each label (y
+                value) of the whole dataset.
+            seed: Seed used for shuffling the rows.
+            name: Name of the sets.
+
+        Raises:
+            ValueError: If the ratios aren't three non-negative numbers, or all of them
+                are 0.
+        """
+        ratios = np.asarray(ratios, dtype=np.float64)
+
+        if ratios.shape != (3,) or (ratios < 0).any() or ratios.sum() <= 0:
+            raise ValueError(f"Invalid train/test/validation ratios: {ratios}")
+
+        row_count = dataset.row_count()
+        rows = np.random.default_rng(seed).permutation(row_count)
+
+        if stratify and row_count > 0:
+            labels = dataset.y
+            labels = labels.reshape(row_count, -1) if labels.ndim > 1 else labels
+            _, label_indices = np.unique(
+                labels, axis=0 if labels.ndim > 1 else None, return_inverse=True
+            )
+            label_indices = label_indices.ravel()[rows]
+
+            # Group the (shuffled) rows by label, and find the position of each row
+            # inside its group
+            order = np.argsort(label_indices, kind="stable")
+            rows, label_indices = rows[order], label_indices[order]
+
+            label_counts = np.bincount(label_indices)
+            label_starts = np.cumsum(label_counts) - label_counts
+
+            group_sizes = label_counts[label_indices]
+            group_positions = np.arange(row_count) - label_starts[label_indices]
+        else:
+            group_sizes = row_count
+            group_positions = np.arange(row_count)
+
+        # Each group is cut at the same proportions
+        bounds = np.cumsum(ratios / ratios.sum())[:2]
+        splits = sum(
+            group_positions >= np.floor(bound * group_sizes + 0.5) for bound in bounds
+        )
+
+        train, test, validation = (
+            dataset.view(np.sort(rows[splits == i])) if ratio > 0 else None
+            for i, ratio in enumerate(ratios)
+        )
+
+        return cls(name, train=train, test=test, validation=validation)
+
     def to_dict(self) -> Dict[str, str]:
         def extract_dataset_info(dataset):
             return (
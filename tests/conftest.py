@@ -7,7 +7,16 @@ import numpy as np
 import pytest
 
 from dial_core.datasets import Dataset, TTVSets
-from dial_core.datasets.datatype import Categorical, ImageArray, Numeric, NumericArray
+from dial_core.datasets.datatype import (
+    Categorical,
+    CompressedImage,
+    ImageArray,
+    ImagePath,
+    Numeric,
+    NumericArray,
+    PaddedSequence,
+    SparseArray,
+)
 from dial_core.node_editor import InputPort, Node, NodeRegistry, OutputPort, Port, Scene
 from dial_core.notebook import NodeCellsRegistryFactory, NotebookProjectGeneratorFactory
 from dial_core.plugin import Plugin, PluginManager
@@ -210,6 +219,14 @@ def categorical_obj():
     return Categorical(["t-shirt", "jeans", "glasses"])
 
 
+@pytest.fixture
+def compressedimage_obj():
+    """
+    Returns an instance of CompressedImage.
+    """
+    return CompressedImage()
+
+
 @pytest.fixture
 def imagearray_obj():
     """
@@ -218,6 +235,30 @@ def imagearray_obj():
     return ImageArray()
 
 
+@pytest.fixture
+def imagepath_obj():
+    """
+    Returns an instance of ImagePath.
+    """
+    return ImagePath()
+
+
+@pytest.fixture
+def paddedsequence_obj():
+    """
+    Returns an instance of PaddedSequence.
+    """
+    return PaddedSequence()
+
+
+@pytest.fixture
+def sparsearray_obj():
+    """
+    Returns an instance of SparseArray with rows of 5 values.
+    """
+    return SparseArray(size=5)
+
+
 @pytest.fixture
 def numeric_obj():
     """
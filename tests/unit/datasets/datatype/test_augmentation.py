@@ -0,0 +1,66 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.datatype.augmentation import ImageAugmentation
+
+
+@pytest.fixture
+def images():
+    return np.arange(2 * 3 * 4, dtype=np.uint8).reshape(2, 3, 4)
+
+
+def test_no_augmentation(images):
+    augmented = ImageAugmentation()(images, np.random.default_rng(0))
+
+    assert augmented.tolist() == images.tolist()
+
+
+def test_flips(images):
+    augmentation = ImageAugmentation(horizontal_flip=True, vertical_flip=True)
+
+    augmented = augmentation(images, np.random.default_rng(0))
+
+    assert augmented.dtype == np.uint8
+    for image, augmented_image in zip(images, augmented):
+        assert any(
+            (augmented_image == flipped).all()
+            for flipped in (image, image[::-1], image[:, ::-1], image[::-1, ::-1])
+        )
+
+
+def test_shifts_keep_shape_and_channels():
+    images = np.random.default_rng(0).integers(0, 255, (8, 5, 5, 3), dtype=np.uint8)
+
+    augmented = ImageAugmentation(max_shift=2)(images, np.random.default_rng(0))
+
+    assert augmented.shape == images.shape
+    assert set(np.unique(augmented)) <= set(np.unique(images))
+
+
+def test_brightness_is_clipped():
+    images = np.array([[[0, 255]]], dtype=np.uint8)
+
+    augmented = ImageAugmentation(brightness=1.0)(images, np.random.default_rng(0))
+
+    assert augmented.dtype == np.uint8
+    assert augmented.min() >= 0 and augmented.max() <= 255
+    assert augmented.tolist() != images.tolist()
+
+
+def test_reproducible_with_same_random_state(images):
+    augmentation = ImageAugmentation(True, True, 1, 0.2)
+
+    first = augmentation(images, np.random.default_rng(42))
+    second = augmentation(images, np.random.default_rng(42))
+
+    assert first.tolist() == second.tolist()
+
+
+def test_to_dict_from_dict():
+    augmentation = ImageAugmentation(horizontal_flip=True, max_shift=3)
+
+    restored = ImageAugmentation.from_dict(augmentation.to_dict())
+
+    assert restored.to_dict() == augmentation.to_dict()
@@ -16,6 +16,128 @@ def test_process_out_of_bounds(categorical_obj):
         categorical_obj.process(100)
 
 
+def test_process_batch(categorical_obj):
+    assert categorical_obj.process_batch(np.array([1, 0, 2])).tolist() == [
+        [0, 1, 0],
+        [1, 0, 0],
+        [0, 0, 1],
+    ]
+
+
+def test_process_batch_negative_index(categorical_obj):
+    with pytest.raises(IndexError):
+        categorical_obj.process_batch(np.array([0, -1]))
+
+
+def test_process_batch_sparse(categorical_obj):
+    categorical_obj.sparse = True
+
+    processed_batch = categorical_obj.process_batch(np.array([2, 0], dtype=np.uint8))
+
+    assert processed_batch.dtype == np.int32
+    assert processed_batch.tolist() == [2, 0]
+
+
+def test_process_sparse(categorical_obj):
+    categorical_obj.sparse = True
+
+    assert categorical_obj.process(1) == 1
+
+
+def test_one_hot_table_is_reused(categorical_obj):
+    categorical_obj.process_batch(np.array([0]))
+    table = categorical_obj._one_hot_table
+
+    categorical_obj.process_batch(np.array([1]))
+
+    assert categorical_obj._one_hot_table is table
+
+    categorical_obj.categories = categorical_obj.categories + ["hat"]
+
+    assert categorical_obj.process_batch(np.array([3])).tolist() == [[0, 0, 0, 1]]
+
+
+def test_process_doesnt_return_table_rows(categorical_obj):
+    encoded = categorical_obj.process(0)
+    encoded[0] = 5
+
+    assert categorical_obj.process(0).tolist() == [1, 0, 0]
+
+
+def test_process_batch_dtype(categorical_obj):
+    categorical_obj.dtype = "float16"
+
+    assert categorical_obj.process_batch(np.array([1])).dtype == np.float16
+
+
+def test_convert_to_expected_format_after_changing_categories(categorical_obj):
+    categorical_obj.convert_to_expected_format("jeans")
+
+    categorical_obj.categories = ["jeans", "hat"]
+
+    assert categorical_obj.convert_to_expected_format("jeans") == 0
+    assert categorical_obj.convert_to_expected_format("hat") == 1
+
+
+def test_convert_after_renaming_category_in_place(categorical_obj):
+    categorical_obj.convert_many(["t-shirt", "jeans"])
+
+    categorical_obj.categories[1] = "shorts"
+
+    assert categorical_obj.convert_to_expected_format("shorts") == 1
+    assert categorical_obj.convert_many(["shorts", "t-shirt"]).tolist() == [1, 0]
+
+    with pytest.raises(ValueError):
+        categorical_obj.convert_to_expected_format("jeans")
+
+
+@pytest.mark.parametrize(
+    "test_input, expected",
+    [
+        (np.array([2, 0, 1]), [2, 0, 1]),
+        (np.array([[2], [0]]), [2, 0]),
+        (np.array([2.0, 1.0]), [2, 1]),
+        (np.array(["glasses", "t-shirt", "glasses", "1"]), [2, 0, 2, 1]),
+        (np.array([[0, 0, 1], [0.9, 0.1, 0]]), [2, 0]),
+        ([], []),
+    ],
+)
+def test_convert_many(categorical_obj, test_input, expected):
+    assert categorical_obj.convert_many(test_input).tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "test_input",
+    [
+        np.array([0, 3]),
+        np.array([-1]),
+        np.array([0.5]),
+        np.array(["jeans", "hat"]),
+        np.array([[0, 1], [1, 0]]),
+    ],
+)
+def test_convert_many_invalid(categorical_obj, test_input):
+    with pytest.raises(ValueError):
+        categorical_obj.convert_many(test_input)
+
+
+def test_compact(categorical_obj):
+    compacted = categorical_obj.compact(np.array([2, 0, 1]))
+
+    assert compacted.dtype == np.uint8
+    assert compacted.tolist() == [2, 0, 1]
+
+
+def test_compact_integral_floats(categorical_obj):
+    assert categorical_obj.compact(np.array([2.0, 1.0])).dtype == np.uint8
+    assert categorical_obj.compact(np.array([0.5])).dtype == np.float64
+
+
+def test_process_batch_out_of_bounds(categorical_obj):
+    with pytest.raises(IndexError):
+        categorical_obj.process_batch(np.array([0, 100]))
+
+
 @pytest.mark.parametrize(
     "test_input, expected", [(0, "t-shirt"), (1, "jeans"), (2, "glasses")]
 )
@@ -28,6 +150,13 @@ def test_display_out_of_bounds(categorical_obj):
         categorical_obj.display(100)
 
 
+def test_display_batch(categorical_obj):
+    assert categorical_obj.display_batch(np.array([2, 0])).tolist() == [
+        "glasses",
+        "t-shirt",
+    ]
+
+
 def test_convert_to_expected_format(categorical_obj):
     assert categorical_obj.convert_to_expected_format(0) == 0
     assert categorical_obj.convert_to_expected_format("jeans") == 1
@@ -58,16 +187,20 @@ def test_str(categorical_obj):
 def test_to_dict(categorical_obj):
     assert categorical_obj.to_dict() == {
         "class": "Categorical",
+        "dtype": "float32",
         "categories": ["t-shirt", "jeans", "glasses"],
+        "sparse": False,
     }
 
 
 def test_from_dict(categorical_obj):
-    categorical_obj.from_dict({"categories": ["a", "b"]})
+    categorical_obj.from_dict({"categories": ["a", "b"], "dtype": "float16"})
 
     assert categorical_obj.to_dict() == {
         "class": "Categorical",
+        "dtype": "float16",
         "categories": ["a", "b"],
+        "sparse": False,
     }
 
 
@@ -0,0 +1,89 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import io
+import pickle
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from dial_core.datasets.datatype import CompressedImage
+
+
+def encode(image: "np.ndarray", image_format: str = "PNG") -> bytes:
+    with io.BytesIO() as encoded:
+        Image.fromarray(image).save(encoded, format=image_format)
+        return encoded.getvalue()
+
+
+@pytest.fixture
+def images():
+    return [np.full((3, 3), i * 60, dtype=np.uint8) for i in range(4)]
+
+
+def test_add_encoded(compressedimage_obj, images):
+    encoded = [encode(image) for image in images]
+
+    spans = compressedimage_obj.add_encoded(encoded)
+
+    assert spans.shape == (4, 2)
+    assert spans[:, 1].tolist() == [len(e) for e in encoded]
+    assert spans[1:, 0].tolist() == np.cumsum([len(e) for e in encoded])[:-1].tolist()
+    assert len(compressedimage_obj.blob) == sum(len(e) for e in encoded)
+
+
+def test_display(compressedimage_obj, images):
+    spans = compressedimage_obj.add_encoded([encode(image) for image in images])
+
+    assert compressedimage_obj.display(spans[2]).tolist() == images[2].tolist()
+
+
+def test_process_batch(compressedimage_obj, images):
+    spans = compressedimage_obj.add_encoded([encode(image) for image in images])
+
+    batch = compressedimage_obj.process_batch(spans[[3, 1]])
+
+    assert batch.shape == (2, 3, 3, 1)
+    assert batch.dtype == np.float32
+    assert batch[:, 0, 0, 0] == pytest.approx([180 / 255, 60 / 255])
+
+
+@pytest.mark.parametrize("as_path", [False, True])
+def test_convert_to_expected_format(compressedimage_obj, images, tmp_path, as_path):
+    data = images[1]
+
+    if as_path:
+        data = str(tmp_path / "image.png")
+        Image.fromarray(images[1]).save(data)
+
+    compressedimage_obj.convert_to_expected_format(images[0])
+    span = compressedimage_obj.convert_to_expected_format(data)
+
+    assert span[0] > 0
+    assert compressedimage_obj.display(span).tolist() == images[1].tolist()
+
+
+def test_jpeg(compressedimage_obj):
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    span = compressedimage_obj.add_encoded([encode(image, "JPEG")])[0]
+
+    assert compressedimage_obj.display(span).shape == (8, 8, 3)
+
+
+def test_arrays(compressedimage_obj, images):
+    spans = compressedimage_obj.add_encoded([encode(image) for image in images])
+
+    restored = CompressedImage()
+    restored.set_arrays(compressedimage_obj.arrays())
+
+    assert restored.display(spans[3]).tolist() == images[3].tolist()
+
+
+def test_pickable(compressedimage_obj, images):
+    spans = compressedimage_obj.add_encoded([encode(image) for image in images])
+
+    restored = pickle.loads(pickle.dumps(compressedimage_obj))
+
+    assert restored.display(spans[0]).tolist() == images[0].tolist()
+    assert "blob" not in compressedimage_obj.to_dict()
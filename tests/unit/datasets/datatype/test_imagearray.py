@@ -5,13 +5,46 @@ import pickle
 import numpy as np
 import pytest
 
+from dial_core.datasets.datatype.augmentation import ImageAugmentation
+
 
 @pytest.mark.parametrize(
     "test_input, expected",
     [(np.array([1, 2, 3]), np.array([1 / 255, 2 / 255, 3 / 255]))],
 )
 def test_process(imagearray_obj, test_input, expected):
-    assert np.alltrue(imagearray_obj.process(test_input) == expected)
+    processed = imagearray_obj.process(test_input)
+
+    assert processed.dtype == np.float32
+    assert processed.ravel() == pytest.approx(expected)
+
+
+def test_process_batch(imagearray_obj):
+    batch = np.full((4, 2, 2), 255)
+
+    processed_batch = imagearray_obj.process_batch(batch)
+
+    assert processed_batch.shape == (4, 2, 2, 1)
+    assert processed_batch.dtype == np.float32
+    assert np.alltrue(processed_batch == 1.0)
+
+
+def test_process_batch_float16(imagearray_obj):
+    imagearray_obj.dtype = "float16"
+
+    processed_batch = imagearray_obj.process_batch(np.full((2, 2, 2), 51, np.uint8))
+
+    assert processed_batch.dtype == np.float16
+    assert np.alltrue(processed_batch == np.float16(0.2))
+
+
+def test_process_batch_with_transformations(imagearray_obj):
+    imagearray_obj.transformations = [lambda image: image * 2]
+
+    processed_batch = imagearray_obj.process_batch(np.full((2, 3, 3, 3), 255))
+
+    assert processed_batch.shape == (2, 3, 3, 3)
+    assert np.alltrue(processed_batch == 2.0)
 
 
 @pytest.mark.parametrize("input_output", [(np.array([1, 2, 3]))])
@@ -23,6 +56,42 @@ def test_convert_to_expected_format(imagearray_obj):
     assert imagearray_obj.convert_to_expected_format([0, 5, 12]).tolist() == [0, 5, 12]
 
 
+@pytest.mark.parametrize(
+    "data, dtype",
+    [
+        (np.array([[0, 255]]), np.uint8),
+        (np.array([[0, 256]]), np.int64),
+        (np.array([[0.0, 0.5]]), np.float64),
+    ],
+)
+def test_compact(imagearray_obj, data, dtype):
+    compacted = imagearray_obj.compact(data)
+
+    assert compacted.dtype == dtype
+    assert compacted.tolist() == data.tolist()
+
+
 def test_pickable(imagearray_obj):
     obj = pickle.dumps(imagearray_obj)
     pickle.loads(obj)
+
+
+def test_pickable_with_augmentation(imagearray_obj):
+    imagearray_obj.augmentation = ImageAugmentation(vertical_flip=True)
+
+    restored = pickle.loads(pickle.dumps(imagearray_obj))
+
+    assert restored.augmentation.vertical_flip
+
+
+def test_augmentation_only_with_random_state(imagearray_obj):
+    imagearray_obj.augmentation = ImageAugmentation(brightness=1.0)
+    batch = np.full((2, 2, 2), 100, dtype=np.uint8)
+
+    assert (imagearray_obj.process_batch(batch) == np.float32(100 / 255)).all()
+
+    augmented = imagearray_obj.process_batch(
+        batch, random_state=np.random.default_rng(0)
+    )
+
+    assert not (augmented == np.float32(100 / 255)).all()
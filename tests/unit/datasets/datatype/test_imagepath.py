@@ -0,0 +1,139 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import os
+import pickle
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from dial_core.datasets.datatype import ImagePath
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for i in range(4):
+        path = str(tmp_path / f"{i}.png")
+        Image.fromarray(np.full((4, 4), i * 50, dtype=np.uint8)).save(path)
+        paths.append(path)
+
+    return np.array(paths)
+
+
+def test_process(imagepath_obj, image_paths):
+    assert np.alltrue(imagepath_obj.process(image_paths[1]) == 50 / 255)
+
+
+def test_display(imagepath_obj, image_paths):
+    assert imagepath_obj.display(image_paths[2]).tolist() == [[100] * 4] * 4
+
+
+def test_process_batch(imagepath_obj, image_paths):
+    batch = imagepath_obj.process_batch(image_paths)
+
+    assert batch.shape == (4, 4, 4)
+    assert batch.dtype == np.float32
+    assert batch[:, 0, 0] == pytest.approx([i * 50 / 255 for i in range(4)])
+
+
+def test_display_batch(imagepath_obj, image_paths):
+    batch = imagepath_obj.display_batch(image_paths)
+
+    assert batch.dtype == np.uint8
+    assert [image[0, 0] for image in batch] == [0, 50, 100, 150]
+
+
+def test_cached_decoding(imagepath_obj, image_paths, tmp_path):
+    imagepath_obj.cache_dir = str(tmp_path / "cache")
+
+    first_batch = imagepath_obj.display_batch(image_paths)
+
+    assert len(os.listdir(imagepath_obj.cache_dir)) == 4
+
+    with patch.object(imagepath_obj, "_decode") as decode_mock:
+        second_batch = imagepath_obj.display_batch(image_paths)
+
+        decode_mock.assert_not_called()
+
+    assert second_batch.tolist() == first_batch.tolist()
+
+
+def test_modified_images_are_decoded_again(imagepath_obj, image_paths, tmp_path):
+    imagepath_obj.cache_dir = str(tmp_path / "cache")
+
+    imagepath_obj.display(image_paths[0])
+
+    Image.fromarray(np.full((2, 2), 7, dtype=np.uint8)).save(image_paths[0])
+
+    assert imagepath_obj.display(image_paths[0]).tolist() == [[7, 7], [7, 7]]
+
+
+def test_convert_to_expected_format(imagepath_obj):
+    assert imagepath_obj.convert_to_expected_format("foo.png") == os.path.abspath(
+        "foo.png"
+    )
+
+
+def test_pickable(imagepath_obj):
+    imagepath_obj.cache_dir = "cache"
+
+    pickled_imagepath_obj = pickle.loads(pickle.dumps(imagepath_obj))
+
+    assert pickled_imagepath_obj.cache_dir == "cache"
+
+
+@pytest.fixture
+def jpeg_path(tmp_path):
+    path = str(tmp_path / "image.jpg")
+
+    image = np.zeros((96, 128, 3), dtype=np.uint8)
+    image[..., 0] = 200
+    Image.fromarray(image).save(path)
+
+    return path
+
+
+def test_target_size(jpeg_path):
+    image = ImagePath(target_size=(12, 16)).display(jpeg_path)
+
+    assert image.shape == (12, 16, 3)
+    assert abs(int(image[..., 0].mean()) - 200) <= 2
+
+
+def test_target_size_uses_jpeg_draft(jpeg_path):
+    with patch.object(Image.Image, "resize", autospec=True) as resize_mock:
+        ImagePath(target_size=(24, 32)).display(jpeg_path)
+
+    # The decoder scales the image by 1/4, so it doesn't need resampling
+    resize_mock.assert_not_called()
+
+
+def test_color_mode(jpeg_path, image_paths):
+    assert ImagePath(color_mode="L").display(jpeg_path).shape == (96, 128)
+    assert ImagePath(color_mode="RGB").display(image_paths[0]).shape == (4, 4, 3)
+
+
+def test_dtype(image_paths):
+    assert ImagePath(dtype="float16").process_batch(image_paths).dtype == np.float16
+
+
+def test_cached_decoding_depends_on_size(jpeg_path, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+
+    ImagePath(cache_dir=cache_dir).display(jpeg_path)
+    image = ImagePath(cache_dir=cache_dir, target_size=(6, 8)).display(jpeg_path)
+
+    assert image.shape == (6, 8, 3)
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_to_dict_from_dict():
+    imagepath = ImagePath(target_size=(6, 8), color_mode="L")
+
+    restored = ImagePath().from_dict(imagepath.to_dict())
+
+    assert restored.target_size == (6, 8)
+    assert restored.color_mode == "L"
+    assert restored.cache_key()[-2:] == ((6, 8), "L")
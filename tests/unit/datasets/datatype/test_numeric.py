@@ -2,6 +2,7 @@
 
 import pickle
 
+import numpy as np
 import pytest
 
 
@@ -10,6 +11,10 @@ def test_process(numeric_obj, test_input, expected):
     assert numeric_obj.process(test_input) == expected
 
 
+def test_process_batch(numeric_obj):
+    assert numeric_obj.process_batch(np.array([1, 2, 3])).tolist() == [1, 2, 3]
+
+
 @pytest.mark.parametrize("test_input, expected", [(0, "0"), (1, "1")])
 def test_display(numeric_obj, test_input, expected):
     assert numeric_obj.display(test_input) == expected
@@ -13,6 +13,12 @@ def test_process(numericarray_obj, test_input, expected):
     assert np.alltrue(numericarray_obj.process(test_input) == expected)
 
 
+def test_process_batch(numericarray_obj):
+    batch = np.array([[1, 2], [3, 4]])
+
+    assert numericarray_obj.process_batch(batch).tolist() == [[1, 2], [3, 4]]
+
+
 @pytest.mark.parametrize("test_input, expected", [(np.array([1, 2]), "[1, 2]")])
 def test_display(numericarray_obj, test_input, expected):
     assert numericarray_obj.display(test_input) == expected
@@ -0,0 +1,79 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import pickle
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.datatype import PaddedSequence
+
+
+@pytest.fixture
+def sequences():
+    return [[1, 2, 3], [4], [], [5, 6]]
+
+
+def test_add_sequences(paddedsequence_obj, sequences):
+    spans = paddedsequence_obj.add_sequences(sequences)
+
+    assert spans.tolist() == [[0, 3], [3, 1], [4, 0], [4, 2]]
+    assert paddedsequence_obj.values.tolist() == [1, 2, 3, 4, 5, 6]
+
+
+def test_process_batch_pads_to_longest(paddedsequence_obj, sequences):
+    spans = paddedsequence_obj.add_sequences(sequences)
+
+    assert paddedsequence_obj.process_batch(spans[[1, 3]]).tolist() == [
+        [4, 0],
+        [5, 6],
+    ]
+    assert paddedsequence_obj.process_batch(spans).shape == (4, 3)
+
+
+def test_process_batch_with_features():
+    paddedsequence = PaddedSequence(padding_value=-1)
+    spans = paddedsequence.add_sequences([np.ones((2, 3)), np.zeros((1, 3))])
+
+    batch = paddedsequence.process_batch(spans)
+
+    assert batch.shape == (2, 2, 3)
+    assert batch[1, 1].tolist() == [-1, -1, -1]
+
+
+def test_max_length(sequences):
+    paddedsequence = PaddedSequence(max_length=2)
+    spans = paddedsequence.add_sequences(sequences)
+
+    assert paddedsequence.process(spans[0]).tolist() == [1, 2]
+    assert paddedsequence.process_batch(spans).tolist() == [
+        [1, 2],
+        [4, 0],
+        [0, 0],
+        [5, 6],
+    ]
+    assert paddedsequence.lengths(spans).tolist() == [2, 1, 0, 2]
+
+
+def test_dtype(paddedsequence_obj, sequences):
+    spans = paddedsequence_obj.add_sequences(sequences)
+    paddedsequence_obj.dtype = "float32"
+
+    assert paddedsequence_obj.process_batch(spans).dtype == np.float32
+
+
+def test_convert_to_expected_format(paddedsequence_obj):
+    paddedsequence_obj.convert_to_expected_format([7, 8])
+    span = paddedsequence_obj.convert_to_expected_format(np.array([9]))
+
+    assert span.tolist() == [2, 1]
+    assert paddedsequence_obj.process(span).tolist() == [9]
+
+
+def test_pickable(paddedsequence_obj, sequences):
+    spans = paddedsequence_obj.add_sequences(sequences)
+    paddedsequence_obj.padding_value = -1
+
+    restored = pickle.loads(pickle.dumps(paddedsequence_obj))
+
+    assert restored.process_batch(spans[:2]).tolist() == [[1, 2, 3], [4, -1, -1]]
+    assert "values" not in paddedsequence_obj.to_dict()
@@ -0,0 +1,43 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import pickle
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.datatype import CompressedImage, PaddedSequence, SparseArray
+
+
+@pytest.mark.parametrize(
+    "datatype, values",
+    [
+        (PaddedSequence(), {"values": np.arange(6, dtype=np.float32)}),
+        (CompressedImage(), {"blob": np.arange(6, dtype=np.uint8)}),
+        (
+            SparseArray(size=8),
+            {
+                "values": np.arange(6, dtype=np.float32),
+                "indices": np.arange(6, dtype=np.uint8),
+            },
+        ),
+    ],
+)
+def test_span_arrays_roundtrip(datatype, values):
+    spans = datatype._append_spans([2, 0, 4], **values)
+
+    assert spans.tolist() == [[0, 2], [2, 0], [2, 4]]
+
+    restored = pickle.loads(pickle.dumps(datatype))
+    arrays = restored.arrays()
+
+    assert sorted(arrays) == sorted(values)
+
+    for name, array in values.items():
+        assert arrays[name].tolist() == array.tolist()
+        assert arrays[name].dtype == array.dtype
+
+
+def test_empty_span_arrays_dtype():
+    assert CompressedImage().blob.dtype == np.uint8
+    assert SparseArray(size=300).indices.dtype == np.uint16
+    assert pickle.loads(pickle.dumps(SparseArray(size=300))).indices.dtype == np.uint16
@@ -0,0 +1,110 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import pickle
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.datatype import SparseArray
+
+
+@pytest.fixture
+def rows():
+    return np.array(
+        [[0, 1, 0, 0, 2], [0, 0, 0, 0, 0], [3, 0, 0, 4, 0]], dtype=np.float32
+    )
+
+
+def test_add_rows(sparsearray_obj, rows):
+    spans = sparsearray_obj.add_rows(rows)
+
+    assert spans.tolist() == [[0, 2], [2, 0], [2, 2]]
+    assert sparsearray_obj.values.tolist() == [1, 2, 3, 4]
+    assert sparsearray_obj.indices.tolist() == [1, 4, 0, 3]
+    assert sparsearray_obj.indices.dtype == np.uint8
+
+
+def test_add_rows_wrong_size(sparsearray_obj):
+    with pytest.raises(ValueError):
+        sparsearray_obj.add_rows(np.ones((2, 3)))
+
+
+def test_add_csr(sparsearray_obj):
+    spans = sparsearray_obj.add_csr([9, 1, 2, 3], [0, 4, 2, 1], [1, 2, 2, 4])
+
+    assert spans.tolist() == [[0, 1], [1, 0], [1, 2]]
+    assert sparsearray_obj.process_batch(spans).tolist() == [
+        [0, 0, 0, 0, 1],
+        [0, 0, 0, 0, 0],
+        [0, 3, 2, 0, 0],
+    ]
+
+
+def test_add_csr_out_of_bounds(sparsearray_obj):
+    with pytest.raises(ValueError):
+        sparsearray_obj.add_csr([1], [5], [0, 1])
+
+
+def test_process_batch(sparsearray_obj, rows):
+    spans = sparsearray_obj.add_rows(rows)
+
+    assert np.array_equal(sparsearray_obj.process_batch(spans[[2, 0]]), rows[[2, 0]])
+    assert np.array_equal(sparsearray_obj.process(spans[0]), rows[0])
+
+
+def test_to_csr(sparsearray_obj, rows):
+    spans = sparsearray_obj.add_rows(rows)
+
+    values, indices, indptr = sparsearray_obj.to_csr(spans[[2, 1, 0]])
+
+    assert values.tolist() == [3, 4, 1, 2]
+    assert indices.tolist() == [0, 3, 1, 4]
+    assert indptr.tolist() == [0, 2, 2, 4]
+
+
+def test_dtype(sparsearray_obj, rows):
+    spans = sparsearray_obj.add_rows(rows)
+    sparsearray_obj.dtype = "float16"
+
+    assert sparsearray_obj.process_batch(spans).dtype == np.float16
+
+
+def test_display(sparsearray_obj, rows):
+    spans = sparsearray_obj.add_rows(rows)
+
+    assert sparsearray_obj.display(spans[2]) == "{0: 3, 3: 4}"
+    assert sparsearray_obj.display(spans[1]) == "{}"
+
+
+def test_convert_to_expected_format(sparsearray_obj):
+    sparsearray_obj.convert_to_expected_format([1, 0, 0, 0, 0])
+    span = sparsearray_obj.convert_to_expected_format([0, 0, 5, 0, 0])
+
+    assert span.tolist() == [1, 1]
+    assert sparsearray_obj.process(span).tolist() == [0, 0, 5, 0, 0]
+
+
+def test_pickable(sparsearray_obj, rows):
+    spans = sparsearray_obj.add_rows(rows)
+
+    restored = pickle.loads(pickle.dumps(sparsearray_obj))
+
+    assert restored.size == 5
+    assert np.array_equal(restored.process_batch(spans), rows)
+    assert "values" not in sparsearray_obj.to_dict()
+
+
+def test_create_from_dict(sparsearray_obj):
+    restored = SparseArray.create(SparseArray(size=70000).to_dict())
+
+    restored.add_csr([1], [69999], [0, 1])
+
+    assert restored.indices.tolist() == [69999]
+
+
+def test_cache_key_includes_size(sparsearray_obj):
+    cache_key = sparsearray_obj.cache_key()
+
+    sparsearray_obj.size = 8
+
+    assert sparsearray_obj.cache_key() != cache_key
@@ -0,0 +1,114 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.datatype import (
+    BatchFunction,
+    Clip,
+    Elementwise,
+    Normalize,
+    NumericArray,
+    Pipeline,
+    Transformation,
+)
+
+
+def test_transformation_is_abstract():
+    with pytest.raises(TypeError):
+        Transformation()
+
+
+def test_elementwise_adapter():
+    batch = np.array([[1, 2], [3, 4]])
+
+    assert Elementwise(lambda element: element.sum())(batch).tolist() == [3, 7]
+
+
+def test_consecutive_elementwise_are_fused():
+    pipeline = Pipeline([lambda e: e + 1, lambda e: e * 2, Clip(0, 5), lambda e: -e])
+
+    assert [len(stage) for stage in pipeline.stages] == [2, 1, 1]
+    assert pipeline(np.array([0, 1, 2])).tolist() == [-2, -4, -5]
+
+
+def test_in_place_stages_share_buffer():
+    batch = np.array([[0.0, 2.0], [4.0, 6.0]])
+
+    pipeline = Pipeline([Normalize(2.0, 2.0), Clip(-0.5, 1.5)])
+    transformed = pipeline(batch)
+
+    assert transformed is batch
+    assert transformed.tolist() == [[-0.5, 0.0], [1.0, 1.5]]
+
+
+def test_in_place_stages_dont_modify_source():
+    source = np.array([1.0, 2.0, 3.0])
+
+    transformed = Pipeline([Clip(None, 2.0)])(source[:2], source=source)
+
+    assert transformed.tolist() == [1.0, 2.0]
+    assert source.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_in_place_stages_dont_modify_read_only_batches():
+    batch = np.ones(3)
+    batch.setflags(write=False)
+
+    assert Pipeline([Normalize(1.0, 1.0)])(batch).tolist() == [0, 0, 0]
+    assert batch.tolist() == [1, 1, 1]
+
+
+def test_batch_function():
+    pipeline = Pipeline([BatchFunction(lambda batch: batch - batch.mean(axis=0))])
+
+    assert pipeline(np.array([[1, 4], [3, 8]])).tolist() == [[-1, -2], [1, 2]]
+
+
+def test_in_place_batch_function():
+    def double(batch):
+        batch *= 2
+
+    assert Pipeline([BatchFunction(double, in_place=True)])(
+        np.array([1, 2])
+    ).tolist() == [2, 4]
+
+
+def test_apply_to_element():
+    pipeline = Pipeline([lambda e: e * 2, Normalize(1.0, 2.0)])
+
+    assert pipeline.apply_to_element(np.array([1.0, 3.0])) == pytest.approx(
+        [0.5, 2.5]
+    )
+
+
+def test_datatype_doesnt_modify_stored_data():
+    datatype = NumericArray()
+    datatype.transformations = [Normalize(1.0, 1.0)]
+
+    data = np.array([[1.0, 2.0], [3.0, 4.0]])
+
+    assert datatype.process_batch(data).tolist() == [[0, 1], [2, 3]]
+    assert data.tolist() == [[1.0, 2.0], [3.0, 4.0]]
+
+
+def test_normalize_integer_data():
+    datatype = NumericArray()
+    datatype.transformations = [Normalize(2.0, 4.0)]
+
+    data = np.array([[1, 2], [3, 5]])
+
+    expected = [[-0.25, 0.0], [0.25, 0.75]]
+
+    assert datatype.process_batch(data).tolist() == expected
+    assert datatype.process(data[0]).tolist() == expected[0]
+    assert data.tolist() == [[1, 2], [3, 5]]
+
+
+def test_normalize_keeps_float_dtype():
+    batch = np.array([1.0, 3.0], dtype=np.float32)
+
+    transformed = Pipeline([Normalize(1.0, 2.0)])(batch)
+
+    assert transformed is batch
+    assert transformed.dtype == np.float32
@@ -3,7 +3,29 @@
 import os
 from unittest.mock import patch
 
-from dial_core.datasets.io import NpzDatasetIO, TxtDatasetIO
+import numpy as np
+import pytest
+from PIL import Image
+
+from dial_core.datasets import Dataset, TTVSets
+from dial_core.datasets.datatype import (
+    Categorical,
+    CompressedImage,
+    ImageArray,
+    ImagePath,
+    NumericArray,
+    PaddedSequence,
+    SparseArray,
+)
+from dial_core.datasets.io import (
+    CategoricalImgDatasetIO,
+    DatasetIORegistry,
+    NpyDatasetIO,
+    NpzDatasetIO,
+    ShardedDatasetIO,
+    TTVSetsIO,
+    TxtDatasetIO,
+)
 
 
 @patch("dial_core.datasets.io.dataset_io.np")
@@ -49,7 +71,116 @@ def test_npz_load(mock_np, train_dataset):
 
 
 @patch("dial_core.datasets.io.dataset_io.np")
-def test_txt_save(mock_np, train_dataset):
+def test_npy_save(mock_np, train_dataset):
+    x_filename = "x_train.npy"
+    y_filename = "y_train.npy"
+    parent_dir = "foo"
+
+    dataset_description = (
+        NpyDatasetIO()
+        .set_x_filename(x_filename)
+        .set_y_filename(y_filename)
+        .save(parent_dir, train_dataset)
+    )
+
+    calls_list = mock_np.save.call_args_list
+
+    assert calls_list[0][0] == (os.path.join(parent_dir, x_filename), train_dataset.x)
+    assert calls_list[1][0] == (os.path.join(parent_dir, y_filename), train_dataset.y)
+
+    assert dataset_description["x_filename"] == x_filename
+    assert dataset_description["y_filename"] == y_filename
+    assert dataset_description["mmap_mode"] == "r"
+
+
+def test_npy_load_is_memory_mapped(tmp_path, train_dataset):
+    dataset_description = NpyDatasetIO().save(str(tmp_path), train_dataset)
+
+    loaded_dataset = (
+        NpyDatasetIO().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert isinstance(loaded_dataset.x, np.memmap)
+    assert isinstance(loaded_dataset.y, np.memmap)
+    assert loaded_dataset.x.tolist() == train_dataset.x.tolist()
+    assert loaded_dataset.y.tolist() == train_dataset.y.tolist()
+
+
+def test_npy_load_restores_metadata(tmp_path, train_dataset):
+    dataset_description = NpyDatasetIO().save(str(tmp_path), train_dataset)
+
+    assert dataset_description["metadata"]["input_shape"] == [3]
+
+    loaded_dataset = (
+        NpyDatasetIO().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    with patch.object(loaded_dataset.x_type, "process_batch") as process_batch_mock:
+        assert loaded_dataset.input_shape == (3,)
+        assert loaded_dataset.output_shape == ()
+
+        process_batch_mock.assert_not_called()
+
+
+def test_load_with_overridden_datatypes_recomputes_metadata(tmp_path):
+    dataset = Dataset(
+        np.arange(4).reshape(2, 2),
+        np.array([0, 2]),
+        NumericArray(),
+        Categorical(["a", "b", "c"]),
+    )
+    description_path = str(tmp_path / "dataset.json")
+
+    NpzDatasetIO().save_to_file(description_path, dataset)
+
+    loaded_dataset = (
+        NpzDatasetIO()
+        .set_y_type(Categorical(["a", "b", "c", "d"], sparse=True))
+        .load_from_file(description_path)
+    )
+
+    assert loaded_dataset.output_shape == loaded_dataset[0][1].shape[1:] == ()
+
+    loaded_dataset = NpzDatasetIO().load_from_file(description_path)
+
+    with patch.object(loaded_dataset.y_type, "process_batch") as process_batch_mock:
+        assert loaded_dataset.output_shape == (3,)
+
+        process_batch_mock.assert_not_called()
+
+
+def test_npy_load_without_mmap(tmp_path, train_dataset):
+    dataset_description = (
+        NpyDatasetIO().set_mmap_mode(None).save(str(tmp_path), train_dataset)
+    )
+
+    loaded_dataset = (
+        NpyDatasetIO().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert not isinstance(loaded_dataset.x, np.memmap)
+    assert loaded_dataset.x.tolist() == train_dataset.x.tolist()
+
+
+def test_save_doesnt_compact_memory_mapped_dataset(tmp_path):
+    np.save(tmp_path / "x.npy", np.arange(16, dtype=np.int64).reshape(4, 2, 2))
+
+    dataset = Dataset(
+        np.load(tmp_path / "x.npy", mmap_mode="r"), np.arange(4), ImageArray()
+    )
+
+    NpzDatasetIO().save(str(tmp_path / "npz"), dataset)
+
+    assert isinstance(dataset.x, np.memmap)
+    assert dataset.x.dtype == np.int64
+
+    with np.load(tmp_path / "npz" / "output.npz") as data:
+        assert data["x"].dtype == np.uint8
+        assert data["x"].tolist() == dataset.x.tolist()
+
+
+@patch("dial_core.datasets.io.dataset_io.save_text_array")
+def test_txt_save(mock_save_text_array, train_dataset):
     x_filename = "x_train.txt"
     y_filename = "y_train.txt"
     parent_dir = "foo"
@@ -61,7 +192,7 @@ def test_txt_save(mock_np, train_dataset):
         .save(parent_dir, train_dataset)
     )
 
-    calls_list = mock_np.savetxt.call_args_list
+    calls_list = mock_save_text_array.call_args_list
 
     assert calls_list[0][0] == (os.path.join(parent_dir, x_filename), train_dataset.x,)
     assert calls_list[1][0] == (os.path.join(parent_dir, y_filename), train_dataset.y,)
@@ -72,8 +203,8 @@ def test_txt_save(mock_np, train_dataset):
     assert dataset_description["y_type"] == train_dataset.y_type.to_dict()
 
 
-@patch("dial_core.datasets.io.dataset_io.np")
-def test_txt_load(mock_np, train_dataset):
+@patch("dial_core.datasets.io.dataset_io.load_text_array")
+def test_txt_load(mock_load_text_array, train_dataset):
     parent_dir = "foo"
 
     dataset_description = {
@@ -83,13 +214,13 @@ def test_txt_load(mock_np, train_dataset):
         "y_type": train_dataset.y_type.to_dict(),
     }
 
-    mock_np.loadtxt.side_effect = [train_dataset.x, train_dataset.y]
+    mock_load_text_array.side_effect = [train_dataset.x, train_dataset.y]
 
     loaded_dataset = (
         TxtDatasetIO().set_description(dataset_description).load(parent_dir)
     )
 
-    calls_list = mock_np.loadtxt.call_args_list
+    calls_list = mock_load_text_array.call_args_list
     assert calls_list[0][0] == (
         os.path.join(parent_dir, dataset_description["x_filename"]),
     )
@@ -99,3 +230,297 @@ def test_txt_load(mock_np, train_dataset):
 
     assert loaded_dataset.x.tolist() == train_dataset.x.tolist()
     assert loaded_dataset.y.tolist() == train_dataset.y.tolist()
+
+
+def test_txt_save_and_load_keep_dtypes(tmp_path):
+    dataset = Dataset(
+        np.array([[1, 2], [3, 4]], dtype=np.int16),
+        np.array([1, 0]),
+        NumericArray(),
+        Categorical(["a", "b"]),
+    )
+
+    dataset_description = TxtDatasetIO().save(str(tmp_path), dataset)
+
+    loaded_dataset = (
+        TxtDatasetIO().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert loaded_dataset.x.dtype == np.int16
+    assert loaded_dataset.y.dtype == np.uint8
+    assert loaded_dataset.x.tolist() == [[1, 2], [3, 4]]
+    assert loaded_dataset.y.tolist() == [1, 0]
+
+
+def test_txt_save_and_load_csv(tmp_path):
+    dataset = Dataset(
+        np.array([[0.5, -2], [3, 1e-3]], dtype=np.float32), np.array([7, 8]),
+    )
+
+    dataset_description = (
+        TxtDatasetIO().set_delimiter(",").save(str(tmp_path), dataset)
+    )
+
+    assert (tmp_path / "x_output.txt").read_text().count(",") == 2
+
+    loaded_dataset = (
+        TxtDatasetIO().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert loaded_dataset.x.dtype == np.float32
+    assert loaded_dataset.x.tolist() == dataset.x.tolist()
+
+
+def test_categorical_img_load_category_on_filename(tmp_path, caplog):
+    for filename in ["a__0.png", "b__1.png", "a__2.png", "c__3.png", "other.png"]:
+        Image.fromarray(np.zeros((2, 2), dtype=np.uint8)).save(tmp_path / filename)
+
+    dataset_io = (
+        CategoricalImgDatasetIO()
+        .set_organization(CategoricalImgDatasetIO.Organization.CategoryOnFilename)
+        .set_filename_category_regex(r"(\w)__\d+\.png")
+        .set_x_type(ImagePath())
+        .set_y_type(Categorical(["a", "b"]))
+    )
+
+    dataset = dataset_io.load(str(tmp_path))
+
+    loaded = sorted(
+        (os.path.basename(x), y) for x, y in zip(dataset.x.tolist(), dataset.y.tolist())
+    )
+
+    assert loaded == [("a__0.png", 0), ("a__2.png", 0), ("b__1.png", 1)]
+
+    assert "Can't extract the category of other.png" in caplog.text
+    assert "Skipping the images of category c" in caplog.text
+
+
+@pytest.fixture
+def images_dataset():
+    images = np.arange(5 * 4 * 4 * 3, dtype=np.uint8).reshape(5, 4, 4, 3)
+
+    return Dataset(images, np.array([0, 1, 1, 0, 1]), y_type=Categorical(["a", "b"]))
+
+
+def test_categorical_img_save_category_on_folders(tmp_path, images_dataset):
+    progress = []
+
+    (
+        CategoricalImgDatasetIO()
+        .set_workers(2)
+        .set_chunk_size(2)
+        .set_progress_callback(lambda *args: progress.append(args))
+        .save(str(tmp_path), images_dataset)
+    )
+
+    assert sorted(os.listdir(tmp_path / "0")) == ["0.png", "3.png"]
+    assert sorted(os.listdir(tmp_path / "1")) == ["1.png", "2.png", "4.png"]
+
+    with Image.open(tmp_path / "1" / "2.png") as image:
+        assert np.array_equal(np.array(image), images_dataset.x[2])
+
+    assert [(written, total) for written, total, _ in progress] == [
+        (2, 5),
+        (4, 5),
+        (5, 5),
+    ]
+    assert all(images_per_second >= 0 for *_, images_per_second in progress)
+
+
+@pytest.mark.parametrize(
+    "image_format",
+    [
+        CategoricalImgDatasetIO.ImageFormat.PNG,
+        CategoricalImgDatasetIO.ImageFormat.JPEG,
+        CategoricalImgDatasetIO.ImageFormat.WebP,
+        CategoricalImgDatasetIO.ImageFormat.Uncompressed,
+    ],
+)
+def test_categorical_img_save_image_format(tmp_path, images_dataset, image_format):
+    dataset_description = (
+        CategoricalImgDatasetIO()
+        .set_organization(CategoricalImgDatasetIO.Organization.CategoryOnFilename)
+        .set_image_format(image_format)
+        .set_compression_level(1)
+        .set_quality(75)
+        .save(str(tmp_path), images_dataset)
+    )
+
+    assert dataset_description["image_format"] == image_format.name
+    assert dataset_description["compression_level"] == 1
+    assert dataset_description["quality"] == 75
+
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        f"{y}__{i}.{image_format.value}" for i, y in enumerate([0, 1, 1, 0, 1])
+    )
+
+    restored_io = CategoricalImgDatasetIO().set_description(dataset_description)
+    assert restored_io.get_image_format() == image_format
+
+
+def test_categorical_img_save_datatype_arrays(tmp_path):
+    x_type = CompressedImage()
+    x = np.array([x_type.convert_to_expected_format(np.zeros((2, 2)))])
+
+    with pytest.raises(ValueError):
+        CategoricalImgDatasetIO().save(str(tmp_path), Dataset(x, np.zeros(1), x_type))
+
+
+@pytest.mark.parametrize(
+    "dataset_io_class",
+    [NpzDatasetIO, NpyDatasetIO, ShardedDatasetIO, TxtDatasetIO],
+)
+def test_save_and_load_datatype_arrays(tmp_path, dataset_io_class):
+    x_type = CompressedImage()
+    images = [np.full((2, 2), i, dtype=np.uint8) for i in range(3)]
+
+    x = np.array([x_type.convert_to_expected_format(image) for image in images])
+    dataset = Dataset(x, np.arange(3), x_type)
+
+    dataset_description = dataset_io_class().save(str(tmp_path), dataset)
+
+    loaded_dataset = (
+        dataset_io_class().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert loaded_dataset.x_type is not x_type
+    assert loaded_dataset.x_type.blob.tolist() == x_type.blob.tolist()
+    assert loaded_dataset.items(1, 2, Dataset.Role.Display)[0][0].tolist() == [
+        [1, 1],
+        [1, 1],
+    ]
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_save_and_load_sparse_array(tmp_path, compressed):
+    x_type = SparseArray(size=1000)
+    rows = np.zeros((10, 1000))
+    rows[np.arange(10), np.arange(10) * 7] = np.arange(1, 11)
+
+    dataset = Dataset(x_type.add_rows(rows), np.arange(10), x_type)
+
+    dataset_description = (
+        NpzDatasetIO().set_compressed(compressed).save(str(tmp_path), dataset)
+    )
+
+    loaded_dataset = NpzDatasetIO().set_description(dataset_description).load(
+        str(tmp_path)
+    )
+
+    assert loaded_dataset.x_type.size == 1000
+    assert loaded_dataset.x.shape == (10, 2)
+    assert np.array_equal(loaded_dataset.items(0, 10)[0], rows)
+
+    # Only the non-zero values are stored
+    assert os.path.getsize(tmp_path / "output.npz") < rows.nbytes // 10
+
+
+@pytest.fixture
+def sharded_dataset():
+    return Dataset(
+        np.arange(100, dtype=np.uint8).reshape(50, 2),
+        np.arange(50, dtype=np.int16),
+        NumericArray(),
+    )
+
+
+def test_sharded_save_and_load(tmp_path, sharded_dataset):
+    dataset_description = (
+        ShardedDatasetIO()
+        .set_shard_size(16)
+        .set_workers(3)
+        .save(str(tmp_path), sharded_dataset)
+    )
+
+    shards = dataset_description["index"]["shards"]
+    assert [(shard["start"], shard["end"]) for shard in shards] == [
+        (0, 16),
+        (16, 32),
+        (32, 48),
+        (48, 50),
+    ]
+    assert all(os.path.exists(tmp_path / shard["filename"]) for shard in shards)
+
+    loaded_dataset = (
+        ShardedDatasetIO().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert loaded_dataset.x.dtype == np.uint8
+    assert loaded_dataset.y.dtype == np.int16
+    assert np.array_equal(loaded_dataset.x, sharded_dataset.x)
+    assert np.array_equal(loaded_dataset.y, sharded_dataset.y)
+
+
+@pytest.mark.parametrize(
+    "start, end", [(0, 50), (10, 20), (15, 33), (48, 100), (20, 20), (-5, 3)]
+)
+def test_sharded_load_rows(tmp_path, sharded_dataset, start, end):
+    dataset_io = ShardedDatasetIO().set_shard_size(16)
+    dataset_io.save(str(tmp_path), sharded_dataset)
+
+    loaded_dataset = dataset_io.load_rows(str(tmp_path), start, end)
+
+    rows = slice(max(start, 0), end)
+    assert np.array_equal(loaded_dataset.x, sharded_dataset.x[rows])
+    assert np.array_equal(loaded_dataset.y, sharded_dataset.y[rows])
+
+
+def test_sharded_load_rows_reads_only_needed_shards(tmp_path, sharded_dataset):
+    dataset_io = ShardedDatasetIO().set_shard_size(16)
+    dataset_io.save(str(tmp_path), sharded_dataset)
+
+    os.remove(tmp_path / "shard-00000.npz")
+
+    assert dataset_io.load_rows(str(tmp_path), 16, 40).x.shape == (24, 2)
+
+
+def test_sharded_save_and_load_ttv_sets(tmp_path):
+    train = Dataset(np.arange(200).reshape(100, 2), np.arange(100), NumericArray())
+    test = Dataset(np.arange(20).reshape(10, 2), np.arange(10), NumericArray())
+
+    description_path = str(tmp_path / "ttv.json")
+
+    ttv_description = TTVSetsIO.save_to_file(
+        description_path,
+        ShardedDatasetIO().set_shard_size(16),
+        TTVSets("ttv", train, test),
+    )
+
+    assert ttv_description["train"] is not ttv_description["test"]
+    assert ttv_description["train"]["index"]["rows"] == 100
+
+    loaded = TTVSetsIO.load_from_file(description_path)
+
+    assert np.array_equal(loaded.train.x, train.x)
+    assert np.array_equal(loaded.test.x, test.x)
+    assert loaded.validation is None
+
+
+def test_sharded_invalid_shard_size():
+    with pytest.raises(ValueError):
+        ShardedDatasetIO().set_shard_size(0)
+
+
+def test_sharded_format_is_registered():
+    assert isinstance(
+        getattr(DatasetIORegistry, ShardedDatasetIO.Label)(), ShardedDatasetIO
+    )
+
+
+@pytest.mark.parametrize(
+    "dataset_io_class", [NpzDatasetIO, NpyDatasetIO, TxtDatasetIO]
+)
+def test_save_and_load_multidimensional_datatype_arrays(tmp_path, dataset_io_class):
+    x_type = PaddedSequence()
+    x = x_type.add_sequences([np.ones((2, 3, 2)), np.zeros((1, 3, 2))])
+
+    dataset_description = dataset_io_class().save(
+        str(tmp_path), Dataset(x, np.arange(2), x_type)
+    )
+
+    loaded_dataset = (
+        dataset_io_class().set_description(dataset_description).load(str(tmp_path))
+    )
+
+    assert loaded_dataset.x_type.values.shape == (3, 3, 2)
+    assert np.array_equal(loaded_dataset[0][0], x_type.process_batch(x))
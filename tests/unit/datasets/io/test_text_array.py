@@ -0,0 +1,84 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.io.text_array import load_text_array, save_text_array
+
+
+@pytest.mark.parametrize(
+    "array, fmt",
+    [
+        (np.arange(12, dtype=np.int16).reshape(4, 3), "%d"),
+        (np.linspace(-1, 1, 30).reshape(10, 3), "%.18e"),
+        (np.arange(5, dtype=np.uint8), "%d"),
+    ],
+)
+def test_save_and_load(tmp_path, array, fmt):
+    path = str(tmp_path / "array.txt")
+
+    save_text_array(path, array, fmt, chunk_values=4)
+    loaded = load_text_array(path, dtype=array.dtype, chunk_bytes=8)
+
+    assert loaded.dtype == array.dtype
+    assert np.array_equal(loaded, array)
+
+
+def test_load_infers_dtype(tmp_path):
+    (tmp_path / "ints.txt").write_text("1 2\n3 4\n")
+    (tmp_path / "floats.txt").write_text("1 2\n3 4.5\n")
+    (tmp_path / "nans.txt").write_text("1 nan\n")
+
+    assert load_text_array(str(tmp_path / "ints.txt")).dtype == np.int64
+    assert load_text_array(str(tmp_path / "floats.txt")).tolist() == [
+        [1, 2],
+        [3, 4.5],
+    ]
+    assert np.isnan(load_text_array(str(tmp_path / "nans.txt"))[0, 1])
+
+
+def test_load_delimiter(tmp_path):
+    (tmp_path / "array.csv").write_text("1,2,3\n4,5,6")
+
+    assert load_text_array(str(tmp_path / "array.csv"), delimiter=",").tolist() == [
+        [1, 2, 3],
+        [4, 5, 6],
+    ]
+
+
+def test_load_strings(tmp_path):
+    (tmp_path / "array.txt").write_text("a.png\nb.png\n")
+
+    assert load_text_array(str(tmp_path / "array.txt"), dtype="<U5").tolist() == [
+        "a.png",
+        "b.png",
+    ]
+
+
+def test_load_invalid_lines(tmp_path):
+    (tmp_path / "array.txt").write_text("1 2\n3\n")
+
+    with pytest.raises(ValueError):
+        load_text_array(str(tmp_path / "array.txt"))
+
+
+def test_load_ragged_lines(tmp_path):
+    (tmp_path / "array.txt").write_text("1 2 3\n4 5\n6 7 8 9\n")
+
+    with pytest.raises(ValueError):
+        load_text_array(str(tmp_path / "array.txt"))
+
+    with pytest.raises(ValueError):
+        load_text_array(str(tmp_path / "array.txt"), chunk_bytes=4)
+
+
+def test_load_skips_empty_lines_and_comments(tmp_path):
+    (tmp_path / "array.txt").write_text(
+        "# Header\n1 2\n\n   \n3 4  # Comment\n\n5 6\n\n"
+    )
+
+    assert load_text_array(str(tmp_path / "array.txt"), chunk_bytes=4).tolist() == [
+        [1, 2],
+        [3, 4],
+        [5, 6],
+    ]
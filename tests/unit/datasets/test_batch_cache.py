@@ -0,0 +1,73 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import pickle
+
+import numpy as np
+
+from dial_core.datasets.batch_cache import BatchCache
+
+
+def test_get_put():
+    cache = BatchCache(max_bytes=1024)
+
+    arrays = (np.zeros(4), np.ones(4))
+    cache.put("a", arrays)
+
+    assert cache.get("a") is arrays
+    assert cache.get("b") is None
+    assert cache.nbytes == 64
+
+
+def test_cached_arrays_are_read_only():
+    cache = BatchCache(max_bytes=1024)
+
+    cache.put("a", (np.zeros(4),))
+
+    assert not cache.get("a")[0].flags.writeable
+
+
+def test_lru_eviction():
+    cache = BatchCache(max_bytes=100)
+
+    cache.put("a", (np.zeros(5),))
+    cache.put("b", (np.zeros(5),))
+
+    # Access "a", so "b" is the least recently used
+    cache.get("a")
+    cache.put("c", (np.zeros(5),))
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.nbytes == 80
+
+
+def test_too_big_arrays_arent_cached():
+    cache = BatchCache(max_bytes=10)
+
+    cache.put("a", (np.zeros(5),))
+
+    assert len(cache) == 0
+
+
+def test_invalidate():
+    cache = BatchCache(max_bytes=1024)
+
+    cache.put(1, (np.zeros(1),))
+    cache.put(2, (np.zeros(1),))
+
+    cache.invalidate(lambda key: key > 1)
+
+    assert cache.get(1) is not None
+    assert cache.get(2) is None
+    assert cache.nbytes == 8
+
+
+def test_pickable():
+    cache = BatchCache(max_bytes=1024)
+    cache.put("a", (np.zeros(4),))
+
+    pickled_cache = pickle.loads(pickle.dumps(cache))
+
+    assert pickled_cache.max_bytes == 1024
+    assert len(pickled_cache) == 0
@@ -0,0 +1,74 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets import BatchPrefetcher, Dataset
+from dial_core.datasets.datatype import ImageArray
+from dial_core.datasets.datatype.augmentation import ImageAugmentation
+
+
+@pytest.fixture
+def dataset():
+    return Dataset(
+        x_data=np.arange(100).reshape(50, 2),
+        y_data=np.arange(50),
+        batch_size=8,
+        shuffle=True,
+        seed=0,
+    )
+
+
+def test_same_batches_as_dataset(dataset):
+    expected_dataset = Dataset(dataset.x, dataset.y, batch_size=8, shuffle=True, seed=0)
+
+    with BatchPrefetcher(dataset, workers=2, prefetch=3) as prefetcher:
+        assert len(prefetcher) == len(expected_dataset)
+
+        for _ in range(2):
+            for i in range(len(prefetcher)):
+                bx, by = prefetcher[i]
+                ex, ey = expected_dataset[i]
+
+                assert bx.tolist() == ex.tolist()
+                assert by.tolist() == ey.tolist()
+
+            prefetcher.on_epoch_end()
+            expected_dataset.on_epoch_end()
+
+
+def test_out_of_order_access(dataset):
+    with BatchPrefetcher(dataset, workers=2, prefetch=2) as prefetcher:
+        bx, _ = prefetcher[5]
+
+        assert bx.tolist() == dataset[5][0].tolist()
+
+
+def test_synchronous(dataset):
+    prefetcher = BatchPrefetcher(dataset, workers=0)
+
+    bx, by = prefetcher[0]
+
+    assert bx.tolist() == dataset[0][0].tolist()
+    assert by.tolist() == dataset[0][1].tolist()
+
+
+def test_augmented_batches_as_dataset():
+    image_type = ImageArray()
+    image_type.augmentation = ImageAugmentation(horizontal_flip=True, brightness=0.2)
+
+    dataset = Dataset(
+        np.arange(8 * 4 * 4, dtype=np.uint8).reshape(8, 4, 4),
+        np.arange(8),
+        image_type,
+        batch_size=4,
+        seed=0,
+        augment=True,
+    )
+
+    with BatchPrefetcher(dataset, workers=2) as prefetcher:
+        for _ in range(2):
+            for i in range(len(prefetcher)):
+                assert prefetcher[i][0].tolist() == dataset[i][0].tolist()
+
+            prefetcher.on_epoch_end()
@@ -1,11 +1,23 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
 import pickle
+from unittest.mock import patch
 
 import numpy as np
 import pytest
 
 from dial_core.datasets import Dataset
+from dial_core.datasets.datatype import (
+    Categorical,
+    DataType,
+    ImageArray,
+    Normalize,
+    Numeric,
+    PaddedSequence,
+    SparseArray,
+)
+from dial_core.datasets.datatype.augmentation import ImageAugmentation
+from dial_core.datasets.statistics import RunningMoments
 
 np.random.seed(0)
 
@@ -122,6 +134,18 @@ def test_insert_rows(simple_numeric_dataset):
     assert y.tolist() == [10, 90, 20]
 
 
+def test_items_dont_share_memory_with_the_dataset(simple_numeric_dataset):
+    x, _ = simple_numeric_dataset.items(0, 4)
+    x[0] = 99
+
+    assert simple_numeric_dataset.x.tolist() == [1, 2, 3, 4]
+
+    simple_numeric_dataset.insert(0, x=[7], y=[70])
+    simple_numeric_dataset.delete_rows(1, 1)
+
+    assert x.tolist() == [99, 2, 3, 4]
+
+
 def test_insert_rows_different_length(simple_numeric_dataset):
     assert simple_numeric_dataset.row_count() == 4
 
@@ -184,3 +208,491 @@ def test_transformer_functions(simple_numeric_dataset):
 def test_pickable(simple_numeric_dataset):
     obj = pickle.dumps(simple_numeric_dataset)
     pickle.loads(obj)
+
+
+def test_custom_datatype_process_batch_fallback():
+    class Doubled(Numeric):
+        def process(self, data):
+            return data * 2
+
+        def process_batch(self, data):
+            return DataType.process_batch(self, data)
+
+    dataset = Dataset(
+        x_data=np.array([1, 2, 3]), y_data=np.array([1, 2, 3]), x_type=Doubled()
+    )
+
+    x, _ = dataset.head(3)
+
+    assert x.tolist() == [2, 4, 6]
+
+
+def test_shuffle_batches(simple_numeric_dataset):
+    simple_numeric_dataset.batch_size = 2
+    simple_numeric_dataset.shuffle = True
+
+    x = np.concatenate([simple_numeric_dataset[i][0] for i in range(2)])
+    y = np.concatenate([simple_numeric_dataset[i][1] for i in range(2)])
+
+    assert sorted(x.tolist()) == [1, 2, 3, 4]
+    assert (y == x * 10).all()
+
+
+def test_shuffle_doesnt_modify_data(simple_numeric_dataset):
+    simple_numeric_dataset.shuffle = True
+
+    simple_numeric_dataset[0]
+    simple_numeric_dataset.on_epoch_end()
+
+    assert simple_numeric_dataset.x.tolist() == [1, 2, 3, 4]
+    assert simple_numeric_dataset.y.tolist() == [10, 20, 30, 40]
+
+
+def test_shuffle_is_reproducible_with_seed():
+    def epochs_order(dataset):
+        order = []
+        for _ in range(3):
+            order.append(np.concatenate([dataset[i][0] for i in range(len(dataset))]))
+            dataset.on_epoch_end()
+
+        return np.concatenate(order).tolist()
+
+    def create_dataset():
+        return Dataset(
+            np.arange(100), np.arange(100), batch_size=10, shuffle=True, seed=42
+        )
+
+    assert epochs_order(create_dataset()) == epochs_order(create_dataset())
+
+
+def test_cache_batches(simple_numeric_dataset):
+    simple_numeric_dataset.cache.max_bytes = 1024
+    simple_numeric_dataset.batch_size = 2
+
+    bx, _ = simple_numeric_dataset[0]
+
+    assert simple_numeric_dataset[0][0] is bx
+    assert len(simple_numeric_dataset.cache) == 1
+
+
+def test_cache_invalidated_on_transformations(simple_numeric_dataset):
+    simple_numeric_dataset.cache.max_bytes = 1024
+
+    simple_numeric_dataset.head(2)
+    simple_numeric_dataset.x_type.transformations.append(lambda x: x * 2)
+
+    x, _ = simple_numeric_dataset.head(2)
+
+    assert x.tolist() == [2, 4]
+
+
+def test_cache_invalidated_on_transformation_parameters(simple_numeric_dataset):
+    simple_numeric_dataset.cache.max_bytes = 1024
+
+    normalize = Normalize(1.0, 1.0)
+    simple_numeric_dataset.x_type.transformations.append(normalize)
+
+    assert simple_numeric_dataset.head(2)[0].tolist() == [0, 1]
+
+    normalize.mean = np.asarray(2.0)
+    assert simple_numeric_dataset.head(2)[0].tolist() == [-1, 0]
+
+    normalize.std[...] = 0.5
+    assert simple_numeric_dataset.head(2)[0].tolist() == [-2, 0]
+
+
+def test_cache_invalidated_on_mutation(simple_numeric_dataset):
+    simple_numeric_dataset.cache.max_bytes = 1024
+
+    simple_numeric_dataset.items(0, 1)
+    simple_numeric_dataset.items(2, 4)
+
+    simple_numeric_dataset.insert(2, x=[9], y=[90])
+
+    # Only the entries displaced by the insertion are removed
+    assert len(simple_numeric_dataset.cache) == 1
+    assert simple_numeric_dataset.items(2, 4)[0].tolist() == [9, 3]
+
+    simple_numeric_dataset.delete_rows(0)
+    assert len(simple_numeric_dataset.cache) == 0
+    assert simple_numeric_dataset.items(0, 1)[0].tolist() == [2]
+
+    simple_numeric_dataset.x = np.array([5, 6, 7, 8, 9])
+    assert len(simple_numeric_dataset.cache) == 0
+
+
+def test_build_row_by_row(empty_dataset):
+    for i in range(100):
+        empty_dataset.insert(empty_dataset.row_count(), x=[i], y=[i * 10])
+
+    x, y = empty_dataset.items()
+
+    assert x.tolist() == list(range(100))
+    assert y.tolist() == list(range(0, 1000, 10))
+
+    empty_dataset.compact()
+
+    assert empty_dataset.row_count() == 100
+
+
+def test_view_slice(simple_numeric_dataset):
+    view = simple_numeric_dataset.view(slice(1, 3))
+
+    assert view.is_view()
+    assert view.row_count() == 2
+    assert np.shares_memory(view.x, simple_numeric_dataset.x)
+
+    x, y = view.items()
+
+    assert x.tolist() == [2, 3]
+    assert y.tolist() == [20, 30]
+
+
+def test_view_indices(simple_numeric_dataset):
+    view = simple_numeric_dataset.view(np.array([3, 0]))
+    view.batch_size = 1
+
+    assert len(view) == 2
+    assert view[0][0].tolist() == [4]
+    assert view[1][1].tolist() == [10]
+
+
+def test_view_mask(simple_numeric_dataset):
+    view = simple_numeric_dataset.view(np.array([True, False, True, False]))
+
+    x, y = view.items()
+
+    assert x.tolist() == [1, 3]
+    assert y.tolist() == [10, 30]
+
+
+def test_view_of_view(simple_numeric_dataset):
+    view = simple_numeric_dataset.view(slice(1, 4)).view(np.array([0, 2]))
+
+    x, _ = view.items()
+
+    assert x.tolist() == [2, 4]
+
+
+def test_view_uses_parent_datatypes(simple_categorical_dataset):
+    view = simple_categorical_dataset.view(slice(1, None))
+
+    _, y = view.items(role=Dataset.Role.Display)
+
+    assert y.tolist() == ["bar", "hue"]
+
+
+def test_view_out_of_bounds(simple_numeric_dataset):
+    with pytest.raises(IndexError):
+        simple_numeric_dataset.view(np.array([0, 10]))
+
+
+def test_view_after_parent_insert(simple_numeric_dataset):
+    simple_numeric_dataset.insert(0, [0, 0], [0, 0])
+    view = simple_numeric_dataset.view(slice(2, 5))
+
+    simple_numeric_dataset.insert(0, [-1], [-1])
+
+    assert view.items()[0].tolist() == [1, 2, 3]
+    assert simple_numeric_dataset.items()[0].tolist() == [-1, 0, 0, 1, 2, 3, 4]
+
+
+def test_view_after_parent_delete(simple_numeric_dataset):
+    slice_view = simple_numeric_dataset.view(slice(1, 4))
+    indices_view = simple_numeric_dataset.view(np.array([3, 0]))
+
+    simple_numeric_dataset.delete_rows(0, 2)
+
+    assert slice_view.row_count() == 3
+    assert slice_view.items()[0].tolist() == [2, 3, 4]
+    assert indices_view.items()[0].tolist() == [4, 1]
+    assert simple_numeric_dataset.items()[0].tolist() == [3, 4]
+
+
+def test_view_cant_be_modified(simple_numeric_dataset):
+    view = simple_numeric_dataset.view(slice(0, 2))
+
+    with pytest.raises(ValueError):
+        view.insert(0, x=[5], y=[50])
+
+    with pytest.raises(ValueError):
+        view.delete_rows(0)
+
+
+def test_metadata(simple_categorical_dataset):
+    assert simple_categorical_dataset.metadata() == {
+        "input_shape": (),
+        "output_shape": (3,),
+        "input_dtype": simple_categorical_dataset.x.dtype.name,
+        "output_dtype": "float32",
+    }
+
+
+def test_metadata_is_cached(simple_array_dataset):
+    with patch.object(
+        simple_array_dataset.x_type,
+        "process_batch",
+        wraps=simple_array_dataset.x_type.process_batch,
+    ) as process_batch_mock:
+        assert simple_array_dataset.input_shape == (3,)
+        assert simple_array_dataset.input_shape == (3,)
+
+        process_batch_mock.assert_called_once()
+
+
+def test_metadata_invalidated(simple_array_dataset):
+    assert simple_array_dataset.input_shape == (3,)
+
+    simple_array_dataset.x_type.transformations = [lambda x: x[:2]]
+    assert simple_array_dataset.input_shape == (2,)
+
+    simple_array_dataset.x = np.array([[1, 2, 3, 4]])
+    simple_array_dataset.y = np.array([1])
+    assert simple_array_dataset.input_shape == (2,)
+
+    simple_array_dataset.x_type.transformations = []
+    assert simple_array_dataset.input_shape == (4,)
+
+    simple_array_dataset.delete_rows(0)
+    assert simple_array_dataset.input_shape == (0,)
+
+
+def test_restore_metadata(simple_array_dataset):
+    simple_array_dataset.restore_metadata(
+        {
+            "input_shape": [5],
+            "output_shape": [],
+            "input_dtype": "float32",
+            "output_dtype": "int64",
+        }
+    )
+
+    assert simple_array_dataset.input_shape == (5,)
+    assert simple_array_dataset.input_dtype == "float32"
+
+
+def test_to_tf_dataset(simple_categorical_dataset):
+    simple_categorical_dataset.batch_size = 2
+
+    batches = list(simple_categorical_dataset.to_tf_dataset().as_numpy_iterator())
+
+    assert len(batches) == 2
+    assert batches[0][0].tolist() == [0, 1]
+    assert batches[0][1].tolist() == [[1, 0, 0], [0, 1, 0]]
+    assert batches[1][1].tolist() == [[0, 0, 1]]
+
+
+def test_to_tf_dataset_shuffled(simple_numeric_dataset):
+    tf_dataset = simple_numeric_dataset.to_tf_dataset(shuffle=True, cache=True)
+
+    for _ in range(2):
+        x, y = zip(*tf_dataset.as_numpy_iterator())
+        x, y = np.concatenate(x), np.concatenate(y)
+
+        assert sorted(x.tolist()) == [1, 2, 3, 4]
+        assert (y == x * 10).all()
+
+
+def test_to_tf_dataset_empty(empty_dataset):
+    with pytest.raises(ValueError):
+        empty_dataset.to_tf_dataset()
+
+
+def test_statistics(simple_categorical_dataset):
+    statistics = simple_categorical_dataset.statistics(chunk_size=2)
+
+    assert statistics["x"]["count"] == 3
+    assert statistics["x"]["mean"] == pytest.approx(1.0)
+    assert statistics["x"]["max"] == 2
+    assert statistics["y"]["counts"].tolist() == [1, 1, 1]
+
+
+def test_statistics_parallel(simple_array_dataset):
+    statistics = simple_array_dataset.statistics(chunk_size=1, workers=2)
+
+    assert statistics["x"]["mean"].tolist() == [2, 2, 2]
+    assert statistics["x"]["std"] == pytest.approx(np.std([1, 2, 3]))
+
+
+def test_statistics_chunk_size_from_row_size():
+    x = np.arange(10 * 48).reshape(10, 4, 4, 3)
+    dataset = Dataset(x, np.arange(10), ImageArray())
+
+    # Rows of 48 values, as float64 values plus a temporary array of the same size
+    dataset.StatisticsChunkBytes = 48 * 16 * 3
+
+    with patch(
+        "dial_core.datasets.statistics.RunningMoments.update",
+        autospec=True,
+        side_effect=RunningMoments.update,
+    ) as update_mock:
+        statistics = dataset.statistics()
+
+    x_chunks = [call[0][1] for call in update_mock.call_args_list]
+    x_chunks = [chunk for chunk in x_chunks if chunk.ndim > 1]
+
+    assert [len(chunk) for chunk in x_chunks] == [3, 3, 3, 1]
+    assert statistics["x"]["mean"] == pytest.approx(x.mean(axis=0))
+
+
+def test_statistics_are_cached_until_modified(simple_numeric_dataset):
+    statistics = simple_numeric_dataset.statistics()
+
+    assert simple_numeric_dataset.statistics() is statistics
+
+    simple_numeric_dataset.insert(0, [5], [50])
+
+    assert simple_numeric_dataset.statistics()["x"]["count"] == 5
+
+
+def test_compact_stored_dtypes():
+    dataset = Dataset(
+        np.full((2, 4, 4), 255), np.array([0, 1]), ImageArray(), Categorical(["a", "b"])
+    )
+
+    assert dataset.x.dtype == np.uint8
+    assert dataset.y.dtype == np.uint8
+
+    x, y = dataset[0]
+
+    assert x.dtype == np.float32
+    assert y.dtype == np.float32
+
+
+def test_augment_batches():
+    image_type = ImageArray()
+    image_type.augmentation = ImageAugmentation(brightness=0.5)
+
+    images = np.full((4, 2, 2), 128, dtype=np.uint8)
+    dataset = Dataset(images, np.arange(4), image_type, batch_size=2, seed=1)
+
+    assert (dataset[0][0] == 128 / 255).all()
+
+    dataset.augment = True
+    first_epoch = dataset[0][0]
+
+    assert not (first_epoch == 128 / 255).all()
+    assert dataset[0][0].tolist() == first_epoch.tolist()
+    assert (dataset.x == 128).all()
+
+    dataset.on_epoch_end()
+
+    assert dataset[0][0].tolist() != first_epoch.tolist()
+
+
+def test_augment_is_reproducible_with_seed():
+    def augmented_batch():
+        image_type = ImageArray()
+        image_type.augmentation = ImageAugmentation(horizontal_flip=True, max_shift=1)
+
+        images = np.arange(4 * 3 * 3, dtype=np.uint8).reshape(4, 3, 3)
+        return Dataset(images, np.arange(4), image_type, seed=3, augment=True)[0][0]
+
+    assert augmented_batch().tolist() == augmented_batch().tolist()
+
+
+@pytest.fixture
+def sequences_dataset():
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(1, 50, 200)
+
+    x_type = PaddedSequence()
+    x = x_type.add_sequences([np.ones(length) for length in lengths])
+
+    return Dataset(x, lengths, x_type, batch_size=10, bucket_by_length=True)
+
+
+def test_sequences_metadata(sequences_dataset):
+    assert sequences_dataset.input_shape == (None,)
+
+
+def test_cache_invalidated_on_max_length(sequences_dataset):
+    sequences_dataset.cache.max_bytes = 1024 * 1024
+
+    x, _ = sequences_dataset.items(0, 2)
+    assert x.shape[1] > 2
+
+    sequences_dataset.x_type.max_length = 2
+
+    x, _ = sequences_dataset.items(0, 2)
+    assert x.shape == (2, 2)
+
+
+def test_bucket_by_length(sequences_dataset):
+    padded_steps = sum(sequences_dataset[i][0].size for i in range(20))
+
+    # Rows are sorted by length, so batches are barely padded
+    assert padded_steps < sequences_dataset.y.sum() * 1.1
+
+    rows = np.concatenate([sequences_dataset.batch_indices(i) for i in range(20)])
+    assert sorted(rows.tolist()) == list(range(200))
+
+
+def test_bucket_by_length_shuffled(sequences_dataset):
+    sequences_dataset.shuffle = True
+
+    first_epoch = [sequences_dataset.batch_indices(i).tolist() for i in range(20)]
+
+    sequences_dataset.on_epoch_end()
+
+    second_epoch = [sequences_dataset.batch_indices(i).tolist() for i in range(20)]
+
+    assert first_epoch != second_epoch
+    assert sorted(sum(second_epoch, [])) == list(range(200))
+
+    for i in range(20):
+        x, y = sequences_dataset[i]
+        assert x.shape[1] == y.max()
+
+
+def test_bucket_by_length_needs_lengths(simple_numeric_dataset):
+    simple_numeric_dataset.bucket_by_length = True
+
+    with pytest.raises(ValueError):
+        simple_numeric_dataset.batch_indices(0)
+
+
+def test_sparse_array_dataset():
+    x_type = SparseArray(size=100)
+    rows = np.eye(100)[:10] * np.arange(1, 11)[:, np.newaxis]
+
+    dataset = Dataset(x_type.add_rows(rows), np.arange(10), x_type, batch_size=4)
+    dataset.delete_rows(0, 2)
+
+    x, y = dataset[0]
+
+    assert np.array_equal(x, rows[2:6])
+    assert dataset.input_shape == (100,)
+
+
+def test_insert_doesnt_truncate_compacted_data():
+    dataset = Dataset(
+        np.zeros((2, 2, 2), dtype=np.int64),
+        np.array([0, 1]),
+        ImageArray(),
+        Categorical(["a", "b"]),
+    )
+    assert dataset.x.dtype == np.uint8
+    assert dataset.y.dtype == np.uint8
+
+    dataset.y_type.categories = [str(i) for i in range(300)]
+    dataset.insert(0, np.full((1, 2, 2), 300), [299])
+
+    assert dataset.x[0, 0, 0] == 300
+    assert dataset.y[0] == 299
+
+
+def test_memory_mapped_data_isnt_compacted_until_requested(tmp_path):
+    np.save(tmp_path / "x.npy", np.zeros((4, 2, 2), dtype=np.int64))
+    x = np.load(tmp_path / "x.npy", mmap_mode="r")
+
+    dataset = Dataset(x, np.arange(4), ImageArray())
+
+    assert isinstance(dataset.x, np.memmap)
+    assert dataset.x.dtype == np.int64
+
+    dataset.compact()
+
+    assert not isinstance(dataset.x, np.memmap)
+    assert dataset.x.dtype == np.uint8
+    assert dataset.x[0].tolist() == [[0, 0], [0, 0]]
@@ -0,0 +1,110 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import pickle
+
+import numpy as np
+
+from dial_core.datasets.growable_array import GrowableArray
+
+
+def test_doesnt_copy_initial_array():
+    array = np.array([1, 2, 3])
+
+    assert GrowableArray(array).array is array
+
+
+def test_append():
+    growable_array = GrowableArray()
+
+    for i in range(100):
+        growable_array.insert(len(growable_array), [i])
+
+    assert growable_array.array.tolist() == list(range(100))
+    assert growable_array.capacity == 128
+
+
+def test_insert_middle():
+    growable_array = GrowableArray(np.array([1, 2, 3]))
+
+    growable_array.insert(1, [8, 9])
+
+    assert growable_array.array.tolist() == [1, 8, 9, 2, 3]
+
+
+def test_insert_rows():
+    growable_array = GrowableArray()
+
+    growable_array.insert(0, [np.array([1, 1]), np.array([2, 2])])
+    growable_array.insert(1, [np.array([3, 3])])
+
+    assert growable_array.array.tolist() == [[1, 1], [3, 3], [2, 2]]
+
+
+def test_delete():
+    growable_array = GrowableArray(np.arange(10))
+
+    growable_array.delete(2, 3)
+
+    assert growable_array.array.tolist() == [0, 1, 5, 6, 7, 8, 9]
+
+    growable_array.delete(5, 100)
+
+    assert growable_array.array.tolist() == [0, 1, 5, 6, 7]
+
+
+def test_doesnt_modify_initial_array():
+    array = np.arange(5)
+
+    growable_array = GrowableArray(array)
+    growable_array.delete(0)
+
+    assert array.tolist() == [0, 1, 2, 3, 4]
+
+
+def test_compact():
+    growable_array = GrowableArray()
+    growable_array.insert(0, [1, 2, 3])
+
+    assert growable_array.capacity > 3
+
+    assert growable_array.compact().tolist() == [1, 2, 3]
+    assert growable_array.capacity == 3
+
+
+def test_share_is_copy_on_write():
+    growable_array = GrowableArray()
+    growable_array.insert(0, [1, 2, 3])
+
+    shared = growable_array.share()
+    assert np.shares_memory(shared.array, growable_array.array)
+
+    growable_array.insert(0, [0])
+    growable_array.delete(3)
+
+    assert shared.array.tolist() == [1, 2, 3]
+    assert growable_array.array.tolist() == [0, 1, 2]
+
+
+def test_insert_widens_dtype():
+    growable_array = GrowableArray(np.array([1, 2], dtype=np.uint8))
+
+    growable_array.insert(0, [3])
+    assert growable_array.array.dtype == np.uint8
+
+    growable_array.insert(0, [300])
+    growable_array.insert(0, [-1])
+
+    assert growable_array.array.tolist() == [-1, 300, 3, 1, 2]
+    assert growable_array.array.dtype == np.int32
+
+    growable_array.insert(0, [0.5])
+    assert growable_array.array.tolist() == [0.5, -1, 300, 3, 1, 2]
+
+
+def test_pickable():
+    growable_array = GrowableArray()
+    growable_array.insert(0, [1, 2, 3])
+
+    pickled_growable_array = pickle.loads(pickle.dumps(growable_array))
+
+    assert pickled_growable_array.array.tolist() == [1, 2, 3]
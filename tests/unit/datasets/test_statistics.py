@@ -0,0 +1,50 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets.statistics import CategoryCounts, RunningMoments
+
+
+def test_running_moments():
+    data = np.arange(20, dtype=float).reshape(10, 2)
+
+    result = RunningMoments().update(data).result()
+
+    assert result["count"] == 10
+    assert result["mean"] == pytest.approx(data.mean(axis=0))
+    assert result["std"] == pytest.approx(data.std(axis=0))
+    assert result["min"].tolist() == [0, 1]
+    assert result["max"].tolist() == [18, 19]
+
+
+def test_running_moments_merge():
+    data = np.random.default_rng(0).normal(size=(100, 3))
+
+    moments = RunningMoments()
+    for chunk in np.array_split(data, 7):
+        moments.merge(RunningMoments().update(chunk))
+
+    result = moments.result()
+
+    assert result["mean"] == pytest.approx(data.mean(axis=0))
+    assert result["std"] == pytest.approx(data.std(axis=0))
+
+
+def test_running_moments_empty():
+    result = RunningMoments().update(np.empty((0, 2))).result()
+
+    assert result["count"] == 0
+    assert result["mean"] is None
+
+
+def test_category_counts():
+    counts = CategoryCounts(3).update(np.array([0, 2, 2]))
+    counts.merge(CategoryCounts(3).update(np.array([1])))
+
+    assert counts.result()["counts"].tolist() == [1, 1, 2]
+
+
+def test_category_counts_out_of_bounds():
+    with pytest.raises(ValueError):
+        CategoryCounts(2).update(np.array([2]))
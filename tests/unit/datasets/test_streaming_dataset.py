@@ -0,0 +1,162 @@
+# vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
+
+import numpy as np
+import pytest
+
+from dial_core.datasets import Dataset, StreamingDataset, TTVSets
+from dial_core.datasets.datatype import Categorical
+from dial_core.datasets.io import NpzDatasetIO, TTVSetsIO
+
+
+def chunks():
+    for start in range(0, 10, 3):
+        rows = np.arange(start, min(start + 3, 10))
+        yield rows, rows * 10
+
+
+def test_batches():
+    stream = StreamingDataset(chunks, batch_size=4, length=10)
+
+    batches = list(stream)
+
+    assert len(stream) == 3
+    assert [x.tolist() for x, _ in batches] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert [y.tolist() for _, y in batches] == [
+        [0, 10, 20, 30],
+        [40, 50, 60, 70],
+        [80, 90],
+    ]
+
+
+def test_unknown_length():
+    stream = StreamingDataset(chunks, batch_size=4)
+
+    assert stream.steps_per_epoch is None
+
+    with pytest.raises(TypeError):
+        len(stream)
+
+    assert sum(len(x) for x, _ in stream) == 10
+
+
+def test_shuffle_buffer():
+    stream = StreamingDataset(chunks, batch_size=4, shuffle_buffer_size=5, seed=0)
+
+    batches = list(stream)
+    x = np.concatenate([x for x, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+
+    assert sorted(x.tolist()) == list(range(10))
+    assert x.tolist() != list(range(10))
+    assert (y == x * 10).all()
+
+
+def test_shuffle_buffer_large_stream():
+    def large_chunks():
+        for start in range(0, 1000, 70):
+            rows = np.arange(start, min(start + 70, 1000))
+            yield rows.reshape(-1, 1), rows
+
+    stream = StreamingDataset(
+        large_chunks, batch_size=32, shuffle_buffer_size=100, seed=0
+    )
+
+    batches = list(stream)
+    x = np.concatenate([x for x, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+
+    assert [len(batch_x) for batch_x, _ in batches] == [32] * 31 + [8]
+    assert sorted(y.tolist()) == list(range(1000))
+    assert (x[:, 0] == y).all()
+
+    # Rows are only drawn from the buffer of rows read so far
+    assert y[:32].max() < 132
+
+
+def test_chunks_with_wider_dtype():
+    def mixed_chunks():
+        yield np.array([1, 2], dtype=np.uint8), np.array([0, 0])
+        yield np.array([300, 4], dtype=np.int64), np.array([0, 0])
+
+    stream = StreamingDataset(mixed_chunks, batch_size=3)
+
+    assert [x.tolist() for x, _ in stream] == [[1, 2, 300], [4]]
+
+
+def test_processes_batches():
+    def categorical_chunks():
+        yield np.array([0, 1]), np.array([1, 0])
+
+    stream = StreamingDataset(
+        categorical_chunks, y_type=Categorical(["a", "b"]), batch_size=2
+    )
+
+    _, y = next(iter(stream))
+
+    assert y.tolist() == [[0, 1], [1, 0]]
+    assert stream.metadata()["output_shape"] == (2,)
+
+
+def test_generator_cycles_epochs():
+    stream = StreamingDataset(chunks, batch_size=5, length=10)
+
+    generator = stream.generator()
+    batches = [next(generator) for _ in range(4)]
+
+    assert batches[0][0].tolist() == batches[2][0].tolist()
+
+
+def test_from_datasets(simple_numeric_dataset):
+    stream = StreamingDataset.from_datasets(
+        [simple_numeric_dataset, simple_numeric_dataset.view(slice(2, 4))],
+        chunk_size=3,
+        batch_size=2,
+    )
+
+    assert stream.row_count() == 6
+    assert np.concatenate([x for x, _ in stream]).tolist() == [1, 2, 3, 4, 3, 4]
+
+
+def test_to_dataset():
+    dataset = StreamingDataset(chunks).to_dataset()
+
+    assert isinstance(dataset, Dataset)
+    assert dataset.x.tolist() == list(range(10))
+
+
+def test_ttv_sets_to_dict():
+    stream = StreamingDataset(chunks, y_type=Categorical(["a", "b"]))
+
+    ttv_sets = TTVSets("Streams", train=stream)
+
+    assert ttv_sets.to_dict()["train"]["y_type"] == stream.y_type.to_dict()
+
+
+def test_ttv_sets_save_rejects_streams(tmp_path, simple_numeric_dataset):
+    ttv_sets = TTVSets(
+        "Streams", train=simple_numeric_dataset, test=StreamingDataset(chunks)
+    )
+
+    with pytest.raises(ValueError):
+        TTVSetsIO.save_to_file(
+            str(tmp_path / "ttv" / "description.json"), NpzDatasetIO(), ttv_sets
+        )
+
+    # Nothing is written, not even the train set
+    assert not (tmp_path / "ttv" / "train").exists()
+
+    with pytest.raises(ValueError):
+        NpzDatasetIO().save(str(tmp_path), StreamingDataset(chunks))
+
+
+def test_ttv_sets_save_materialized_stream(tmp_path):
+    stream = StreamingDataset(chunks)
+    description_path = str(tmp_path / "description.json")
+
+    TTVSetsIO.save_to_file(
+        description_path, NpzDatasetIO(), TTVSets("Streams", train=stream.to_dataset())
+    )
+
+    loaded = TTVSetsIO.load_from_file(description_path)
+
+    assert loaded.train.x.tolist() == list(range(10))
@@ -1,5 +1,11 @@
 # vim: ft=python fileencoding=utf-8 sts=4 sw=4 et:
 
+import numpy as np
+import pytest
+
+from dial_core.datasets import Dataset, TTVSets
+from dial_core.datasets.datatype import Categorical
+
 
 def test_ttv_sets_to_dict(ttv_sets):
     dc = ttv_sets.to_dict()
@@ -10,3 +16,45 @@ def test_ttv_sets_to_dict(ttv_sets):
     assert dc["test"]["x_type"] == ttv_sets.test.x_type.to_dict()
     assert dc["test"]["y_type"] == ttv_sets.test.y_type.to_dict()
     assert dc["validation"] == {}
+
+
+def test_ttv_sets_from_dataset():
+    dataset = Dataset(np.arange(100), np.arange(100) * 10)
+
+    ttv_sets = TTVSets.from_dataset(
+        dataset, ratios=(0.6, 0.2, 0.2), stratify=False, seed=0
+    )
+
+    assert len(ttv_sets.train.x) == 60
+    assert len(ttv_sets.test.x) == 20
+    assert len(ttv_sets.validation.x) == 20
+    assert ttv_sets.train.is_view()
+
+    all_x = np.concatenate([ttv_sets.train.x, ttv_sets.test.x, ttv_sets.validation.x])
+    assert sorted(all_x.tolist()) == list(range(100))
+    assert (ttv_sets.test.y == ttv_sets.test.x * 10).all()
+
+
+def test_ttv_sets_from_dataset_stratified():
+    labels = np.array([0] * 80 + [1] * 20)
+    dataset = Dataset(np.arange(100), labels, y_type=Categorical(["a", "b"]))
+
+    ttv_sets = TTVSets.from_dataset(dataset, ratios=(0.5, 0.5, 0), seed=0)
+
+    assert np.bincount(ttv_sets.train.y).tolist() == [40, 10]
+    assert np.bincount(ttv_sets.test.y).tolist() == [40, 10]
+    assert ttv_sets.validation is None
+
+
+def test_ttv_sets_from_dataset_is_reproducible_with_seed():
+    dataset = Dataset(np.arange(50), np.arange(50) % 3)
+
+    first = TTVSets.from_dataset(dataset, seed=1)
+    second = TTVSets.from_dataset(dataset, seed=1)
+
+    assert first.train.x.tolist() == second.train.x.tolist()
+
+
+def test_ttv_sets_from_dataset_invalid_ratios(simple_numeric_dataset):
+    with pytest.raises(ValueError):
+        TTVSets.from_dataset(simple_numeric_dataset, ratios=(0.5, 0.5))